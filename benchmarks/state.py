@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+    Benchmark the objects used for request.state
+
+    Compares the old DictObj (which made itself it's own __dict__)
+    with the current DictObj and the lazy State made by View.get_state.
+
+    Run with ``python benchmarks/state.py`` from the root of the repository.
+"""
+import timeit
+import sys
+import gc
+import os
+
+# Make sure we use the cwf from this checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cwf.views.base import DictObj, State
+
+class CyclicDictObj(dict):
+    """DictObj as it used to be"""
+    def __init__(self, *args, **kwargs):
+        super(CyclicDictObj, self).__init__(self, *args, **kwargs)
+        self.__dict__ = self
+
+class Request(object):
+    """Something to hang the state off"""
+
+values = dict(menu=None, path=['', 'one', 'two', ''], target='index', section=None, base_url='')
+lazy = dict((key, lambda state, value=value: value) for key, value in values.items())
+
+makers = [
+      ('CyclicDictObj', lambda : CyclicDictObj(**values))
+    , ('DictObj', lambda : DictObj(**values))
+    , ('State', lambda : State(target='index', lazy=lazy))
+    ]
+
+def timed(func, number):
+    """Return microseconds per call of func"""
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1000000
+
+def creation(make, number):
+    return timed(make, number)
+
+def access(make, number):
+    state = make()
+    def access():
+        state.path
+        state['target']
+        state.base_url
+        'menu' in state
+    return timed(access, number)
+
+def request_loop(make, number):
+    """
+        Make a state for number requests with automatic gc turned off
+        Return how many objects were left for the cyclic garbage collector
+    """
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in xrange(number):
+            request = Request()
+            request.state = make()
+            request.state.path
+            request.state.extra = 1
+        return gc.collect()
+    finally:
+        gc.enable()
+
+def main(number=100000):
+    out = sys.stdout
+    out.write("%-15s %15s %15s %20s\n" % ("", "create (us)", "access (us)", "left for gc"))
+    for name, make in makers:
+        out.write("%-15s %15.3f %15.3f %20d\n" % (
+              name, creation(make, number), access(make, number), request_loop(make, number)
+            ))
+
+if __name__ == '__main__':
+    main()
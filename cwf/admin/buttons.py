@@ -1,6 +1,8 @@
 from django.utils.encoding import force_unicode
 from django.utils.safestring import mark_safe
 
+from cwf.sections.permissions import permissions_for
+
 ########################
 ###   WRAP
 ########################
@@ -40,8 +42,11 @@ class ButtonWrap(object):
 
     @property
     def has_permissions(self):
-        '''Determine if user has permissions for this section'''
-        user = self._request.user
+        '''
+            Determine if user has permissions for this section
+            Uses the permissions resolver for the request so that all buttons share one lookup
+        '''
+        user = permissions_for(self._request)
 
         # Super user needs not ask for permissions
         if user.is_superuser:
@@ -4,6 +4,8 @@ from django.views import debug
 from paste.debug.prints import PrintDebugMiddleware
 from werkzeug import run_simple
 
+from reloader import run_with_reloader
+
 import os
 
 class Debugger(object):
@@ -13,8 +15,11 @@ class Debugger(object):
     default_port = 8000
     default_host = '0.0.0.0'
 
-    def __init__(self, project=None, host=None, port=None, setup_project=None, project_options=None):
+    default_reloader = 'auto'
+
+    def __init__(self, project=None, host=None, port=None, setup_project=None, project_options=None, reloader=None):
         self.host = host or self.default_host
+        self.reloader = reloader or self.default_reloader
         self.port = port or self.default_port
         self.project = project
         self._setup_project = setup_project
@@ -28,11 +33,22 @@ class Debugger(object):
         """Start the debugger"""
         def setup_func():
             self.setup_500()
+            self.setup_templates()
+            self.setup_failed_imports()
             self.setup_path(self.project)
         app = self.setup_app()
-        run_simple(self.host, self.port, app
-            , use_debugger=True, use_reloader=True, setup_func=setup_func
-            )
+
+        if self.reloader == 'werkzeug':
+            run_simple(self.host, self.port, app
+                , use_debugger=True, use_reloader=True, setup_func=setup_func
+                )
+            return
+
+        def serve():
+            run_simple(self.host, self.port, app
+                , use_debugger=True, use_reloader=False, setup_func=setup_func
+                )
+        run_with_reloader(serve, self.reloader)
 
     ########################
     ###   SETUP
@@ -50,6 +66,23 @@ class Debugger(object):
             raise exc_type, exc_value, tb
         debug.technical_500_response = null_technical_500_response
 
+    def setup_templates(self):
+        """
+            Stop the renderer from keeping compiled templates
+
+            The reloader starts a new process when python files change
+            , but it doesn't know about templates, so changed templates would otherwise
+            not be seen until the next reload.
+        """
+        from cwf.views.rendering import renderer
+        renderer.cache_templates = False
+        renderer.forget_templates()
+
+    def setup_failed_imports(self):
+        """Make sure files that fail to import are still watched by the reloader"""
+        from cwf.splitter.imports import install_failed_import_handler
+        install_failed_import_handler()
+
     def setup_path(self, project):
         """Alter the path where to find the application"""
         os.environ['DJANGO_SETTINGS_MODULE'] = '{0}.settings'.format(project)
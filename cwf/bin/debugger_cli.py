@@ -36,6 +36,12 @@ def make_parser():
         , default = None
         )
 
+    parser.add_argument("-r", "--reloader"
+        , help = "How to notice changes to python files. auto uses inotify if it can, otherwise poll"
+        , choices = ["auto", "inotify", "poll", "werkzeug"]
+        , default = Debugger.default_reloader
+        )
+
     return parser
 
 def main(argv=None):
@@ -49,6 +55,7 @@ def main(argv=None):
     Debugger(
           project=args.project, host=args.host, port=args.port
         , setup_project=setup_project, project_options=args.options
+        , reloader=args.reloader
         ).run()
 
 if __name__ == '__main__':
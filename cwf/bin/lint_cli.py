@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+from manager import setup_project
+
+import argparse
+import sys
+import os
+
+def make_parser():
+    """Create an argparser to get things from the CLI"""
+    parser = argparse.ArgumentParser(description="Look for problems in the sections of your website")
+
+    parser.add_argument("project"
+        , help = "The project you want to look at"
+        )
+
+    parser.add_argument("-u", "--urls"
+        , help = "Module holding the site (as made by cwf.splitter.website.Website). Defaults to <project>.urls"
+        , default = None
+        )
+
+    parser.add_argument("-p", "--path"
+        , help = "Path of the sample request used to time values and conditionals"
+        , default = "/"
+        )
+
+    parser.add_argument("-t", "--threshold"
+        , help = "Milliseconds a values object may take before it's considered slow"
+        , type = float
+        , default = 50
+        )
+
+    parser.add_argument("-c", "--count"
+        , help = "How many of the deepest sections and slowest conditionals to show"
+        , type = int
+        , default = 5
+        )
+
+    return parser
+
+def find_site(urls):
+    """Import the urls module and get the site (or section) from it"""
+    module = __import__(urls, globals(), locals(), ['site'], -1)
+    for name in ('site', 'section'):
+        if hasattr(module, name):
+            return getattr(module, name)
+    raise Exception("%s has neither a site nor a section" % urls)
+
+def heading(out, title):
+    """Write a heading underlined with equals signs"""
+    out.write("\n%s\n%s\n" % (title, "=" * len(title)))
+
+def report(linter, count, out=sys.stdout):
+    """Write what the linter finds to out and return how many problems there were"""
+    problems = list(linter.problems())
+
+    heading(out, "Problems")
+    for kind, section, message in problems:
+        out.write("  [%s] %s : %s\n" % (kind, section, message))
+    if not problems:
+        out.write("  None\n")
+
+    heading(out, "Regexes")
+    out.write("  %s\n" % linter.regex_count)
+
+    heading(out, "Deepest sections")
+    for depth, section in linter.deepest(count):
+        out.write("  %s : %s\n" % (depth, section))
+
+    heading(out, "Slow values (over %sms)" % (linter.threshold * 1000))
+    for took, section in linter.slow_values():
+        out.write("  %.2fms : %s\n" % (took * 1000, section))
+
+    heading(out, "Slowest conditionals")
+    for took, section, name in linter.slow_conditionals(count):
+        out.write("  %.2fms : %s (%s)\n" % (took * 1000, section, name))
+
+    if linter.errors:
+        heading(out, "Errors with sample request")
+        for section, error in linter.errors:
+            out.write("  %s : %r\n" % (section, error))
+
+    return len(problems)
+
+def main(argv=None):
+    """Lint the sections for the project specified in sys.argv"""
+    if not argv:
+        argv = sys.argv[1:]
+
+    parser = make_parser()
+    args = parser.parse_args(argv)
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = '{0}.settings'.format(args.project)
+    setup_project(args.project)
+
+    from cwf.sections.lint import Linter, sample_request
+    site = find_site(args.urls or '{0}.urls'.format(args.project))
+    linter = Linter(site, request=sample_request(args.path), threshold=args.threshold / 1000.0)
+
+    if report(linter, args.count):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -16,6 +16,69 @@ def setup_project(project, expected=False, **kwargs):
     if project_setup:
         project_setup(**kwargs)
 
+########################
+###   PROFILING
+########################
+
+def profile_parser():
+    """Create an argparser for the profile_website subcommand"""
+    import argparse
+    parser = argparse.ArgumentParser(prog="cwf-manager profile_website"
+        , description="Time how long it takes to configure the website and show the slowest places"
+        )
+
+    parser.add_argument("-c", "--count"
+        , help = "How many of the slowest places to show"
+        , type = int
+        , default = 15
+        )
+
+    parser.add_argument("--json"
+        , help = "File to write the whole profile to as json"
+        , default = None
+        )
+
+    parser.add_argument("--collapsed"
+        , help = "File to write the whole profile to as collapsed stacks for flamegraph.pl"
+        , default = None
+        )
+
+    return parser
+
+def profile_website(project, argv):
+    """
+        Set up the project and import it's urls while recording a BootProfile
+        Then print the places with the most time of their own
+    """
+    args = profile_parser().parse_args(argv)
+
+    from cwf.splitter.profiler import BootProfile
+    profile = BootProfile()
+    with profile.recording():
+        setup_project(project)
+
+        # Make sure the urls are made if they haven't been already
+        from django.conf import settings
+        __import__(settings.ROOT_URLCONF, globals(), locals(), ['urlpatterns'], 0)
+
+    print "Took %.2fms" % (profile.root.total * 1000)
+    for own, path, calls in profile.top(args.count):
+        print "  %10.2fms %6s calls : %s" % (own * 1000, calls, path)
+
+    if args.json:
+        profile.dump(args.json, "json")
+    if args.collapsed:
+        profile.dump(args.collapsed, "collapsed")
+
+# Commands cwf-manager handles itself rather than giving to django
+subcommands = {
+      'profile_website' : profile_website
+    }
+
+########################
+###   MANAGER
+########################
+
 def manager(project):
     """
         Custom version of the manage.py script that django provides
@@ -32,6 +95,12 @@ def manager(project):
 
     # Find the project and set DJANGO_SETTINGS_MODULE
     os.environ['DJANGO_SETTINGS_MODULE'] = '{0}.settings'.format(project)
+
+    # Some commands need to be running before the project is setup
+    if len(sys.argv) > 1 and sys.argv[1] in subcommands:
+        subcommands[sys.argv[1]](project, sys.argv[2:])
+        return
+
     setup_project(project)
 
     # Start django
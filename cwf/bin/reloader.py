@@ -0,0 +1,236 @@
+'''
+    Restart the debugger when python files change
+
+    Uses inotify to be told about changes on linux and otherwise looks at the
+    modified time of every file every so often.
+'''
+import subprocess
+import ctypes.util
+import ctypes
+import select
+import struct
+import thread
+import errno
+import time
+import sys
+import os
+
+########################
+###   WATCHERS
+########################
+
+class Watcher(object):
+    '''
+        Finds out when python files we care about change
+
+        These are the files of everything in sys.modules
+        , which includes fakes for files that failed to import
+
+        wait() returns once something has changed and then nothing else has
+        changed for ``settle`` seconds, so saving many files only restarts once
+
+        Subclasses provide ``changes(timeout)``, which waits up to timeout seconds
+        and returns the set of files that changed in that time (empty if none did)
+    '''
+    def __init__(self, interval=1, settle=0.3):
+        self.interval = interval
+        self.settle = settle
+
+    def wait(self):
+        """Block until files have changed and settled and return those files"""
+        changed = set()
+        while True:
+            found = self.changes(self.settle if changed else self.interval)
+            if found:
+                changed.update(found)
+            elif changed:
+                return changed
+
+    def watched_files(self):
+        """Return set of python files for everything in sys.modules"""
+        files = set()
+        for module in sys.modules.values():
+            filename = getattr(module, '__file__', None)
+            if not filename:
+                continue
+
+            if filename.endswith(('.pyc', '.pyo')):
+                filename = filename[:-1]
+            files.add(os.path.abspath(filename))
+        return files
+
+class PollingWatcher(Watcher):
+    '''
+        Watcher that looks at the modified time of every watched file each interval
+
+        Files are remembered the first time they are seen
+        , so only changes after that are noticed
+    '''
+    def __init__(self, *args, **kwargs):
+        super(PollingWatcher, self).__init__(*args, **kwargs)
+        # {filename : mtime}
+        self.mtimes = {}
+
+    def changes(self, timeout):
+        """Wait for timeout seconds and return watched files whose modified time changed"""
+        time.sleep(timeout)
+
+        changed = set()
+        for filename in self.watched_files():
+            try:
+                mtime = os.stat(filename).st_mtime
+            except OSError:
+                # Doesn't exist (anymore), only a change if we've seen it before
+                mtime = None
+
+            old = self.mtimes.get(filename, mtime)
+            self.mtimes[filename] = mtime
+            if old != mtime:
+                changed.add(filename)
+        return changed
+
+class InotifyWatcher(Watcher):
+    '''
+        Watcher that asks linux to tell it when the folders of watched files change
+
+        A change to any python file in those folders counts
+        , so adding a module to a part is noticed as well
+
+        Folders are added as modules from new folders are imported
+    '''
+    IN_MODIFY = 0x2
+    IN_ATTRIB = 0x4
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = 0x80000
+
+    mask = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    event = struct.Struct("iIII")
+
+    def __init__(self, *args, **kwargs):
+        super(InotifyWatcher, self).__init__(*args, **kwargs)
+        self.fd = self.libc().inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "Couldn't start inotify")
+
+        # {watch descriptor : folder}
+        self.folders = {}
+
+    @classmethod
+    def libc(cls):
+        """Memoized libc with the inotify functions, or None if we don't have them"""
+        if not hasattr(cls, '_libc'):
+            cls._libc = None
+            if sys.platform.startswith('linux'):
+                found = ctypes.util.find_library('c')
+                if found:
+                    libc = ctypes.CDLL(found, use_errno=True)
+                    if hasattr(libc, 'inotify_init1'):
+                        cls._libc = libc
+        return cls._libc
+
+    @classmethod
+    def available(cls):
+        """Say whether inotify can be used here"""
+        return cls.libc() is not None
+
+    def close(self):
+        """Stop watching"""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+            self.folders = {}
+
+    def add_folders(self):
+        """Watch the folder of any watched file that isn't watched yet"""
+        watching = set(self.folders.values())
+        for folder in set(os.path.dirname(filename) for filename in self.watched_files()):
+            if folder not in watching and os.path.isdir(folder):
+                descriptor = self.libc().inotify_add_watch(self.fd, folder, self.mask)
+                if descriptor >= 0:
+                    self.folders[descriptor] = folder
+
+    def changes(self, timeout):
+        """Wait up to timeout seconds for inotify events and return python files they are about"""
+        self.add_folders()
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+
+        try:
+            data = os.read(self.fd, 65536)
+        except OSError as error:
+            if error.errno == errno.EAGAIN:
+                return set()
+            raise
+
+        return set(filename for filename in self.filenames_from(data) if filename.endswith('.py'))
+
+    def filenames_from(self, data):
+        """Yield the filenames from a buffer of inotify events"""
+        offset = 0
+        while offset + self.event.size <= len(data):
+            descriptor, _, _, length = self.event.unpack_from(data, offset)
+            offset += self.event.size
+
+            name = data[offset:offset + length].rstrip('\0')
+            offset += length
+
+            if descriptor in self.folders and name:
+                yield os.path.join(self.folders[descriptor], name)
+
+def make_watcher(kind="auto", **kwargs):
+    """
+        Make a watcher of this kind
+        Where auto means inotify if it's available, otherwise polling
+    """
+    if kind == "auto":
+        kind = "inotify" if InotifyWatcher.available() else "poll"
+
+    watchers = {'inotify' : InotifyWatcher, 'poll' : PollingWatcher}
+    if kind not in watchers:
+        raise ValueError("Unknown kind of watcher '%s', choose from %s" % (kind, sorted(watchers.keys())))
+    return watchers[kind](**kwargs)
+
+########################
+###   RELOADING
+########################
+
+# Environment variable that tells the process it is the one to serve from
+run_main = 'CWF_RUN_MAIN'
+
+def run_with_reloader(main_func, kind="auto", **kwargs):
+    """
+        Run main_func in a new process and restart that process whenever a watcher sees a change
+
+        The new process makes the watcher with make_watcher(kind, **kwargs)
+        , runs main_func in a thread and exits with 3 when there is a change
+        , which tells this process to start it again
+    """
+    if os.environ.get(run_main) == 'true':
+        watcher = make_watcher(kind, **kwargs)
+        thread.start_new_thread(main_func, ())
+        try:
+            changed = watcher.wait()
+            print " * Detected change in %s, reloading" % ', '.join(sorted(changed))
+            sys.exit(3)
+        except KeyboardInterrupt:
+            pass
+    else:
+        try:
+            sys.exit(restart_with_reloader())
+        except KeyboardInterrupt:
+            pass
+
+def restart_with_reloader():
+    """Start this program again in a new process until it exits with something other than 3"""
+    while True:
+        print " * Restarting with reloader"
+        environ = dict(os.environ)
+        environ[run_main] = 'true'
+        exit_code = subprocess.call([sys.executable] + sys.argv, env=environ)
+        if exit_code != 3:
+            return exit_code
@@ -0,0 +1,241 @@
+from section_master import SectionMaster
+from pattern_order import plain_url
+from pattern_list import PatternList
+
+import time
+import re
+
+def sample_request(path='/'):
+    """Make a get request for this path by an anonymous user"""
+    from django.contrib.auth.models import AnonymousUser
+    from django.test.client import RequestFactory
+    request = RequestFactory().get(path)
+    request.user = AnonymousUser()
+    return request
+
+########################
+###   LINTER
+########################
+
+class Linter(object):
+    '''
+        Look over a section tree for configuration mistakes and slow parts
+
+        Problems are yielded as (kind, section, message)
+        Timings are measured by calling conditionals and values with a sample request
+    '''
+    conditionals = ('admin', 'active', 'exists', 'display')
+
+    def __init__(self, section, request=None, threshold=0.05):
+        self.section = section
+        self.request = request
+        self.threshold = threshold
+
+        # (section, error) for anything that failed when it was timed
+        self.errors = []
+
+    ########################
+    ###   STRUCTURE
+    ########################
+
+    def problems(self):
+        """Yield (kind, section, message) for everything that looks wrong"""
+        checks = (
+              self.invalid_patterns, self.duplicate_names, self.overlapping_patterns
+            , self.always_false, self.unreachable
+            )
+        for check in checks:
+            for problem in check():
+                yield problem
+
+    def invalid_patterns(self):
+        """Yield problems for patterns that can't be compiled (i.e. the same match used twice in one url)"""
+        for pattern, section in self.patterns:
+            try:
+                re.compile(pattern)
+            except re.error as error:
+                yield 'invalid_pattern', section, "'%s' isn't a valid regex (%s)" % (pattern, error)
+
+    def duplicate_names(self):
+        """Yield problems for url names used by more than one pattern"""
+        seen = {}
+        for pattern, section in self.patterns:
+            name = section.name
+            if name is None:
+                continue
+
+            if name in seen and seen[name] is not section:
+                yield 'duplicate_name', section, "Url name '%s' is already used by %s" % (name, seen[name])
+            else:
+                seen[name] = section
+
+    def overlapping_patterns(self):
+        """
+            Yield problems for patterns that will never be used because an earlier pattern matches first
+
+            A pattern is considered shadowed if an earlier pattern is exactly the same
+            Or if the pattern has no regex special characters and an earlier pattern matches it
+        """
+        earlier = []
+        for pattern, section in self.patterns:
+            sample = plain_url(pattern)
+            for previous, previous_section in earlier:
+                if previous.pattern == pattern:
+                    yield 'duplicate_pattern', section, "'%s' is already used by %s" % (pattern, previous_section)
+                    break
+
+                if sample is not None and previous.match(sample):
+                    yield 'shadowed_pattern', section, "'%s' is matched first by '%s' (%s)" % (
+                        pattern, previous.pattern, previous_section
+                    )
+                    break
+
+            try:
+                earlier.append((re.compile(pattern), section))
+            except re.error:
+                # Already complained about by invalid_patterns
+                pass
+
+    def always_false(self):
+        """Yield problems for conditionals that are hard coded to False"""
+        for section, _ in self.walk():
+            for name in ('active', 'exists', 'display'):
+                if getattr(section.options, name) is False:
+                    yield 'always_false', section, "%s is always False" % name
+
+    def unreachable(self):
+        """
+            Yield problems for sections that have no view and no children with views
+            Only the top most of these sections are complained about
+        """
+        with_patterns = set(id(section) for _, section in self.patterns)
+
+        def has_pattern(section, seen):
+            if id(section) in with_patterns:
+                return True
+            seen.add(id(section))
+            return any(has_pattern(item.section, seen) for item in section.children if id(item.section) not in seen)
+
+        ignore = set()
+        for section, parents in self.walk():
+            if any(id(parent) in ignore for parent in parents):
+                continue
+
+            if not has_pattern(section, set()):
+                ignore.add(id(section))
+                yield 'unreachable', section, "Has no view and no children with views"
+
+    ########################
+    ###   PERFORMANCE
+    ########################
+
+    @property
+    def regex_count(self):
+        """Number of regexes Django will have to go through for these sections"""
+        return len(self.patterns)
+
+    def deepest(self, count=5):
+        """Return [(depth, section), ...] for the deepest sections"""
+        depths = [(len(parents), section) for section, parents in self.walk()]
+        return sorted(depths, key=lambda d: d[0], reverse=True)[:count]
+
+    def slow_values(self):
+        """Return [(seconds, section), ...] for sections whose values take longer than self.threshold"""
+        master = SectionMaster(self.sample_request)
+        path = self.sample_path
+
+        slow = []
+        for section, _ in self.walk():
+            values = section.options.values
+            if not values:
+                continue
+
+            parent_url_parts = master.memoized.url_parts(section.parent)
+            took = self.timed(section, lambda : list(values.get_info(self.sample_request, parent_url_parts, path)))
+            if took > self.threshold:
+                slow.append((took, section))
+
+        return sorted(slow, key=lambda s: s[0], reverse=True)
+
+    def slow_conditionals(self, count=5):
+        """Return [(seconds, section, name), ...] for the slowest callable conditionals"""
+        found = []
+        for section, _ in self.walk():
+            options = section.options
+            for name in self.conditionals:
+                if callable(getattr(options, name)):
+                    took = self.timed(section, lambda : options.conditional(name, self.sample_request))
+                    found.append((took, section, name))
+
+        return sorted(found, key=lambda s: s[0], reverse=True)[:count]
+
+    ########################
+    ###   UTILITY
+    ########################
+
+    @property
+    def patterns(self):
+        """Memoized list of (pattern, section) for each pattern the section tree makes"""
+        if not hasattr(self, '_patterns'):
+            self._patterns = list(self.patterns_for(PatternList(self.section, with_sections=True)))
+        return self._patterns
+
+    def patterns_for(self, pattern_list, prefix=''):
+        """
+            Yield (pattern, section) from a PatternList made with_sections
+            Where patterns from includes are prefixed with the include
+        """
+        for pattern_tuple, section, included in pattern_list:
+            pattern = self.join_patterns(prefix, pattern_tuple[0])
+            if included is None:
+                yield pattern, section
+            else:
+                for found in self.patterns_for(included, pattern):
+                    yield found
+
+    def join_patterns(self, prefix, pattern):
+        """Join an include prefix with a pattern like django's resolver would"""
+        if not prefix:
+            return pattern
+
+        if pattern.startswith('^'):
+            pattern = pattern[1:]
+        return "%s%s" % (prefix, pattern)
+
+    def walk(self):
+        """Yield (section, parents) for every section under self.section"""
+        seen = set()
+        def walk(section, parents):
+            if id(section) in seen:
+                return
+            seen.add(id(section))
+
+            yield section, parents
+            for item in section.children:
+                for found in walk(item.section, parents + [section]):
+                    yield found
+        return walk(self.section, [])
+
+    def timed(self, section, func):
+        """
+            Return how many seconds calling func takes
+            Any error is recorded against the section in self.errors
+        """
+        start = time.time()
+        try:
+            func()
+        except Exception as error:
+            self.errors.append((section, error))
+        return time.time() - start
+
+    @property
+    def sample_request(self):
+        """Request to give to conditionals and values. Defaults to a get for '/' by an anonymous user"""
+        if self.request is None:
+            self.request = sample_request()
+        return self.request
+
+    @property
+    def sample_path(self):
+        """Path of the sample request without leading or trailing slashes"""
+        return self.sample_request.path.strip('/').split('/')
@@ -1,4 +1,6 @@
+from permissions import permissions_for
 from errors import ConfigurationError
+from redirects import redirect_view, RedirectMap
 from dispatch import dispatcher
 
 import inspect
@@ -15,6 +17,9 @@ regexes = {
 
 class Empty(object): pass
 
+# Memoized arguments for each setter function
+setter_args = {}
+
 ########################
 ###   OPTIONS
 ########################
@@ -45,6 +50,13 @@ class Options(object):
         self.redirect = None
         self.extra_context = None
 
+        # Some settings for caching the response from the view
+        # cache_ttl: Seconds to keep a response for. Responses aren't cached if this is None
+        # cache_vary: What other than the path changes the response
+        #   List of 'user', 'GET' or callable(request)
+        self.cache_ttl = None
+        self.cache_vary = None
+
         # Some options for having a section as a django include
         self.app_name = None
         self.namespace = None
@@ -71,10 +83,11 @@ class Options(object):
 
     def setters(self):
         '''Determine each setter method and required args for that method'''
-        for method in ('set_conditionals', 'set_view', 'set_urlname', 'set_menu'):
+        for method in ('set_conditionals', 'set_view', 'set_cache', 'set_urlname', 'set_menu'):
             func = getattr(self, method)
-            required = list(arg for arg in inspect.getargspec(func).args if arg != 'self')
-            yield func, required
+            if func.im_func not in setter_args:
+                setter_args[func.im_func] = [arg for arg in inspect.getargspec(func).args if arg != 'self']
+            yield func, list(setter_args[func.im_func])
 
     def set_everything(self, **kwargs):
         '''
@@ -151,6 +164,25 @@ class Options(object):
                         )
                 setattr(self, name, val)
 
+    def set_cache(self, cache_ttl=Empty, cache_vary=Empty):
+        '''Set options for caching responses from the view'''
+        if cache_ttl is not Empty:
+            if cache_ttl is not None and (type(cache_ttl) not in (int, long, float) or cache_ttl <= 0):
+                raise ConfigurationError(
+                    "cache_ttl must be None or a positive number of seconds, not %s (%s)" % (type(cache_ttl), cache_ttl)
+                    )
+            self.cache_ttl = cache_ttl
+
+        if cache_vary is not Empty:
+            if cache_vary is not None:
+                if type(cache_vary) not in (list, tuple):
+                    raise ConfigurationError("cache_vary must be None, a list or a tuple, not %s (%s)" % (type(cache_vary), cache_vary))
+
+                for vary in cache_vary:
+                    if vary not in ('user', 'GET') and not callable(vary):
+                        raise ConfigurationError("cache_vary items must be 'user', 'GET' or callable(request), not %s" % vary)
+            self.cache_vary = cache_vary
+
     def set_menu(self
         , alias=Empty, match=Empty, values=Empty, needs_auth=Empty
         , propogate_display=Empty, promote_children=Empty
@@ -190,6 +222,8 @@ class Options(object):
             otherwise
               * Prepend with ^
               * And end with /$ if doesn't already end with a slash
+
+            If redirect is a RedirectMap then the pattern matches anything under the section
         '''
         pattern = self.string_from_url_parts(url_parts)
         if pattern is None:
@@ -209,6 +243,12 @@ class Options(object):
             if pattern[-1] != '/':
                 pattern = "%s/$" % pattern
 
+        if isinstance(self.redirect, RedirectMap):
+            # Match everything under this section and let the map decide
+            if pattern.endswith('$'):
+                pattern = pattern[:-1]
+            pattern = "%s.*$" % pattern
+
         return pattern
 
     def string_from_url_parts(self, url_parts):
@@ -265,31 +305,17 @@ class Options(object):
 
     def redirect_view(self, redirect):
         '''
-            Return view to be used for redirection
+            Return the view used for redirection along with kwargs for it
+
+            All sections share the same view and the redirect is put in the kwargs.
             If url is relative, it will make it absolute by joining with request.path
             If no url, a 404 will be raised
         '''
-        from django.views.generic import RedirectView
-        from django.http import Http404
-
-        class Redirector(RedirectView):
-            """Our customization on the redirect view"""
-            def get_redirect_url(self, **kwargs):
-                url = self.url
-                if callable(url):
-                    url = url(self.request)
-
-                if url is None:
-                    raise Http404
-
-                if not url.startswith('/'):
-                    url = '%s%s' % (self.request.path, url)
-                    url = regexes['multiSlash'].sub('/', url)
-
-                return url
-
-        # Return view that redirects, and extra_context
-        return Redirector.as_view(url=redirect), self.extra_context
+        kwargs = {}
+        if self.extra_context:
+            kwargs.update(self.extra_context)
+        kwargs['redirect'] = redirect
+        return redirect_view, kwargs
 
     def get_view_kls(self):
         '''Determine view kls by looking at module and kls'''
@@ -328,7 +354,7 @@ class Options(object):
         if not self.conditional('exists', request) or not self.conditional('active', request):
             # Not active or doesn't exist
             return False
-        return self.has_permissions(request.user)
+        return self.has_permissions(permissions_for(request))
 
     def clone(self, all=False, **kwargs):
         """
@@ -345,7 +371,7 @@ class Options(object):
         else:
             no_propogate = (
                   'alias', 'match', 'values', 'target', 'redirect'
-                , 'promote_children', 'propogate_display'
+                , 'promote_children', 'propogate_display', 'cache_ttl', 'cache_vary'
                 )
 
         # Make sure display doesn't propogate if propogate_display is False
@@ -359,6 +385,21 @@ class Options(object):
         cloned.set_everything(**values)
         return cloned
 
+    def copy(self):
+        """
+            Return a copy of this object with the same options.
+            Behaves like clone(all=True) but doesn't go through the setters
+            because these options have already been validated.
+        """
+        copied = Options()
+        copied.__dict__.update(self.__dict__)
+
+        # Make sure display doesn't propogate if propogate_display is False
+        if not self.propogate_display:
+            copied.display = True
+
+        return copied
+
     ########################
     ###   UTILITY
     ########################
@@ -3,9 +3,17 @@ from django.conf.urls.defaults import include as django_include
 class PatternList(object):
     """
         Encapsulate logic in creating a pattern_list
+
+        profile is passed on to the patterns of included sections
+        so they are ordered by the same {name or pattern : hits}
+
+        If with_sections, then (pattern_tuple, section, included) is yielded instead of each pattern_tuple
+        Where included is a PatternList (also with_sections) for the patterns inside an include, otherwise None
     """
-    def __init__(self, section, stop_at=None, include_as=None, without_include=False):
+    def __init__(self, section, stop_at=None, include_as=None, without_include=False, profile=None, with_sections=False):
         self.section = section
+        self.profile = profile
+        self.with_sections = with_sections
         self.include_as = include_as
         self.without_include = without_include
 
@@ -19,7 +27,9 @@ class PatternList(object):
     def pattern_list(self):
         """Return list of url patterns for this section and its children"""
         for item in self.section.url_children:
-            pattern_list = PatternList(item.section, stop_at=self.stop_at, include_as=item.include_as)
+            pattern_list = PatternList(item.section
+                , stop_at=self.stop_at, include_as=item.include_as, profile=self.profile, with_sections=self.with_sections
+                )
             for pattern_tuple in self.pattern_list_for(item, pattern_list):
                 yield pattern_tuple
 
@@ -36,16 +46,25 @@ class PatternList(object):
         """
         if item.include_as is not None and not self.without_include:
             path, includer_options = pattern_list.pattern_tuple_includer()
-            yield path, django_include(*includer_options)
+            included = None
+            if self.with_sections:
+                included = PatternList(item.section, without_include=True, profile=self.profile, with_sections=True)
+            yield self.found((path, django_include(*includer_options)), item.section, included)
 
         elif item.section is self.section:
             pattern_tuple = pattern_list.pattern_tuple()
             if pattern_tuple:
-                yield pattern_tuple
+                yield self.found(pattern_tuple, item.section)
         else:
             for pattern_tuple in pattern_list:
                 yield pattern_tuple
 
+    def found(self, pattern_tuple, section, included=None):
+        """Return what to yield for a pattern tuple, which depends on self.with_sections"""
+        if not self.with_sections:
+            return pattern_tuple
+        return pattern_tuple, section, included
+
     def pattern_tuple(self):
         """Return arguments for django pattern object for this section"""
         pattern = self.create_pattern(self.determine_url_parts())
@@ -58,7 +77,8 @@ class PatternList(object):
         """Yield path and arguments for django include for this section"""
         path = "^{}/".format(self.include_as)
         options = self.section.url_options
-        return path, (self.section.patterns(without_include=True), options.namespace, options.app_name)
+        patterns = self.section.patterns(without_include=True, profile=self.profile)
+        return path, (patterns, options.namespace, options.app_name)
 
     ########################
     ###   URL UTILITY
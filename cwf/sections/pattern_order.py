@@ -0,0 +1,124 @@
+import heapq
+import re
+
+regexes = {
+      'regex_chars' : re.compile(r'[\\.^$*+?{}\[\]|()]')
+    }
+
+def plain_url(pattern):
+    """Return the only url a pattern can match, or None if it can match more than one"""
+    if not pattern.startswith('^') or not pattern.endswith('$'):
+        return None
+
+    plain = pattern[1:-1]
+    if regexes['regex_chars'].search(plain):
+        return None
+    return plain
+
+class PatternOrder(object):
+    '''
+        Reorder pattern tuples so that patterns that get the most hits are tried first
+
+        profile is a dictionary of {name or pattern : hits}
+
+        Django tries patterns in order, so a pattern may only move in front of
+        an earlier pattern if the two can't match the same url.
+        When we can't tell, the patterns are assumed to overlap and keep their order.
+    '''
+    def __init__(self, profile):
+        self.profile = profile
+
+    def __call__(self, pattern_tuples):
+        return self.ordered(pattern_tuples)
+
+    def ordered(self, pattern_tuples):
+        """
+            Return pattern tuples with hot patterns as early as possible
+
+            Repeatedly takes the pattern with the most hits out of those
+            that have no overlapping pattern before them still waiting to be placed.
+            Patterns with the same hits keep their original order.
+        """
+        pattern_tuples = list(pattern_tuples)
+        patterns = [pattern_tuple[0] for pattern_tuple in pattern_tuples]
+
+        # For each pattern, count how many earlier patterns it must wait for
+        # And remember which later patterns are waiting on it
+        waiting = [0] * len(patterns)
+        blocks = [[] for _ in patterns]
+        for index, pattern in enumerate(patterns):
+            for earlier in range(index):
+                if self.overlaps(patterns[earlier], pattern):
+                    waiting[index] += 1
+                    blocks[earlier].append(index)
+
+        available = [(-self.hits(pattern_tuple), index) for index, pattern_tuple in enumerate(pattern_tuples) if not waiting[index]]
+        heapq.heapify(available)
+
+        result = []
+        while available:
+            _, index = heapq.heappop(available)
+            result.append(pattern_tuples[index])
+            for later in blocks[index]:
+                waiting[later] -= 1
+                if not waiting[later]:
+                    heapq.heappush(available, (-self.hits(pattern_tuples[later]), later))
+
+        return result
+
+    ########################
+    ###   UTILITY
+    ########################
+
+    def hits(self, pattern_tuple):
+        """Get hits for a pattern tuple from the profile using it's pattern or name"""
+        pattern = pattern_tuple[0]
+        if pattern in self.profile:
+            return self.profile[pattern]
+
+        if len(pattern_tuple) > 3 and pattern_tuple[3] in self.profile:
+            return self.profile[pattern_tuple[3]]
+
+        return 0
+
+    def overlaps(self, first, second):
+        """
+            Determine if two patterns might match the same url
+
+            * Two plain patterns only overlap if they're the same
+            * A plain pattern overlaps a regex if the regex matches it
+            * Otherwise they overlap unless their literal beginnings differ
+        """
+        first_plain = plain_url(first)
+        second_plain = plain_url(second)
+
+        if first_plain is not None and second_plain is not None:
+            return first_plain == second_plain
+
+        try:
+            if first_plain is not None:
+                return bool(re.search(second, first_plain))
+
+            if second_plain is not None:
+                return bool(re.search(first, second_plain))
+        except re.error:
+            return True
+
+        first_prefix = self.literal_prefix(first)
+        second_prefix = self.literal_prefix(second)
+        return first_prefix.startswith(second_prefix) or second_prefix.startswith(first_prefix)
+
+    def literal_prefix(self, pattern):
+        """Return the string every url matched by this pattern must begin with"""
+        if not pattern.startswith('^') or '|' in pattern:
+            return ''
+
+        found = regexes['regex_chars'].search(pattern, 1)
+        if not found:
+            return pattern[1:]
+
+        prefix = pattern[1:found.start()]
+        if found.group() in ('?', '*', '{'):
+            # Previous character is optional
+            prefix = prefix[:-1]
+        return prefix
@@ -0,0 +1,77 @@
+########################
+###   PERMISSION RESOLVER
+########################
+
+class PermissionResolver(object):
+    '''
+        Answer permission checks for a single request from one fetch of the user's permissions
+
+        Behaves like request.user as far as Options.has_permissions
+        and ButtonWrap.has_permissions are concerned
+    '''
+    def __init__(self, user):
+        self.user = user
+
+        # checks: Number of has_perm questions asked of the resolver
+        # answered: Number of those checks answered from the fetched permissions
+        # backend_calls: Number of times we went to the user for permissions
+        # requested: Every permission that has been asked about
+        self.checks = 0
+        self.answered = 0
+        self.backend_calls = 0
+        self.requested = set()
+
+        self._permissions = None
+
+    @property
+    def is_superuser(self):
+        return self.user.is_superuser
+
+    def is_authenticated(self):
+        return self.user.is_authenticated()
+
+    def has_perm(self, perm):
+        """
+            Determine if the user has this permission
+            Mirrors django's User.has_perm but uses self.permissions rather than asking the backend
+        """
+        self.checks += 1
+        self.requested.add(perm)
+
+        user = self.user
+        if not user.is_active:
+            return False
+
+        if user.is_superuser:
+            return True
+
+        self.answered += 1
+        return perm in self.permissions
+
+    @property
+    def permissions(self):
+        """Lazily get all the user's permissions in one call"""
+        if self._permissions is None:
+            self.backend_calls += 1
+            self._permissions = frozenset(self.user.get_all_permissions())
+        return self._permissions
+
+    @property
+    def saved(self):
+        """
+            Number of calls to the backend that were avoided
+            Checks for inactive users and superusers never need the backend and so don't count
+        """
+        return max(0, self.answered - self.backend_calls)
+
+    def __repr__(self):
+        return "<PermissionResolver {}|:|checks:{}|:|saved:{}>".format(self.user, self.checks, self.saved)
+
+def permissions_for(request):
+    """
+        Get the PermissionResolver for this request
+        It is created and put on request.permissions the first time it is asked for
+    """
+    if not hasattr(request, 'permissions'):
+        request.permissions = PermissionResolver(request.user)
+    return request.permissions
@@ -0,0 +1,104 @@
+'''
+    View shared by every section that redirects
+    And a map for redirecting many paths with one section
+'''
+from django.http import HttpResponsePermanentRedirect, Http404
+from django.utils.http import urlencode
+
+import csv
+
+def redirect_view(request, redirect=None, **kwargs):
+    """
+        Permanently redirect to the redirect given in the kwargs for the url pattern
+
+        redirect may be a callable that takes in the request.
+        If there is no redirect then a 404 is raised.
+
+        Redirects that don't start with a slash or a scheme are relative to request.path
+    """
+    url = redirect
+    if callable(url):
+        url = url(request)
+
+    if url is None:
+        raise Http404
+
+    if not url.startswith('/') and '://' not in url:
+        from cwf.views.redirect_address import strip_multi_slashes
+        url = strip_multi_slashes('%s%s' % (request.path, url))
+
+    return HttpResponsePermanentRedirect(url)
+
+########################
+###   REDIRECT MAP
+########################
+
+class RedirectMap(object):
+    '''
+        Redirects for many exact paths, looked up in a dictionary
+
+        Use as the ``redirect`` option for a section and that section will have
+        one url pattern that matches everything under it.
+
+        redirects: {old path : new address}
+        carry_get: If GET parameters from the request should be added to the new address
+        ignore_get: List of GET parameters to leave out if carry_get is True
+
+        Trailing slashes are ignored when matching paths.
+    '''
+    def __init__(self, redirects=None, carry_get=False, ignore_get=None):
+        self.carry_get = carry_get
+        self.ignore_get = ignore_get
+
+        self.redirects = {}
+        if redirects:
+            self.update(redirects)
+
+    @classmethod
+    def from_csv(kls, location, **kwargs):
+        """
+            Make a RedirectMap from a csv file (or a filename) of ``old path,new address`` rows
+            Rows without both values are ignored
+        """
+        if isinstance(location, basestring):
+            with open(location, 'rb') as fle:
+                return kls.from_csv(fle, **kwargs)
+
+        redirects = [row[:2] for row in csv.reader(location) if len(row) >= 2 and row[0] and row[1]]
+        return kls(redirects, **kwargs)
+
+    def update(self, redirects):
+        """Add {old path : new address} or [(old path, new address), ...] to the map"""
+        if hasattr(redirects, 'items'):
+            redirects = redirects.items()
+
+        for old, new in redirects:
+            self.redirects[self.normalise(old)] = new
+
+    def normalise(self, path):
+        """Make sure path has a leading slash and no trailing slash"""
+        return '/%s' % path.strip().strip('/')
+
+    @property
+    def count(self):
+        """
+            Number of paths in the map
+
+            Not __len__ because an empty map must still be true, so sections using it still get a pattern
+        """
+        return len(self.redirects)
+
+    def __call__(self, request):
+        """
+            Return new address for request.path_info or None if there isn't one
+            path_info is used so the map doesn't care where the site is deployed
+        """
+        new = self.redirects.get(self.normalise(request.path_info))
+        if new is None or not self.carry_get or not request.GET:
+            return new
+
+        from cwf.views.redirect_address import RedirectAddress
+        params = RedirectAddress(request, new, carry_get=True, ignore_get=self.ignore_get).params
+        if not params:
+            return new
+        return "%s?%s" % (new, urlencode(params, doseq=True))
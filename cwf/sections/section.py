@@ -2,7 +2,9 @@ from django.conf.urls.defaults import patterns as django_patterns
 from django.http import Http404
 from functools import wraps
 
+from permissions import permissions_for
 from errors import ConfigurationError
+from pattern_order import PatternOrder
 from pattern_list import PatternList
 from dispatch import dispatcher
 from options import Options
@@ -46,6 +48,15 @@ class Section(object):
         self._pattern = None
         self._options = None
 
+        # _version: Changes to this section and everything under it
+        # _own_version: Changes to this section alone (affects everything under it)
+        # _cache: Values memoized by self.cached along with the stamp they were made with
+        # _listeners: Callables to notify when this section or something under it changes
+        self._version = 0
+        self._own_version = 0
+        self._cache = {}
+        self._listeners = []
+
     ########################
     ###   USAGE
     ########################
@@ -81,6 +92,7 @@ class Section(object):
             Without the positional argument at the beginning, the first line can't have a comma
         """
         self.options.set_everything(**kwargs)
+        self.changed(own=True)
         return self
 
     ########################
@@ -131,6 +143,7 @@ class Section(object):
         for item in section._children:
             self._children.append(item.clone(parent=self))
 
+        self.changed()
         return self
 
     def add_child(self, section, first=False, **options):
@@ -145,6 +158,33 @@ class Section(object):
             self._base = new_item
         else:
             self._children.append(new_item)
+
+        self.changed()
+        return section
+
+    def remove(self, section):
+        """
+            Remove a section from _base or _children and forget we are it's parent
+            Complain if the section isn't a child of this section
+        """
+        found = False
+        if self._base and self._base.section is section:
+            self._base = None
+            found = True
+
+        children = [item for item in self._children if item.section is not section]
+        if len(children) != len(self._children):
+            self._children = children
+            found = True
+
+        if not found:
+            raise ConfigurationError("%s is not a child of %s" % (section, self))
+
+        # So changes to the removed section aren't passed on to us anymore
+        if section.parent is self:
+            section.parent = None
+
+        self.changed()
         return section
 
     def copy(self, section, first=False, **kwargs):
@@ -272,10 +312,21 @@ class Section(object):
     ###   URL PATTERNS
     ########################
 
-    def patterns(self, without_include=False):
-        """Get urlpatterns for this section"""
-        tuples = list(PatternList(self, without_include=without_include))
-        return django_patterns('', *tuples)
+    def patterns(self, without_include=False, profile=None):
+        """
+            Get urlpatterns for this section
+            If a profile of {name or pattern : hits} is given, use it to put the most used patterns first
+
+            The patterns are remade only when this section, something under it or an ancestor changes
+        """
+        def make():
+            tuples = list(PatternList(self, without_include=without_include, profile=profile))
+            if profile:
+                tuples = PatternOrder(profile).ordered(tuples)
+            return django_patterns('', *tuples)
+
+        key = ('patterns', without_include, tuple(sorted(profile.items())) if profile else None)
+        return list(self.cached(key, make))
 
     def make_view(self, view, section):
         """
@@ -292,6 +343,67 @@ class Section(object):
             return view(request, *args, **kwargs)
         return view_wrap
 
+    ########################
+    ###   CHANGES
+    ########################
+
+    @property
+    def version(self):
+        """Number of changes made to this section and everything under it"""
+        return self._version
+
+    @property
+    def stamp(self):
+        """
+            Identify the current state of everything that affects this section
+            That is any change under this section, and changes to the ancestors themselves
+        """
+        return (self._version, ) + tuple((id(ancestor), ancestor._own_version) for ancestor in self.ancestors())
+
+    def cached(self, key, maker):
+        """
+            Return memoized result of maker() for this key
+            Will call maker again if the stamp of this section has changed since it was last called
+        """
+        stamp = self.stamp
+        found = self._cache.get(key)
+        if found is None or found[0] != stamp:
+            found = self._cache[key] = (stamp, maker())
+        return found[1]
+
+    def listen(self, callback):
+        """
+            Call callback(section) whenever this section or anything under it changes
+            Where section is the section that changed
+        """
+        self._listeners.append(callback)
+        return callback
+
+    def changed(self, own=False):
+        """
+            Record a change to this section
+            If own, then the change is to this section itself and not only to it's children
+
+            Versions of this section and it's ancestors are incremented
+            and any listeners on them are told about the change.
+        """
+        if own:
+            self._own_version += 1
+
+        for section in [self] + list(self.ancestors()):
+            section._version += 1
+            for listener in section._listeners:
+                listener(self)
+
+    def ancestors(self):
+        """Yield each parent up to the root ancestor"""
+        parents = []
+        result = self
+        while result.parent and result.parent not in parents and result.parent is not self:
+            parents.append(result.parent)
+            result = result.parent
+            yield result
+
     ########################
     ###   UTILITY
     ########################
@@ -305,7 +417,7 @@ class Section(object):
             if attr not in kwargs:
                 kwargs[attr] = getattr(self, attr)
         new = Section(**kwargs)
-        new.options = self.options.clone(all=True)
+        new.options = self.options.copy()
         return new
 
     def root_ancestor(self):
@@ -327,5 +439,5 @@ class Section(object):
         """Determine if we can display this section"""
         options = self.options
         can_display = options.conditional('display', request)
-        has_permissions = options.has_permissions(request.user)
+        has_permissions = options.has_permissions(permissions_for(request))
         return has_permissions and can_display, options.propogate_display
@@ -1,5 +1,5 @@
-import __builtin__
-import inspect
+import marshal
+import struct
 import types
 import sys
 import imp
@@ -21,7 +21,8 @@ def steal(*filenames, **kwargs):
           * folder : Folder where the files are
         It Will complain if neither folder, globals or locals are specified
 
-        Variables are stolen using execfile
+        Variables are stolen by executing the code in each file
+        The code is compiled once and cached by stolen_code
     """
     lcls = kwargs.get('locals', None)
     glbls = kwargs.get('globals', None)
@@ -35,7 +36,96 @@ def steal(*filenames, **kwargs):
     # Exec the specified files into the globals and locals provided
     for filename in filenames:
         location = os.path.join(folder, "%s.py" % filename)
-        execfile(location, glbls, lcls)
+        exec stolen_code(location) in glbls, lcls
+
+class CodeCache(object):
+    """
+        Compiled code for files that are stolen from
+
+        Code is kept in memory and in __pycache__/<name>.steal.pyc next to the file
+        And is only compiled again when the mtime or size of the file changes
+    """
+    magic = imp.get_magic()
+    header = struct.Struct("<II")
+
+    def __init__(self):
+        # {location : (mtime, size, code)}
+        self.memory = {}
+
+    def __call__(self, location):
+        """Get code for this location from memory, then disk, otherwise compile it"""
+        stat = os.stat(location)
+        key = (int(stat.st_mtime) & 0xFFFFFFFF, stat.st_size & 0xFFFFFFFF)
+
+        found = self.memory.get(location)
+        if found and found[:2] == key:
+            return found[2]
+
+        code = self.load(location, key)
+        if code is None:
+            code = self.compile(location)
+            self.save(location, key, code)
+
+        self.memory[location] = key + (code, )
+        return code
+
+    def compile(self, location):
+        """Compile the code in a file"""
+        with open(location, 'rU') as fle:
+            source = fle.read()
+        return compile(source, location, 'exec', 0, True)
+
+    def cache_location(self, location):
+        """Where the code for this location is cached on disk"""
+        folder, filename = os.path.split(location)
+        return os.path.join(folder, '__pycache__', '%s.steal.pyc' % os.path.splitext(filename)[0])
+
+    def load(self, location, key):
+        """Get code from the disk cache if it was made from a file with the same mtime and size"""
+        try:
+            with open(self.cache_location(location), 'rb') as fle:
+                data = fle.read()
+        except IOError:
+            return None
+
+        start = len(self.magic)
+        end = start + self.header.size
+        if data[:start] != self.magic or self.header.unpack(data[start:end]) != key:
+            return None
+
+        try:
+            return marshal.loads(data[end:])
+        except (EOFError, ValueError, TypeError):
+            return None
+
+    def save(self, location, key, code):
+        """
+            Write code to the disk cache
+            Unless sys.dont_write_bytecode, and ignoring any problems with writing
+        """
+        if sys.dont_write_bytecode:
+            return
+
+        cache_location = self.cache_location(location)
+        tmp_location = "%s.%s.tmp" % (cache_location, os.getpid())
+        try:
+            folder = os.path.dirname(cache_location)
+            if not os.path.exists(folder):
+                os.makedirs(folder)
+
+            with open(tmp_location, 'wb') as fle:
+                fle.write(self.magic)
+                fle.write(self.header.pack(*key))
+                fle.write(marshal.dumps(code))
+
+            # Rename so other processes never see half a file
+            os.rename(tmp_location, cache_location)
+        except (IOError, OSError):
+            if os.path.exists(tmp_location):
+                os.remove(tmp_location)
+
+# Used by steal to get code for each file
+stolen_code = CodeCache()
 
 ########################
 ###   INJECTING VARIABLES
@@ -63,7 +153,50 @@ def inject(obj, *names):
         raise Exception("Need atleast one name to inject the object into")
 
     # Inject!
-    sys.meta_path.append(FileFaker(names, obj))
+    injected.add(FileFaker(names, obj))
+    injected.install()
+
+class InjectedModules(object):
+    """
+        The one finder on sys.meta_path for everything that has been injected
+
+        Finding a module is a single dictionary lookup on the name being imported
+        , so imports that have nothing to do with inject don't pay for every
+        FileFaker that has been made.
+    """
+    def __init__(self):
+        # {fullname : FileFaker}
+        self.fakers = {}
+
+    def add(self, faker):
+        """Register a FileFaker for each of it's names, replacing any previous faker for those names"""
+        for name in faker.names:
+            self.fakers[name] = faker
+
+    def install(self):
+        """Put this finder on sys.meta_path if it isn't already there"""
+        if self not in sys.meta_path:
+            sys.meta_path.append(self)
+
+    def find_module(self, fullname, path=None):
+        """Return the FileFaker for this name, or None if it wasn't injected"""
+        return self.fakers.get(fullname)
+
+    def invalidate(self, *names):
+        """
+            Make the fakers for these names (or every name if none are given)
+            resolve their value again and remove their modules from sys.modules
+            So the next import of those names loads them again
+        """
+        if not names:
+            names = self.fakers.keys()
+
+        for name in names:
+            if name in self.fakers:
+                self.fakers[name].invalidate()
+                sys.modules.pop(name, None)
+
+injected = InjectedModules()
 
 class FileFaker(object):
     """
@@ -83,53 +216,57 @@ class FileFaker(object):
         """Create and return a module"""
         path, filename = self.path_from_fullname(fullname)
 
-        # Get the existing module or create a new one (for reload to work)
-        module = sys.modules.setdefault(fullname, imp.new_module(fullname))
+        vals = self.value
+        module = self.module_for(fullname, vals)
         module.__file__ = os.path.join(path, '%s.py' % filename)
         module.__loader__ = self
 
         # Populate the module namespace with the injected attributes
-        vals = self.value
+        # Modules are proxied rather than copied
         if type(vals) is dict:
             module.__dict__.update(vals)
-        else:
+        elif not isinstance(module, ModuleProxy):
             module.__dict__['value'] = vals
 
         return module
 
-    @property
-    def value(self):
-        """
-            Get a value from the one on on the class
-            If it is callable, call it first
-            Then normalize it with self.normalize_value
-        """
-        value = self._value
-        if callable(value):
-            value = value()
-        return self.normalize_value(value)
-
-    def normalize_value(self, value):
+    def module_for(self, fullname, value):
         """
-            If the argument is a module:
-                return the module's dictionary filtered by the module's __all__ attribute
-            otherwise:
-                return the argument as-is.
+            Get the module to put the value into and make sure it's in sys.modules
 
-            If the module doesn't have an __all__ attribute
-            , use all the attributes that don't begin with a double underscore.
+            If value is a module, then a ModuleProxy for it
+            Otherwise the existing module or a new one (for reload to work)
         """
+        module = sys.modules.get(fullname)
         if isinstance(value, types.ModuleType):
-            if hasattr(value, '__all__'):
-                keys = value.__all__
+            if isinstance(module, ModuleProxy):
+                module.__source__ = value
             else:
-                key_filter = lambda k: not k.startswith('__')
-                keys = filter(key_filter, value.__dict__.keys())
+                module = ModuleProxy(fullname, value)
+        elif module is None or isinstance(module, ModuleProxy):
+            module = imp.new_module(fullname)
 
-            # Make a dictionary from the keys we care about
-            value = {key:getattr(value, key) for key in keys}
+        sys.modules[fullname] = module
+        return module
 
-        return value
+    @property
+    def value(self):
+        """
+            Get the value we are injecting
+            If it is callable, it is called the first time it is asked for
+            And the result is remembered until invalidate is called
+        """
+        if not hasattr(self, '_resolved'):
+            value = self._value
+            if callable(value):
+                value = value()
+            self._resolved = value
+        return self._resolved
+
+    def invalidate(self):
+        """Forget the resolved value so the next load gets it again"""
+        if hasattr(self, '_resolved'):
+            del self._resolved
 
     def path_from_fullname(self, fullname):
         """Get path and filename from looking at the fullname used to import this module"""
@@ -143,45 +280,122 @@ class FileFaker(object):
             path = sys.modules[package].__path__[0]
         return path, filename
 
+class ModuleProxy(types.ModuleType):
+    """
+        Module that gets attributes from another module when they are asked for
+        Rather than copying the other module's namespace
+
+        Only names in the source module's __all__ are available
+        , or if it has no __all__, all the names that don't begin with a double underscore.
+    """
+    def __init__(self, name, source):
+        super(ModuleProxy, self).__init__(name)
+        self.__source__ = source
+
+    def __getattr__(self, key):
+        """Only called for names not already on the proxy"""
+        if self.exposes(key):
+            try:
+                return getattr(self.__source__, key)
+            except AttributeError:
+                pass
+        raise AttributeError("'%s' module has no attribute '%s'" % (self.__name__, key))
+
+    @property
+    def __all__(self):
+        """Names that are available from the source module"""
+        source = self.__source__
+        if hasattr(source, '__all__'):
+            return list(source.__all__)
+        return [key for key in source.__dict__.keys() if self.exposes(key)]
+
+    def exposes(self, key):
+        """Say whether this name from the source module should be available"""
+        source = self.__dict__['__source__']
+        if hasattr(source, '__all__'):
+            return key in source.__all__
+        return not key.startswith('__')
+
 ########################
 ###   FAILED IMPORTS
 ########################
 
+class FailedImport(object):
+    """Put into sys.modules for a file that failed to import so reloaders still watch it"""
+    def __init__(self, filename):
+        self.__file__ = filename
+
+    def __repr__(self):
+        return "<FailedImport {}>".format(self.__file__)
+
+class FailedImports(object):
+    """
+        Records files that failed to import by looking at the traceback of the error
+
+        Nothing is done when imports work
+        , we only look at exceptions that reach sys.excepthook or django's got_request_exception
+
+        Each file gets a FailedImport in sys.modules under "<prefix><filename>"
+        So it doesn't get in the way of importing the module when it's fixed
+    """
+    prefix = "cwf.failed_import:"
+
+    def __init__(self):
+        self.files = set()
+        self.installed = False
+
+    def install(self):
+        """Start looking at uncaught exceptions and exceptions from requests"""
+        if self.installed:
+            return
+        self.installed = True
+
+        original_excepthook = sys.excepthook
+        def excepthook(*exc_info):
+            self.record(*exc_info)
+            original_excepthook(*exc_info)
+        sys.excepthook = excepthook
+
+        from django.core.signals import got_request_exception
+        got_request_exception.connect(self.request_exception, weak=False, dispatch_uid="cwf.failed_imports")
+
+    def request_exception(self, sender, **kwargs):
+        """Receiver for got_request_exception, which is sent while the exception is being handled"""
+        self.record(*sys.exc_info())
+
+    def record(self, exc_type, exc_value, tb):
+        """Add a FailedImport for every file in this error that failed to import"""
+        for filename in self.failed_files(exc_value, tb):
+            if filename not in self.files:
+                self.files.add(filename)
+                sys.modules["%s%s" % (self.prefix, filename)] = FailedImport(filename)
+
+    def failed_files(self, exc_value, tb):
+        """
+            Yield files that failed to import
+
+            That is the file of a SyntaxError and the file of every module level frame
+            for a module that isn't in sys.modules (python removes modules that fail to import)
+        """
+        if isinstance(exc_value, SyntaxError) and exc_value.filename:
+            if os.path.exists(exc_value.filename):
+                yield exc_value.filename
+
+        while tb is not None:
+            frame = tb.tb_frame
+            if frame.f_code.co_name == '<module>' and sys.modules.get(frame.f_globals.get('__name__')) is None:
+                filename = frame.f_code.co_filename
+                if os.path.exists(filename):
+                    yield filename
+            tb = tb.tb_next
+
+# Used by install_failed_import_handler
+failed_imports = FailedImports()
+
 def install_failed_import_handler():
     """
-        Custom __import__ function that records failed imports
+        Record failed imports with failed_imports
         Useful if say you're using werkzeug auto reloader
         This way, failed imports are still checked for changes
     """
-    original_import = __builtin__.__import__
-
-    def new_import(name, *args, **kwargs):
-        # Naively cope with the situation where this is called as a method
-        if type(name) not in (str, unicode) and len(args) > 0:
-            args = list(args)
-            name = args.pop(0)
-
-        failed = None
-        try:
-            return original_import(name, *args, **kwargs)
-
-        except SyntaxError, s:
-            # Record failed import and propogate error
-            failed = (name, s.filename)
-            raise
-
-        except Exception, i:
-            if not isinstance(i, ImportError):
-                # ImportError is probably a legitimate fail
-                failed = (name, inspect.trace()[-1][1])
-            raise
-
-        finally:
-            if failed:
-                # Import failed, put in fake module so that werkzeug knows to see if it's been changed
-                name, filename = failed
-                sys.modules[name] = type('FailedImport', (object, ), {'__file__' : filename})
-
-    # Make sure we don't override our custom handler
-    if __builtin__.__import__.__name__ == '__import__':
-        __builtin__.__import__ = new_import
+    failed_imports.install()
@@ -0,0 +1,104 @@
+'''
+    Admin modules that aren't imported until the admin is used
+
+    See :ref:`splitter_lazy_admin`
+'''
+import threading
+
+class LazyAdmin(object):
+    '''
+        Holds callables that load admin modules and calls them
+        the first time the admin urls are needed
+
+        This happens when the admin site's get_urls is called (i.e. via admin.site.urls)
+        or when this object is iterated as urlpatterns (i.e. via include(lazy_admin.urls))
+
+        Use include(lazy_admin.urls) instead of include(admin.site.urls) so that
+        loading the admin waits until a url under it is resolved.
+    '''
+    def __init__(self, site=None):
+        self._site = site
+        self.loaders = []
+        self.loaded = False
+        self.lock = threading.RLock()
+
+    @property
+    def site(self):
+        """The admin site to hook into, defaults to django.contrib.admin.site"""
+        if self._site is None:
+            from django.contrib.admin import site
+            self._site = site
+        return self._site
+
+    def add(self, loader):
+        """Call loader when the admin is needed and make sure the admin site knows to ask us"""
+        with self.lock:
+            if self.loaded:
+                loader()
+            else:
+                self.loaders.append(loader)
+
+            # The new loader may register more admin, so get the urls again
+            if hasattr(self, '_patterns'):
+                del self._patterns
+        self.install()
+
+    def install(self):
+        """Make the admin site's get_urls load the admin first"""
+        site = self.site
+        if getattr(site.get_urls, 'lazy_admin', None) is self:
+            return
+
+        original = site.get_urls
+        def get_urls():
+            self.load()
+            return original()
+        get_urls.lazy_admin = self
+        site.get_urls = get_urls
+
+    def load(self):
+        """Call all the loaders if they haven't been called yet"""
+        if self.loaded:
+            return
+
+        with self.lock:
+            while self.loaders:
+                # Only forget a loader once it has worked
+                self.loaders[0]()
+                self.loaders.pop(0)
+            self.loaded = True
+
+    ########################
+    ###   URLS
+    ########################
+
+    @property
+    def urls(self):
+        """Same as admin.site.urls, except the patterns aren't made until they're used"""
+        return self, self.site.app_name, self.site.name
+
+    @property
+    def patterns(self):
+        """
+            Load the admin and get the urls from the admin site
+
+            Memoized because the resolver iterates over these on every resolve
+            and get_urls makes them from scratch each time
+        """
+        if not hasattr(self, '_patterns'):
+            with self.lock:
+                if not hasattr(self, '_patterns'):
+                    self._patterns = self.site.get_urls()
+        return self._patterns
+
+    def __iter__(self):
+        return iter(self.patterns)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def __getitem__(self, index):
+        return self.patterns[index]
+
+# Used by Website for parts that defer their admin
+lazy_admin = LazyAdmin()
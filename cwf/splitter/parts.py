@@ -1,6 +1,13 @@
+from cwf.sections.errors import ConfigurationError
 from cwf.sections.section import Section
 from imports import inject
+
+from multiprocessing.pool import ThreadPool
+import threading
+import weakref
+import time
 import imp
+import os
 
 ########################
 ###   PARTS
@@ -11,18 +18,24 @@ class Parts(object):
         Object that holds Part objects
         Has methods for getting models, admin or site from the parts
     """
-    def __init__(self, package, *parts):
+    def __init__(self, package, *parts, **kwargs):
         self.parts = parts
         self.package = package
 
+        # Number of threads to scan the part folders with, or None to scan them as they're needed
+        self.workers = kwargs.get("workers", None)
+
+        # {part : {'import' : seconds, 'scan' : seconds, 'models' : seconds, ...}}
+        self.timings = {}
+
     ########################
     ###   USAGE
     ########################
 
     def load_admin(self, active_only=False):
         """Load all the admin.py files in each part so that they can register with the admin"""
-        for part in self.each_part(active_only):
-            part.load("admin")
+        for part in self.each_part(active_only, ordered=True):
+            self.timed(part, "admin", part.load, "admin")
 
     def models(self, active_only=False):
         """
@@ -30,8 +43,8 @@ class Parts(object):
             Doesn't care about duplicate model names
         """
         result = {}
-        for part in self.each_part(active_only):
-            models = part.load("models")
+        for part in self.each_part(active_only, ordered=True):
+            models = self.timed(part, "models", part.load, "models")
             if hasattr(models, '__all__'):
                 for thing in models.__all__:
                     if type(thing) not in (str, unicode):
@@ -41,14 +54,25 @@ class Parts(object):
                         result[thing] = getattr(models, thing)
         return result
 
-    def urls(self, active_only=True, include_defaults=False):
+    def urls(self, active_only=True, include_defaults=False, profile=None):
         """
             Get a an object that holds the sections from each part
             Along with urlpatterns from this site
             and optionally everything in django.conf.urls.defaults
+
+            The site is only made once for each value of active_only
+
+            profile is passed into site.patterns to put the most used patterns first
         """
-        site = self.site(self.package, active_only)
-        urls = {'site' : site, 'urlpatterns' : site.patterns()}
+        if not hasattr(self, '_sites'):
+            self._sites = {}
+
+        # Keep the site so changes made to it after it's made are in the next urlpatterns
+        if active_only not in self._sites:
+            self._sites[active_only] = self.site(self.package, active_only)
+
+        site = self._sites[active_only]
+        urls = {'site' : site, 'urlpatterns' : site.patterns(profile=profile)}
         if include_defaults:
             self.add_url_defaults(urls)
         return urls
@@ -64,19 +88,87 @@ class Parts(object):
             self.import_parts()
         return self.parts
 
-    def each_part(self, active_only=False):
+    def each_part(self, active_only=False, ordered=False):
         """
             An iter that determines whether to go through all sections
             or just those that are "active"
+
+            If ordered, then parts come in self.import_order rather than the order they were given
         """
-        for part in self.imported_parts:
+        parts = self.imported_parts
+        if ordered:
+            parts = self.import_order
+
+        for part in parts:
             if not active_only or part.active:
                 yield part
 
     def import_parts(self):
-        """Import all the parts"""
-        for part in self.parts:
-            part.do_import(self.package)
+        """
+            Import all the parts in self.import_order
+            And scan their folders at the same time if we have workers
+        """
+        for part in self.import_order:
+            self.timed(part, "import", part.do_import, self.package)
+
+        if self.workers:
+            self.scan_parts()
+
+    def scan_parts(self):
+        """
+            Make the manifest for every part in a pool of self.workers threads
+
+            Only the folders are listed in the threads, the modules themselves
+            are still imported one at a time because of python's import lock
+        """
+        threads = ThreadPool(self.workers)
+        try:
+            threads.map(lambda part: self.timed(part, "scan", manifest_for, part.pkg), self.parts)
+        finally:
+            threads.close()
+            threads.join()
+
+    @property
+    def import_order(self):
+        """
+            Memoized list of self.parts in the order they should be imported
+            Parts keep the order they were given, except a part comes after any parts named in it's ``after``
+        """
+        if not hasattr(self, '_import_order'):
+            by_label = dict((part.label, part) for part in self.parts)
+            order = []
+            visiting = []
+
+            def visit(part):
+                if part in order:
+                    return
+
+                if part in visiting:
+                    cycle = [p.label for p in visiting[visiting.index(part):]] + [part.label]
+                    raise ConfigurationError("Parts can't come after each other (%s)" % ' -> '.join(cycle))
+
+                visiting.append(part)
+                for label in part.after:
+                    if label not in by_label:
+                        raise ConfigurationError("Part %s comes after %s, which isn't a part of %s" % (
+                            part.label, label, self.package
+                        ))
+                    visit(by_label[label])
+                visiting.pop()
+                order.append(part)
+
+            for part in self.parts:
+                visit(part)
+            self._import_order = order
+        return self._import_order
+
+    def timed(self, part, name, func, *args):
+        """Call func with args and record how long it took in self.timings[part][name]"""
+        start = time.time()
+        try:
+            return func(*args)
+        finally:
+            self.timings.setdefault(part, {})[name] = time.time() - start
 
     def site(self, name, active_only):
         """
@@ -85,9 +177,12 @@ class Parts(object):
         """
         site = Section(name).configure(promote_children=True)
         for part in self.each_part(active_only):
-            urls = part.load("urls")
+            urls = self.timed(part, "urls", part.load, "urls")
             if urls and hasattr(urls, 'section'):
                 site.add_child(urls.section, **part.kwargs)
+
+                # The part's section isn't given the site as a parent, so tell the site when it changes
+                forward_changes(urls.section, site)
         return site
 
     def add_url_defaults(self, urls):
@@ -106,6 +201,12 @@ class Part(object):
     def __init__(self, name, active=True, **kwargs):
         self.name = name
         self.active = active
+
+        # Labels of the parts that must be imported before this one
+        self.after = kwargs.pop('after', ())
+        if type(self.after) in (str, unicode):
+            self.after = (self.after, )
+
         self.kwargs = kwargs
 
         # Add include_as if there is none already
@@ -113,6 +214,13 @@ class Part(object):
             if not kwargs.get('first'):
                 kwargs['include_as'] = self.name
 
+    @property
+    def label(self):
+        """Name other parts use to refer to this part"""
+        if type(self.name) in (str, unicode):
+            return self.name
+        return self.name.__name__.split('.')[-1]
+
     def do_import(self, package):
         """Get the package we are representing"""
         if type(self.name) not in (str, unicode):
@@ -130,21 +238,131 @@ class Part(object):
         """Get a module from this package"""
         if not hasattr(self.pkg, name):
             # If it doesn't know about it, perhaps we need to import it
-            try:
-                imp.find_module(name, self.pkg.__path__)
-                found_module = True
-            except ImportError:
-                found_module = False
+            manifest = manifest_for(self.pkg)
+            if manifest is not None and manifest.complete:
+                # Only look inside a folder that may be a package the first time we're asked about it
+                # Locked because parts may be loaded from many threads
+                with manifest.lock:
+                    if name in manifest.candidates:
+                        path = manifest.candidates.pop(name)
+                        if manifest.is_package(path, name):
+                            manifest.modules.add(name)
 
-            try:
-                __import__(self.pkg.__name__, globals(), locals(), [name], -1)
-            except ImportError as error:
-                if found_module:
-                    # A module was found, complain that we can't load this thing
-                    raise
-                else:
-                    # We don't care if there isn't anything to import
-                    pass
+                # We know from the manifest if there is anything to import
+                # And want errors from importing it to propagate
+                if name in manifest:
+                    __import__(self.pkg.__name__, globals(), locals(), [name], -1)
+            else:
+                self.import_module(name)
 
         if hasattr(self.pkg, name):
             return getattr(self.pkg, name)
+
+    def import_module(self, name):
+        """Import a module from this package without a manifest"""
+        try:
+            imp.find_module(name, self.pkg.__path__)
+            found_module = True
+        except ImportError:
+            found_module = False
+
+        try:
+            __import__(self.pkg.__name__, globals(), locals(), [name], -1)
+        except ImportError as error:
+            if found_module:
+                # A module was found, complain that we can't load this thing
+                raise
+            else:
+                # We don't care if there isn't anything to import
+                pass
+
+########################
+###   SITE CHANGES
+########################
+
+# {part section : WeakSet of sites it's in}
+# Weak so sites that are no longer used can be freed
+part_sites = weakref.WeakKeyDictionary()
+
+def forward_changes(section, site):
+    """
+        Make changes to a part's section mark the site as changed
+
+        Only one listener is added to each section, no matter how many sites it's in
+        And it doesn't keep those sites alive
+    """
+    if section not in part_sites:
+        sites = part_sites[section] = weakref.WeakSet()
+        section.listen(lambda changed: [site.changed() for site in list(sites)])
+    part_sites[section].add(site)
+
+########################
+###   PART MANIFEST
+########################
+
+# {tuple(package.__path__) : PartManifest}
+# Clear this if modules are added to parts after they have been loaded
+manifests = {}
+
+def manifest_for(pkg):
+    """Get the memoized PartManifest for a package, or None if it isn't a package"""
+    paths = getattr(pkg, '__path__', None)
+    if not paths:
+        return None
+
+    key = tuple(paths)
+    if key not in manifests:
+        manifests[key] = PartManifest(key)
+    return manifests[key]
+
+class PartManifest(object):
+    """
+        Record of which modules exist in a package
+
+        Each folder on the package's __path__ is listed once
+        So that loading admin, models and urls for a part doesn't ask the filesystem about each one
+
+        If any of the paths can't be listed (i.e. it's in a zip file) then complete is False
+        and the manifest shouldn't be trusted
+    """
+    suffixes = set(suffix for suffix, _, _ in imp.get_suffixes() if suffix.startswith('.'))
+
+    def __init__(self, paths):
+        self.paths = paths
+        self.complete = True
+
+        # modules: names we know are modules
+        # candidates: {name : folder} for things without a suffix that may be packages
+        self.modules = set()
+        self.candidates = {}
+        self.scan()
+
+        # Held by Part.load when it moves candidates into modules
+        self.lock = threading.Lock()
+
+    def scan(self):
+        """List each path and record what is in it"""
+        for path in self.paths:
+            try:
+                filenames = os.listdir(path)
+            except OSError:
+                self.complete = False
+                continue
+
+            for filename in filenames:
+                name, ext = os.path.splitext(filename)
+                if ext in self.suffixes:
+                    self.modules.add(name)
+                elif not ext:
+                    self.candidates.setdefault(name, path)
+
+    def __contains__(self, name):
+        """Is there a module or package with this name"""
+        if name in self.modules:
+            return True
+        return name in self.candidates and self.is_package(self.candidates[name], name)
+
+    def is_package(self, path, name):
+        """Is the folder with this name in this path a package"""
+        folder = os.path.join(path, name)
+        return any(os.path.isfile(os.path.join(folder, "__init__%s" % suffix)) for suffix in self.suffixes)
@@ -0,0 +1,218 @@
+'''
+    Find out where the time goes when a website is configured
+
+    See :ref:`splitter_profiler`
+'''
+from contextlib import contextmanager
+from collections import OrderedDict
+from functools import wraps
+import threading
+import json
+import time
+
+########################
+###   PROFILE NODE
+########################
+
+class ProfileNode(object):
+    '''
+        Time spent in one place for a particular stack of places
+
+        total is all the time spent here including children
+        own is the time spent here that isn't in any of the children
+    '''
+    def __init__(self, name):
+        self.name = name
+        self.total = 0
+        self.calls = 0
+        self.children = OrderedDict()
+
+    def child(self, name):
+        """Get or make the child with this name"""
+        if name not in self.children:
+            self.children[name] = ProfileNode(name)
+        return self.children[name]
+
+    def add(self, took):
+        """Record one call that took this many seconds"""
+        self.total += took
+        self.calls += 1
+
+    @property
+    def own(self):
+        """Seconds spent here and not in any children"""
+        return max(0, self.total - sum(child.total for child in self.children.values()))
+
+    def walk(self, path=()):
+        """Yield (path, node) for this node and everything under it"""
+        path = path + (self.name, )
+        yield path, self
+        for child in self.children.values():
+            for found in child.walk(path):
+                yield found
+
+    def as_dict(self):
+        """Represent this node and it's children as dictionaries"""
+        return OrderedDict([
+              ('name', self.name)
+            , ('total', self.total)
+            , ('own', self.own)
+            , ('calls', self.calls)
+            , ('children', [child.as_dict() for child in self.children.values()])
+            ])
+
+    def __repr__(self):
+        return "<ProfileNode {}|:|total:{:.4f}|:|calls:{}>".format(self.name, self.total, self.calls)
+
+########################
+###   BOOT PROFILE
+########################
+
+class BootProfile(object):
+    '''
+        Records a tree of timings while configuring a website
+
+        Use :py:meth:`recording` around what you want to profile. While it's
+        recording, the methods in :py:meth:`instrumented` are replaced with
+        versions that time themselves. Outside of recording nothing is changed
+        and nothing is timed.
+
+        Only the thread that started recording is timed.
+    '''
+    def __init__(self, name="boot"):
+        self.root = ProfileNode(name)
+        self.stack = [self.root]
+
+        self.depth = 0
+        self.thread = None
+        self.originals = []
+
+    ########################
+    ###   RECORDING
+    ########################
+
+    @contextmanager
+    def recording(self):
+        """Instrument everything in self.instrumented while in this context"""
+        outermost = self.depth == 0
+        if outermost:
+            self.thread = threading.current_thread()
+            self.instrument()
+
+        self.depth += 1
+        start = time.time()
+        try:
+            yield self
+        finally:
+            self.depth -= 1
+            if outermost:
+                self.root.add(time.time() - start)
+                self.restore()
+                self.thread = None
+
+    @contextmanager
+    def timing(self, *names):
+        """Time everything in this context under these names below the current place"""
+        nodes = []
+        for name in names:
+            node = self.stack[-1].child(name)
+            self.stack.append(node)
+            nodes.append(node)
+
+        start = time.time()
+        try:
+            yield
+        finally:
+            took = time.time() - start
+            for node in nodes:
+                node.add(took)
+                self.stack.pop()
+
+    def instrumented(self):
+        """
+            Return [(owner, attribute, names_for), ...] of what to time
+
+            Where names_for is given the same arguments as the method
+            and returns the names to time it under
+        """
+        from cwf.sections.section import Section
+        from cwf.sections.options import Options
+        from cwf.splitter.parts import Parts, Part
+        from cwf.splitter.website import Website
+
+        return [
+              (Website, 'configure', lambda *args, **kwargs: ('configure', ))
+            , (Parts, 'models', lambda *args, **kwargs: ('models', ))
+            , (Parts, 'load_admin', lambda *args, **kwargs: ('admin', ))
+            , (Parts, 'urls', lambda *args, **kwargs: ('urls', ))
+            , (Part, 'do_import', lambda part, *args, **kwargs: (part.label, 'import'))
+            , (Part, 'load', lambda part, name: (part.label, name))
+            , (Section, 'add', lambda *args, **kwargs: ('Section.add', ))
+            , (Section, 'first', lambda *args, **kwargs: ('Section.first', ))
+            , (Section, 'configure', lambda *args, **kwargs: ('Section.configure', ))
+            , (Section, 'patterns', lambda *args, **kwargs: ('patterns', ))
+            , (Options, 'clone', lambda *args, **kwargs: ('Options.clone', ))
+            ]
+
+    def instrument(self):
+        """Replace everything in self.instrumented with a version that times itself"""
+        for owner, attribute, names_for in self.instrumented():
+            original = owner.__dict__[attribute]
+            self.originals.append((owner, attribute, original))
+            setattr(owner, attribute, self.timed(original, names_for))
+
+    def restore(self):
+        """Put back everything that was replaced by instrument"""
+        while self.originals:
+            owner, attribute, original = self.originals.pop()
+            setattr(owner, attribute, original)
+
+    def timed(self, func, names_for):
+        """Make a version of func that times itself if it's called from the recording thread"""
+        profile = self
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            if threading.current_thread() is not profile.thread:
+                return func(*args, **kwargs)
+
+            with profile.timing(*names_for(*args, **kwargs)):
+                return func(*args, **kwargs)
+        return timed
+
+    ########################
+    ###   RESULTS
+    ########################
+
+    def top(self, count=10):
+        """Return [(own, path, calls), ...] for the places with the most time of their own"""
+        found = [(node.own, ';'.join(path), node.calls) for path, node in self.root.walk()]
+        return sorted(found, key=lambda f: f[0], reverse=True)[:count]
+
+    def as_json(self, indent=2):
+        """Return the profile as a tree of json objects"""
+        return json.dumps(self.root.as_dict(), indent=indent)
+
+    def collapsed(self):
+        """
+            Return the profile as collapsed stacks (as used by flamegraph.pl)
+
+            One line per place with "name;name;name microseconds"
+            Where microseconds is the time spent in that place and not it's children
+        """
+        lines = []
+        for path, node in self.root.walk():
+            microseconds = int(round(node.own * 1000000))
+            if microseconds:
+                lines.append("%s %d" % (';'.join(path), microseconds))
+        return '\n'.join(lines)
+
+    def dump(self, location, format="json"):
+        """Write the profile to this location as json or collapsed stacks"""
+        formatters = {'json' : self.as_json, 'collapsed' : self.collapsed}
+        if format not in formatters:
+            raise ValueError("Unknown format '%s', choose from %s" % (format, sorted(formatters.keys())))
+
+        with open(location, 'w') as out:
+            out.write(formatters[format]())
+            out.write('\n')
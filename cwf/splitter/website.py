@@ -1,4 +1,5 @@
-from imports import inject
+from imports import inject, injected
+from lazy_admin import lazy_admin
 from parts import Parts
 
 class Website(object):
@@ -16,16 +17,34 @@ class Website(object):
 
         self.prefix = kwargs.get("prefix", None)
         self.include_default_urls = kwargs.get("include_default_urls", False)
+        self.pattern_profile = kwargs.get("pattern_profile", None)
+        self.workers = kwargs.get("workers", None)
 
-    def configure(self):
+        # True to load admin when configured, "lazy" to wait till the admin is used, False to never load it
+        self.admin = kwargs.get("admin", True)
+
+    def configure(self, profile=None):
         """
             Configure a website to exist in the package specified with the parts specified.
             This will inject into package.models and package.urls
-            It will also import all admin logic
+            It will also import all admin logic, unless self.admin says otherwise
+
+            If a cwf.splitter.profiler.BootProfile is given, then the configuring is recorded in it
+            And package.urls is imported straight away so that making the site is recorded as well
         """
+        if profile is not None:
+            with profile.recording():
+                self.configure()
+                __import__(self.names_for("urls")[0], globals(), locals(), ['urlpatterns'], 0)
+            return
+
         inject(self.urls, self.names_for("urls"))
         inject(self.models, self.names_for("models"))
-        self.load_admin()
+
+        if self.admin == "lazy":
+            lazy_admin.add(self.load_admin)
+        elif self.admin:
+            self.load_admin()
 
     @property
     def config(self):
@@ -38,7 +57,7 @@ class Website(object):
             self._partconfig = {}
 
         if package not in self._partconfig:
-            self._partconfig[package] = Parts(package, *self.parts)
+            self._partconfig[package] = Parts(package, *self.parts, workers=self.workers)
         return self._partconfig[package]
 
     def load_admin(self):
@@ -52,8 +71,34 @@ class Website(object):
 
     @property
     def urls(self):
-        """Return a function to be uses as <package>.<urls>"""
-        return lambda : self.config.urls(active_only=True, include_defaults=self.include_default_urls)
+        """
+            Return a function to be uses as <package>.<urls>
+            Changes to the site after this are followed by self.follow_changes
+        """
+        def urls():
+            found = self.config.urls(
+                  active_only=True, include_defaults=self.include_default_urls, profile=self.pattern_profile
+                )
+            self.follow_changes(found['site'])
+            return found
+        return urls
+
+    def follow_changes(self, site):
+        """
+            Make sure changes to the site show up in the urls Django resolves
+
+            When the site changes, <package>.<urls> is made again the next time it's imported
+            And Django's resolver is cleared so that it imports it again
+        """
+        if getattr(self, '_following', None) is site:
+            return
+        self._following = site
+
+        def changed(section):
+            from django.core.urlresolvers import clear_url_caches
+            injected.invalidate(*self.names_for("urls"))
+            clear_url_caches()
+        site.listen(changed)
 
     def names_for(self, name):
         """
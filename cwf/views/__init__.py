@@ -1 +1,2 @@
-from views import View, StaffView, LocalOnlyView, JSView
+from views import View, StaffView, LocalOnlyView, JSView, JSStreamView
+from coroutines import gather, Provider
@@ -1,6 +1,11 @@
+from django.views.decorators.http import condition
+
+from caching import response_cache, ResponseCache
+from coroutines import pool, drive, is_coroutine, FanOut
 from rendering import renderer
 from menu import Menu
 
+import weakref
 import json
 import re
 
@@ -9,15 +14,130 @@ regexes = {
     }
 
 class DictObj(dict):
-    """Dictionary with attribute access"""
-    def __init__(self, *args, **kwargs):
-        super(DictObj, self).__init__(self, *args, **kwargs)
-        self.__dict__ = self
+    """
+        Dictionary with attribute access
+
+        Attributes are looked up as keys rather than making the dictionary it's own ``__dict__``.
+        This way it doesn't reference itself and is freed as soon as it's no longer used
+        rather than waiting for the cyclic garbage collector.
+
+        Keys are found before methods, so ``DictObj(items=2).items == 2``
+        (except for names that start with an underscore).
+    """
+    __slots__ = ()
+
+    def __getattribute__(self, key):
+        if not key.startswith('_'):
+            try:
+                return self[key]
+            except KeyError:
+                pass
+        return object.__getattribute__(self, key)
+
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+    def __delattr__(self, key):
+        try:
+            del self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+class State(DictObj):
+    """
+        DictObj where some values are only made when they're first asked for
+
+        lazy is a dictionary of {key : maker} where maker is called with the state
+        the first time key is accessed and the result is stored under key.
+
+        Setting a key that hasn't been made yet means it's maker is never called.
+
+        Methods here call each other through the class, because keys hide methods with the same name.
+    """
+    __slots__ = ('_lazy', )
+
+    def __init__(self, lazy=None, **kwargs):
+        super(State, self).__init__(**kwargs)
+        object.__setattr__(self, '_lazy', dict(lazy or {}))
+
+    def __missing__(self, key):
+        if key not in self._lazy:
+            raise KeyError(key)
+
+        value = self._lazy.pop(key)(self)
+        dict.__setitem__(self, key, value)
+        return value
+
+    def __setitem__(self, key, value):
+        self._lazy.pop(key, None)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        if key in self._lazy:
+            del self._lazy[key]
+            if not dict.__contains__(self, key):
+                return
+        dict.__delitem__(self, key)
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self._lazy
+
+    def has_key(self, key):
+        return key in self
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    ########################
+    ###   WHOLE DICTIONARY
+    ########################
+
+    def resolve(self):
+        """Make any values that haven't been made yet and return the state"""
+        for key in list(self._lazy):
+            self[key]
+        return self
+
+    def keys(self):
+        return dict.keys(self) + self._lazy.keys()
+
+    def __iter__(self):
+        return iter(State.keys(self))
+
+    def __len__(self):
+        return dict.__len__(self) + len(self._lazy)
+
+    def values(self):
+        return dict.values(State.resolve(self))
+
+    def items(self):
+        return dict.items(State.resolve(self))
+
+    def copy(self):
+        return dict(State.resolve(self))
+
+    def __repr__(self):
+        return "<State %s|:|lazy:%s>" % (dict.__repr__(self), sorted(self._lazy.keys()))
 
 class View(object):
     """Base class for cwf views"""
     def __init__(self):
         self.renderer = renderer
+        self.response_cache = response_cache
+        self.pool = pool
 
     def __call__(self, request, target, *args, **kwargs):
         """
@@ -25,6 +145,9 @@ class View(object):
 
                 * Create :ref:`view state <views_view_state>`
                 * :ref:`Clean kwargs <views_view_kwargs>`
+                * Return early if the client already has the
+                  :ref:`latest version <views_view_conditional>` of the target
+                * Use a :ref:`cached response <views_view_caching>` if there is one
                 * Get a :ref:`result <views_view_result>` to render
                 * :ref:`Render <views_view_rendering>` the result and return.
         """
@@ -34,11 +157,24 @@ class View(object):
         # Clean the kwargs
         cleaned_kwargs = self.clean_view_kwargs(kwargs)
 
-        # Get the result to render
-        result = self.get_result(request, target, args, cleaned_kwargs)
+        def respond(request, *args, **kwargs):
+            # Get the result to render
+            result = self.get_result(request, target, args, kwargs)
 
-        # Render the result
-        return self.rendered_from_result(request, result)
+            # Render the result
+            return self.rendered_from_result(request, result)
+
+        # Use a cached response if the section says to cache this target
+        cache = self.cache_for(request, target)
+        if cache:
+            respond = cache(respond)
+
+        # Only respond if the client doesn't already have the latest version
+        conditional = self.conditional_for(target)
+        if conditional:
+            respond = conditional(respond)
+
+        return respond(request, *args, **cleaned_kwargs)
 
     def rendered_from_result(self, request, result):
         """
@@ -70,6 +206,80 @@ class View(object):
         # Return the response
         return self.renderer.render(request, template, extra)
 
+    ########################
+    ###   CONDITIONAL GET
+    ########################
+
+    def conditional_for(self, target):
+        """
+            Return a decorator that returns a 304 when the client already has the latest version
+            , or None if the target has no way of saying what it's latest version is.
+
+            The view may have ``<target>_etag`` and ``<target>_last_modified`` methods that are called
+            with the same arguments as the target and return an etag string or a datetime respectively.
+            These are given to Django's ``condition`` decorator, which compares them against the
+            ``If-None-Match`` and ``If-Modified-Since`` headers before the target is executed
+            and adds ``ETag`` and ``Last-Modified`` headers to the response.
+        """
+        etag_func = getattr(self, "%s_etag" % target, None)
+        last_modified_func = getattr(self, "%s_last_modified" % target, None)
+        if etag_func or last_modified_func:
+            return condition(etag_func=etag_func, last_modified_func=last_modified_func)
+
+    ########################
+    ###   CACHING
+    ########################
+
+    def cache_for(self, request, target):
+        """
+            Return a :py:class:`cwf.views.caching.ResponseCache` if the section for this request
+            has a ``cache_ttl``, otherwise return None.
+
+            The section is taken straight from ``request.section`` so that nothing lazy on
+            ``request.state`` is made for views that aren't cached. Responses are kept in ``self.response_cache``.
+        """
+        section = getattr(request, 'section', None)
+        if section is None:
+            return None
+
+        options = section.url_options
+        if not options.cache_ttl:
+            return None
+
+        prefix = "%s.%s.%s" % (self.__class__.__module__, self.__class__.__name__, target)
+        return ResponseCache(self.response_cache, options.cache_ttl, vary=options.cache_vary, prefix=prefix)
+
+    ########################
+    ###   FAN OUT
+    ########################
+
+    def fan_out(self, request, providers, extra=None, timeout=None):
+        """
+            Get context from several providers at the same time using ``self.pool``
+            and return ``extra`` updated with {name : result}.
+
+            ``providers`` is {name : provider} where provider is callable(request) or a
+            :py:class:`cwf.views.coroutines.Provider` with it's own timeout and default.
+            ``timeout`` is the seconds to wait for providers without their own timeout.
+
+            How long each provider took is added to ``request.state.provider_timings``
+            and anything that failed or timed out is added to ``request.state.provider_errors``.
+        """
+        fan_out = FanOut(self.pool, providers, timeout=timeout)
+        results = fan_out(request)
+
+        state = getattr(request, 'state', None)
+        if state is not None:
+            for name, found in (('provider_timings', fan_out.timings), ('provider_errors', fan_out.errors)):
+                if name not in state:
+                    state[name] = {}
+                state[name].update(found)
+
+        if extra is None:
+            extra = {}
+        extra.update(results)
+        return extra
+
     ########################
     ###   GETTING A RESULT
     ########################
@@ -118,8 +328,14 @@ class View(object):
 
             By default this means getting a callable for the ``target`` using :py:meth:`View.get_target`
             and calling it with the ``request``, ``*args`` and ``**kwargs``.
+
+            If the target is a :ref:`coroutine <views_view_coroutines>` then it is run
+            with ``self.pool`` and what it finally yields is returned.
         """
-        return self.get_target(target)(request, *args, **kwargs)
+        result = self.get_target(target)(request, *args, **kwargs)
+        if is_coroutine(result):
+            result = drive(result, self.pool)
+        return result
 
     def has_target(self, target):
         """
@@ -166,7 +382,9 @@ class View(object):
             For convenience, this object behaves like a Javascript object (supports both
             dot notation and array notation for accessing and setting variables).
 
-            When it's created, it is initialized with some values:
+            It is a :py:class:`State` object with some values that are only worked out
+            when they are first used. This way views that don't render a menu or look at
+            the path don't pay for creating them:
 
                 ``menu``
                     If we got here via a CWF Section, then we will be able to create
@@ -176,7 +394,7 @@ class View(object):
                     The path of the request with no leading, trailing; or duplicate slashes.
 
                 ``target``
-                    The target being reached on the class.
+                    The target being reached on the class. This one is set straight away.
 
                 ``section``
                     The CWF section that is executing this view (if one was used)
@@ -184,23 +402,38 @@ class View(object):
                 ``base_url``
                     ``request.META.get('SCRIPT_NAME', '')``
         """
+        request_ref = weakref.ref(request)
+        def maker(func):
+            # Only keep a weak reference to the request so request.state doesn't make a cycle
+            return lambda state: func(request_ref(), state)
+
+        return State(target=target, lazy=dict(
+              menu = maker(self.state_menu)
+            , path = maker(self.state_path)
+            , section = maker(self.state_section)
+            , base_url = maker(self.state_base_url)
+            ))
+
+    def state_menu(self, request, state):
+        """Make a :py:class:`cwf.views.menu.Menu` for the section in state, or None if there isn't one"""
+        section = state.section
+        if section:
+            return Menu(request, section)
+
+    def state_path(self, request, state):
+        """Path for state with the first empty part removed if we have a base_url"""
         path = self.path_from_request(request)
-        section = self.get_section(request, path)
-        base_url = self.base_url_from_request(request)
-        if base_url != '' and path[0] == '':
+        if state.base_url != '' and path and path[0] == '':
             path.pop(0)
+        return path
 
-        menu = None
-        if section:
-            menu = Menu(request, section)
-
-        return DictObj(
-              menu = menu
-            , path = path
-            , target = target
-            , section = section
-            , base_url = base_url
-            )
+    def state_section(self, request, state):
+        """Section for state as found by get_section"""
+        return self.get_section(request, state.path)
+
+    def state_base_url(self, request, state):
+        """Base url for state as found by base_url_from_request"""
+        return self.base_url_from_request(request)
 
     def get_section(self, request, path):
         """Get a section from the request object"""
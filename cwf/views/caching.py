@@ -0,0 +1,192 @@
+"""
+    Caching responses from view targets
+
+    See :ref:`views_view_caching`
+"""
+from django.http import HttpResponse
+
+from collections import OrderedDict
+from functools import wraps
+import threading
+import hashlib
+import time
+
+########################
+###   BACKENDS
+########################
+
+class LRUCache(object):
+    '''
+        Thread safe dictionary that holds at most ``max_entries`` values
+        and forgets the least recently used value first
+    '''
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.values = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Get a value and mark it as the most recently used"""
+        with self.lock:
+            if key not in self.values:
+                return default
+
+            # Put it back at the end so it's the most recently used
+            value = self.values.pop(key)
+            self.values[key] = value
+            return value
+
+    def set(self, key, value):
+        """Remember a value, forgetting the least recently used values if there are too many"""
+        with self.lock:
+            self.values.pop(key, None)
+            self.values[key] = value
+            while len(self.values) > self.max_entries:
+                self.values.popitem(last=False)
+
+    def delete(self, key):
+        """Forget a value"""
+        with self.lock:
+            self.values.pop(key, None)
+
+    def clear(self):
+        """Forget all values"""
+        with self.lock:
+            self.values.clear()
+
+class LocalCache(LRUCache):
+    '''
+        In memory cache that holds at most ``max_entries`` values
+        and forgets the least recently used value first
+
+        Has the same get, set and delete methods as Django's cache backends
+        so either may be used as the cache for responses
+    '''
+    def __init__(self, max_entries=500, default_timeout=300):
+        super(LocalCache, self).__init__(max_entries)
+        self.default_timeout = default_timeout
+
+    def get(self, key, default=None):
+        """Get a value that hasn't expired yet"""
+        found = super(LocalCache, self).get(key)
+        if found is None:
+            return default
+
+        expires, value = found
+        if expires <= time.time():
+            self.delete(key)
+            return default
+        return value
+
+    def set(self, key, value, timeout=None):
+        """Remember a value for timeout seconds, or self.default_timeout if timeout is None (like Django)"""
+        if timeout is None:
+            timeout = self.default_timeout
+        super(LocalCache, self).set(key, (time.time() + timeout, value))
+
+# Cache used by views by default
+response_cache = LocalCache()
+
+########################
+###   RESPONSE CACHE
+########################
+
+class ResponseCache(object):
+    '''
+        Decorator for a function that responds to a request
+        that makes it use responses from a cache where it can
+
+        backend: Something with get(key) and set(key, value, timeout)
+        ttl: Seconds to remember responses for
+        vary: List of 'user', 'GET' or callable(request) for what other than the host and full path changes the response
+        prefix: Put in front of keys so different targets don't share responses
+
+        Pages show things for the user (like their menu), so requests from logged in
+        users are only cached if 'user' is in vary.
+    '''
+    def __init__(self, backend, ttl, vary=None, prefix=''):
+        self.ttl = ttl
+        self.vary = vary or ()
+        self.prefix = prefix
+        self.backend = backend
+
+    def __call__(self, respond):
+        @wraps(respond)
+        def cached(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or not self.shareable(request):
+                return respond(request, *args, **kwargs)
+
+            key = self.key_for(request)
+            stored = self.backend.get(key)
+            if stored is not None:
+                return self.response_from(stored)
+
+            response = respond(request, *args, **kwargs)
+            if self.cacheable(request, response):
+                self.backend.set(key, self.stored(response), self.ttl)
+            return response
+        return cached
+
+    def key_for(self, request):
+        """
+            Key for the response to this request
+            Starts from the host and the path with it's query string, so those always change the key
+        """
+        parts = [request.get_host(), request.get_full_path()]
+        for vary in self.vary:
+            if vary == 'user':
+                user = getattr(request, 'user', None)
+                if user is not None and user.is_authenticated():
+                    parts.append(user.pk)
+                else:
+                    parts.append(None)
+            elif vary == 'GET':
+                parts.append(sorted(request.GET.lists()))
+            else:
+                parts.append(vary(request))
+
+        return "cwf.response.%s.%s" % (self.prefix, hashlib.md5(repr(parts)).hexdigest())
+
+    def shareable(self, request):
+        """
+            Say whether responses for this request may come from or go into the cache
+            Requests from logged in users only may if we vary on the user
+        """
+        if 'user' in self.vary:
+            return True
+
+        user = getattr(request, 'user', None)
+        return user is None or not user.is_authenticated()
+
+    def cacheable(self, request, response):
+        """
+            Say whether we can remember this response
+
+            Only successful, non streaming responses are remembered
+            And not if they set cookies, use the csrf token, have a Vary header
+            or say they are private or not to be cached
+        """
+        if not isinstance(response, HttpResponse) or response.status_code != 200:
+            return False
+
+        if response.cookies or response.has_header('Vary') or request.META.get('CSRF_COOKIE_USED'):
+            return False
+
+        if response.has_header('Cache-Control'):
+            cache_control = response['Cache-Control'].lower()
+            if any(directive in cache_control for directive in ('private', 'no-cache', 'no-store')):
+                return False
+
+        return True
+
+    def stored(self, response):
+        """What we remember for a response"""
+        return (response.status_code, response.content, list(response.items()))
+
+    def response_from(self, stored):
+        """Make a new response from what we remembered"""
+        status, content, headers = stored
+        response = HttpResponse(content, status=status)
+        for header, value in headers:
+            response[header] = value
+        return response
@@ -0,0 +1,186 @@
+"""
+    Running targets that wait on several things at the same time
+
+    See :ref:`views_view_coroutines`
+"""
+from multiprocessing.pool import ThreadPool
+from multiprocessing import TimeoutError
+import threading
+import inspect
+import time
+import sys
+
+########################
+###   POOL
+########################
+
+class Pool(object):
+    '''
+        Threads shared by all views for doing things at the same time
+
+        The threads aren't started until something is first given to the pool
+    '''
+    def __init__(self, size=10):
+        self.size = size
+        self.lock = threading.Lock()
+
+    @property
+    def threads(self):
+        """Lazily made ThreadPool"""
+        if not hasattr(self, '_threads'):
+            with self.lock:
+                if not hasattr(self, '_threads'):
+                    self._threads = ThreadPool(self.size)
+        return self._threads
+
+    def start(self, func, *args, **kwargs):
+        """Start calling func in the pool and return an AsyncResult for it"""
+        return self.threads.apply_async(func, args, kwargs)
+
+    def run(self, callables):
+        """
+            Call each callable at the same time and return a list of their results
+
+            The first exception raised by any of them is raised once they have all finished
+        """
+        started = [self.start(func) for func in callables]
+        results = []
+        error = None
+        for result in started:
+            try:
+                results.append(result.get())
+            except Exception:
+                results.append(None)
+                if error is None:
+                    error = sys.exc_info()
+
+        if error:
+            raise error[0], error[1], error[2]
+        return results
+
+# Pool used by views by default
+pool = Pool()
+
+########################
+###   COROUTINES
+########################
+
+class gather(object):
+    '''
+        Yielded by a coroutine target to wait on several callables at the same time
+
+        The callables are called with no arguments and the coroutine is sent
+        a list of their results in the same order
+    '''
+    def __init__(self, *callables):
+        self.callables = callables
+
+def is_coroutine(result):
+    """Say whether a target gave back a coroutine rather than a result"""
+    return inspect.isgenerator(result)
+
+def drive(coroutine, pool):
+    """
+        Run a coroutine target and return it's result
+
+        Every :py:class:`gather` it yields is run in the pool
+        and the results (or the first exception) are sent back into it.
+
+        The first thing it yields that isn't a :py:class:`gather` is the result.
+    """
+    send = lambda : coroutine.send(None)
+    while True:
+        try:
+            yielded = send()
+        except StopIteration:
+            return None
+
+        if not isinstance(yielded, gather):
+            coroutine.close()
+            return yielded
+
+        try:
+            results = pool.run(yielded.callables)
+        except Exception:
+            error = sys.exc_info()
+            send = lambda : coroutine.throw(*error)
+        else:
+            send = lambda : coroutine.send(results)
+
+########################
+###   FAN OUT
+########################
+
+class Provider(object):
+    '''
+        Something that provides part of the context for a template
+
+        func is called with the same arguments given to the :py:class:`FanOut`
+        If it takes longer than timeout seconds or raises an exception then default is used instead
+    '''
+    def __init__(self, func, timeout=None, default=None):
+        self.func = func
+        self.timeout = timeout
+        self.default = default
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+def timed(func, args, kwargs):
+    """Return (seconds, result) from calling func with args and kwargs"""
+    start = time.time()
+    result = func(*args, **kwargs)
+    return time.time() - start, result
+
+class FanOut(object):
+    '''
+        Call several providers at the same time and get {name : result}
+
+        providers is {name : provider} where provider is a :py:class:`Provider` or any callable.
+        timeout is used for providers that don't have their own timeout.
+
+        After calling, ``timings`` is {name : seconds} and ``errors`` is {name : exception}
+        for each provider that failed or timed out.
+
+        Providers that time out are given up on, but they still finish in the pool.
+    '''
+    def __init__(self, pool, providers, timeout=None):
+        self.pool = pool
+        self.timeout = timeout
+        self.providers = dict(
+            (name, provider if isinstance(provider, Provider) else Provider(provider))
+            for name, provider in providers.items()
+            )
+
+        self.errors = {}
+        self.timings = {}
+
+    def __call__(self, *args, **kwargs):
+        start = time.time()
+        started = dict(
+            (name, self.pool.start(timed, provider, args, kwargs))
+            for name, provider in self.providers.items()
+            )
+
+        results = {}
+        for name, provider in self.providers.items():
+            timeout = provider.timeout
+            if timeout is None:
+                timeout = self.timeout
+
+            remaining = None
+            if timeout is not None:
+                remaining = max(0, start + timeout - time.time())
+
+            try:
+                self.timings[name], results[name] = started[name].get(remaining)
+            except TimeoutError:
+                self.timings[name] = time.time() - start
+                self.errors[name] = TimeoutError("%s took longer than %ss" % (name, timeout))
+                results[name] = provider.default
+            except Exception as error:
+                self.timings[name] = time.time() - start
+                self.errors[name] = error
+                results[name] = provider.default
+
+        return results
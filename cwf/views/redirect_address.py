@@ -6,6 +6,13 @@ regexes = {
     'multi_slash' : re.compile('/+')
     }
 
+def strip_multi_slashes(string):
+    """Replace multiple slashes with single slashes in a string"""
+    if '//' not in string:
+        # Only bother with the regex if we need to
+        return string
+    return regexes['multi_slash'].sub('/', string)
+
 class RedirectAddress(object):
     """
         Helper to determine where to redirect to.
@@ -88,7 +95,7 @@ class RedirectAddress(object):
 
     def strip_multi_slashes(self, string):
         """Replace multiple slashes with single slashes in a string"""
-        return regexes['multi_slash'].sub('/', string)
+        return strip_multi_slashes(string)
 
     def root_url(self, address):
         """Determine if address is a root url (starts with slash)"""
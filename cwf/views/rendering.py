@@ -1,19 +1,70 @@
-from django.http import HttpResponse, Http404, HttpResponseRedirect
-from django.template import loader, RequestContext, Context
+from django.http import HttpResponse, StreamingHttpResponse, Http404, HttpResponseRedirect
+from django.template import loader, RequestContext, Context, TemplateDoesNotExist
+from django.template.loader_tags import ExtendsNode, BlockNode, BlockContext, BLOCK_CONTEXT_KEY
+from django.template.base import Node, TextNode
+from django.utils.cache import patch_vary_headers
+from django.utils.encoding import force_text, force_bytes
+from django.utils.text import compress_string
 
 from redirect_address import RedirectAddress
+from serializers import JSONSerializer
+from caching import LRUCache
 
-import json
+import re
+
+regexes = {
+    'gzip' : re.compile(r'\bgzip\b')
+    }
 
 class Renderer(object):
     """
-        Stateless class that simplifies usage of Django machinary for creating HttpResponse objects
+        Class that simplifies usage of Django machinary for creating HttpResponse objects
+
+        The only state kept on the renderer is a cache of compiled templates.
+        See :py:meth:`get_template`.
 
         An instantiated instance of this class is provided from ``cwf.views.rendering.renderer``
     """
+    # Most compiled templates to keep at any one time
+    template_cache_size = 200
+
+    # Templates cwf itself renders
+    known_templates = ('menu/base.html', 'admin/blank.html')
+
+    # Least number of characters to send at a time when streaming
+    stream_chunk_size = 8192
+
+    # Mimetype for json responses
+    json_mime = "application/json"
+
+    # Least number of bytes a json response must have before it is gzipped
+    gzip_min_size = 16384
+
+    def __init__(self, cache_templates=None, json_serializer=None):
+        self.json_serializer = json_serializer or JSONSerializer()
+        self.cache_templates = cache_templates
+        self.templates = LRUCache(self.template_cache_size)
+
+    @property
+    def cache_templates(self):
+        """
+            Whether compiled templates are remembered
+
+            Defaults to only when neither DEBUG nor TEMPLATE_DEBUG are set
+            , so changes to templates are seen straight away while developing
+        """
+        if self._cache_templates is None:
+            from django.conf import settings
+            return not (settings.DEBUG or settings.TEMPLATE_DEBUG)
+        return self._cache_templates
+
+    @cache_templates.setter
+    def cache_templates(self, value):
+        self._cache_templates = value
+
     def simple_render(self, template, extra):
         """Return the string from rendering specified template with a normal Context object"""
-        t = loader.get_template(template)
+        t = self.get_template(template)
         c = Context(extra)
         return t.render(c)
 
@@ -27,7 +78,7 @@ class Renderer(object):
             to modify the rendered template before creating the HttpResponse object
         """
         context = self.request_context(request, extra)
-        template_obj = loader.get_template(template)
+        template_obj = self.get_template(template)
         render = template_obj.render(context)
 
         # Modify render if we want to
@@ -36,6 +87,81 @@ class Renderer(object):
 
         return HttpResponse(render, mimetype=mime)
 
+    def stream(self, request, template, extra=None, mime="text/html"):
+        """
+            Like ``render`` but return a StreamingHttpResponse that renders the template
+            as it is sent to the client.
+
+            The template is rendered one top level node at a time. If the template
+            extends another template, then the top level nodes of the template being
+            extended are used so that each block is sent as soon as it's rendered.
+
+            Note that the template is rendered after the view has returned
+            , so errors in the template will cut the response short rather
+            than result in an error page.
+        """
+        context = self.request_context(request, extra)
+        template_obj = self.get_template(template)
+        return StreamingHttpResponse(self.chunked(self.rendered_nodes(template_obj, context)), mimetype=mime)
+
+    def rendered_nodes(self, template, context):
+        """Yield the rendered output of each top level node in the template"""
+        context.render_context.push()
+        try:
+            for bit in self.render_nodelist(template.nodelist, context):
+                yield bit
+        finally:
+            context.render_context.pop()
+
+    def render_nodelist(self, nodelist, context):
+        """Yield the rendered output of each node in the nodelist, following {% extends %}"""
+        for node in nodelist:
+            if isinstance(node, ExtendsNode):
+                for bit in self.render_nodelist(self.extended(node, context).nodelist, context):
+                    yield bit
+            elif isinstance(node, Node):
+                yield force_text(nodelist.render_node(node, context))
+            else:
+                yield force_text(node)
+
+    def extended(self, node, context):
+        """
+            Setup blocks for this ExtendsNode and return the template it extends
+
+            This is what ExtendsNode.render does before rendering the parent
+        """
+        compiled_parent = node.get_parent(context)
+
+        if BLOCK_CONTEXT_KEY not in context.render_context:
+            context.render_context[BLOCK_CONTEXT_KEY] = BlockContext()
+        block_context = context.render_context[BLOCK_CONTEXT_KEY]
+        block_context.add_blocks(node.blocks)
+
+        # If the parent doesn't extend anything then it's blocks are needed too
+        for parent_node in compiled_parent.nodelist:
+            if not isinstance(parent_node, TextNode):
+                if not isinstance(parent_node, ExtendsNode):
+                    blocks = dict((n.name, n) for n in compiled_parent.nodelist.get_nodes_by_type(BlockNode))
+                    block_context.add_blocks(blocks)
+                break
+
+        return compiled_parent
+
+    def chunked(self, bits):
+        """Join bits together so that each chunk is at least ``stream_chunk_size`` characters"""
+        chunk = []
+        size = 0
+        for bit in bits:
+            chunk.append(bit)
+            size += len(bit)
+            if size >= self.stream_chunk_size:
+                yield ''.join(chunk)
+                chunk = []
+                size = 0
+
+        if chunk:
+            yield ''.join(chunk)
+
     def request_context(self, request, extra):
         """
             Create a RequestContext object from the request and extra context provided.
@@ -57,6 +183,63 @@ class Renderer(object):
         # Get the template and render it
         return RequestContext(request, context)
 
+    ########################
+    ###   TEMPLATES
+    ########################
+
+    def get_template(self, name):
+        """
+            Return the compiled template for this name
+
+            If ``cache_templates`` is True then compiled templates are remembered
+            so they are only found and parsed once. At most ``template_cache_size``
+            templates are kept, after which the least recently used template is forgotten.
+
+            Note that templates included by other templates are found by Django's loaders
+            and so aren't affected by this cache.
+        """
+        if not self.cache_templates:
+            return loader.get_template(name)
+
+        template = self.templates.get(name)
+        if template is None:
+            template = loader.get_template(name)
+            self.templates.set(name, template)
+        return template
+
+    def preload(self, *names):
+        """
+            Compile and remember these templates now rather than when they are first rendered.
+
+            If no names are given then ``known_templates`` are loaded
+            , ignoring any that can't be found.
+
+            Return {name : template} for the templates that were loaded.
+        """
+        ignore_missing = not names
+        if not names:
+            names = self.known_templates
+
+        loaded = {}
+        for name in names:
+            try:
+                loaded[name] = self.get_template(name)
+            except TemplateDoesNotExist:
+                if not ignore_missing:
+                    raise
+        return loaded
+
+    def forget_templates(self, *names):
+        """Forget these compiled templates, or all of them if no names are given"""
+        if not names:
+            self.templates.clear()
+        for name in names:
+            self.templates.delete(name)
+
+    ########################
+    ###   RESPONSES
+    ########################
+
     def raise404(self):
         """Raise a Http404"""
         raise Http404
@@ -69,11 +252,49 @@ class Renderer(object):
         """Return HttpResponse object with data and a 'application/xml' mimetype"""
         return HttpResponse(data, mimetype="application/xml")
 
-    def json(self, data):
-        """Return HttpResponse object with data dumped as a json string and a 'application/javascript' mimetype"""
-        if type(data) not in (str, unicode):
-            data = json.dumps(data)
-        return HttpResponse(data, mimetype='application/javascript')
+    def json(self, data, request=None):
+        """
+            Return HttpResponse object with data dumped as a json string and a ``json_mime`` mimetype
+
+            Data is dumped using ``self.json_serializer``, which assumes strings are already json.
+
+            If a request is given that accepts gzip and the json is at least ``gzip_min_size`` bytes
+            , then the json is gzipped.
+        """
+        data = force_bytes(self.json_serializer(data))
+        if request is None or len(data) < self.gzip_min_size or not self.accepts_gzip(request):
+            return HttpResponse(data, mimetype=self.json_mime)
+
+        response = HttpResponse(compress_string(data), mimetype=self.json_mime)
+        response['Content-Encoding'] = 'gzip'
+        response['Content-Length'] = str(len(response.content))
+        patch_vary_headers(response, ('Accept-Encoding', ))
+        return response
+
+    def accepts_gzip(self, request):
+        """Say whether the request accepts gzipped responses"""
+        return bool(regexes['gzip'].search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+
+    def stream_json(self, items):
+        """
+            Return a StreamingHttpResponse with items sent as a json array
+            Each item is only dumped to json when it's needed
+        """
+        return StreamingHttpResponse(self.chunked(self.json_array(items)), mimetype=self.json_mime)
+
+    def json_array(self, items):
+        """
+            Yield the parts of a json array of these items
+            Every item is dumped, strings are only passed through as is for whole responses
+        """
+        yield '['
+        first = True
+        for item in items:
+            if not first:
+                yield ','
+            first = False
+            yield self.json_serializer.dumps(item)
+        yield ']'
 
     def redirect(self, request, address, *args, **kwargs):
         """Return a HttpResponseRedirect object"""
@@ -0,0 +1,48 @@
+"""
+    Objects used by :py:class:`cwf.views.rendering.Renderer` to turn data into json
+"""
+import json
+
+class JSONSerializer(object):
+    '''
+        Turn data into a json string
+
+        ``library`` is the name of a module with a ``dumps`` function
+        (i.e. ``'ujson'`` or ``'simplejson'``) to use instead of the standard library.
+        If it can't be imported then the standard library is used.
+
+        Strings are assumed to already be json and are returned as is.
+    '''
+    def __init__(self, library=None):
+        self.library = library
+
+    def __call__(self, data):
+        return self.serialize(data)
+
+    def serialize(self, data):
+        """Return data as a json string"""
+        if isinstance(data, basestring):
+            return data
+        return self.dumps(data)
+
+    @property
+    def dumps(self):
+        """Memoized function used to turn data into json"""
+        if not hasattr(self, '_dumps'):
+            self._dumps = self.find_dumps()
+        return self._dumps
+
+    def find_dumps(self):
+        """
+            Return dumps from self.library if we can import it
+
+            Otherwise return the encode method of a json.JSONEncoder that
+            leaves out unnecessary whitespace. Making the encoder once means
+            we don't make a new one every time we dump something.
+        """
+        if self.library:
+            try:
+                return __import__(self.library).dumps
+            except ImportError:
+                pass
+        return json.JSONEncoder(separators=(',', ':')).encode
@@ -43,4 +43,16 @@ class JSView(View):
         """
         result = super(JSView, self).execute(target, request, args, kwargs)
         template, data = result
-        return self.renderer.json(data)
+        return self.renderer.json(data, request=request)
+
+class JSStreamView(View):
+    """Convert target output into a streamed json array"""
+    def execute(self, target, request, args, kwargs):
+        """
+            Assume the result of calling the target returns ``(template, items)``.
+
+            Proceed to return the items as a :py:meth:`streamed json array <cwf.views.rendering.Renderer.stream_json>`
+        """
+        result = super(JSStreamView, self).execute(target, request, args, kwargs)
+        template, items = result
+        return self.renderer.stream_json(items)
@@ -10,6 +10,7 @@ setup(
       { 'console_scripts' :
         [ 'cwf-manager = cwf.bin.manager:main'
         , 'cwf-debugger = cwf.bin.debugger_cli:main'
+        , 'cwf-lint = cwf.bin.lint_cli:main'
         ]
       }
 
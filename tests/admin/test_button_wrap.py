@@ -166,12 +166,12 @@ describe "ButtonWrap":
 
         @fudge.test
         it "returns whether user has specified auth":
-            user = fudge.Fake("user").has_attr(is_superuser=False)
+            permissions = fudge.Fake("permissions").has_attr(is_superuser=False)
             result = fudge.Fake("result")
             needs_auth = fudge.Fake("needs_auth")
 
-            self.request.has_attr(user=user)
-            self.fake_has_auth.expects_call().with_args(user, needs_auth).returns(result)
+            self.request.has_attr(permissions=permissions)
+            self.fake_has_auth.expects_call().with_args(permissions, needs_auth).returns(result)
 
             self.wrapper.needs_auth = needs_auth
             self.wrapper.need_super_user = False
@@ -0,0 +1,121 @@
+# coding: spec
+
+from cwf.bin.reloader import Watcher, PollingWatcher, InotifyWatcher, make_watcher, run_with_reloader, run_main
+
+from unittest import skipUnless
+import tempfile
+import shutil
+import fudge
+import time
+import sys
+import os
+
+describe "Watcher":
+    it "waits for changes to settle":
+        fake_changes = (fudge.Fake("changes").expects_call()
+            .with_args(1).returns(set())
+            .next_call().with_args(1).returns(set(['one']))
+            .next_call().with_args(0.1).returns(set(['two']))
+            .next_call().with_args(0.1).returns(set())
+            )
+        watcher = type("Watcher", (Watcher, ), {'changes' : staticmethod(fake_changes)})(interval=1, settle=0.1)
+        watcher.wait() |should| equal_to(set(['one', 'two']))
+        fudge.verify()
+
+    it "watches the python files of everything in sys.modules":
+        modules = {
+              'compiled' : type("module", (object, ), {'__file__' : '/one/compiled.pyc'})
+            , 'source' : type("module", (object, ), {'__file__' : '/two/source.py'})
+            , 'builtin' : type("module", (object, ), {})
+            , 'missing' : None
+            }
+        with fudge.patched_context(sys, "modules", modules):
+            Watcher().watched_files() |should| equal_to(set(['/one/compiled.py', '/two/source.py']))
+
+describe "Watchers":
+    before_each:
+        self.folder = tempfile.mkdtemp()
+        self.location = os.path.join(self.folder, "module.py")
+        self.write(self.location, 1000000)
+        self.files = set([self.location])
+
+    after_each:
+        shutil.rmtree(self.folder)
+
+    def write(self, location, mtime=None):
+        with open(location, 'w') as fle:
+            fle.write("value = 1\n")
+        if mtime:
+            os.utime(location, (mtime, mtime))
+
+    def watch(self, watcher):
+        watcher.watched_files = lambda : self.files
+        return watcher
+
+    it "notices changed files by polling":
+        watcher = self.watch(PollingWatcher())
+        watcher.changes(0) |should| equal_to(set())
+
+        os.utime(self.location, (1000001, 1000001))
+        watcher.changes(0) |should| equal_to(set([self.location]))
+        watcher.changes(0) |should| equal_to(set())
+
+        os.remove(self.location)
+        watcher.changes(0) |should| equal_to(set([self.location]))
+
+    @skipUnless(InotifyWatcher.available(), "Need inotify")
+    it "notices changed and new python files with inotify":
+        watcher = self.watch(InotifyWatcher())
+        watcher.changes(0) |should| equal_to(set())
+
+        self.write(self.location)
+        watcher.changes(1) |should| equal_to(set([self.location]))
+
+        new_location = os.path.join(self.folder, "new.py")
+        self.write(os.path.join(self.folder, "notes.txt"))
+        self.write(new_location)
+        time.sleep(0.05)
+        watcher.changes(1) |should| equal_to(set([new_location]))
+        watcher.changes(0) |should| equal_to(set())
+        watcher.close()
+
+describe "Making a watcher":
+    it "uses inotify if it's available for auto":
+        expected = InotifyWatcher if InotifyWatcher.available() else PollingWatcher
+        watcher = make_watcher()
+        watcher |should| be_instance_of(expected)
+        if expected is InotifyWatcher:
+            watcher.close()
+        make_watcher("poll", settle=2).settle |should| equal_to(2)
+
+    it "complains about unknown watchers":
+        with self.assertRaises(ValueError):
+            make_watcher("telepathy")
+
+describe "Running with the reloader":
+    before_each:
+        self.original = os.environ.get(run_main)
+        self.main_func = fudge.Fake("main_func")
+
+    after_each:
+        os.environ.pop(run_main, None)
+        if self.original is not None:
+            os.environ[run_main] = self.original
+
+    @fudge.patch("cwf.bin.reloader.make_watcher", "cwf.bin.reloader.restart_with_reloader")
+    it "doesn't make a watcher in the process that restarts", fake_make_watcher, fake_restart_with_reloader:
+        os.environ.pop(run_main, None)
+        fake_restart_with_reloader.expects_call().returns(0)
+        with self.assertRaises(SystemExit):
+            run_with_reloader(self.main_func, "poll")
+
+    @fudge.patch("cwf.bin.reloader.make_watcher", "cwf.bin.reloader.thread")
+    it "makes the watcher in the process that serves", fake_make_watcher, fake_thread:
+        os.environ[run_main] = 'true'
+        watcher = fudge.Fake("watcher").expects("wait").returns(set(["one.py"]))
+        fake_make_watcher.expects_call().with_args("poll", settle=2).returns(watcher)
+        fake_thread.expects("start_new_thread").with_args(self.main_func, ())
+
+        with self.assertRaises(SystemExit) as caught:
+            run_with_reloader(self.main_func, "poll", settle=2)
+        caught.exception.code |should| equal_to(3)
@@ -21,6 +21,10 @@ describe "Configuring Options":
             , ('redirect',  None)
             , ('extra_context',  None)
 
+            # Cache stuff
+            , ('cache_ttl', None)
+            , ('cache_vary', None)
+
             # Url stuff
             , ('app_name', None)
             , ('namespace', None)
@@ -57,6 +61,7 @@ describe "Configuring Options":
             self.specification = {
                   Options.set_view.im_func : ('kls', 'module', 'target', 'redirect', 'extra_context')
                 , Options.set_menu.im_func : ('alias', 'match', 'values', 'needs_auth', 'propogate_display', 'promote_children')
+                , Options.set_cache.im_func : ('cache_ttl', 'cache_vary')
                 , Options.set_urlname.im_func : ('app_name', 'namespace')
                 , Options.set_conditionals.im_func : ('admin', 'active', 'exists', 'display')
                 }
@@ -292,6 +297,37 @@ describe "Configuring Options":
                     not_set = {'kls' : fudge.Fake('kls'), 'redirect' : fudge.Fake('redirect')}
                     self.check_multiple_arguments(self.setter, kwargs=kwargs, not_set=not_set)
 
+            describe "Setting cache options":
+                before_each:
+                    self.setter = Options.set_cache.im_func
+
+                it "complains if cache_ttl isn't None or a positive number":
+                    for val in ("", "60", 0, -1, [], fudge.Fake("ttl")):
+                        caller = lambda : self.setter(Options(), cache_ttl=val)
+                        caller |should| throw(ConfigurationError
+                            , message="cache_ttl must be None or a positive number of seconds, not %s (%s)" % (type(val), val)
+                            )
+
+                it "complains if cache_vary isn't None or a list of 'user', 'GET' or callables":
+                    caller = lambda : self.setter(Options(), cache_vary="user")
+                    caller |should| throw(ConfigurationError, message="cache_vary must be None, a list or a tuple, not <type 'str'> (user)")
+
+                    caller = lambda : self.setter(Options(), cache_vary=['user', 'POST'])
+                    caller |should| throw(ConfigurationError, message="cache_vary items must be 'user', 'GET' or callable(request), not POST")
+
+                it "sets valid values":
+                    vary = lambda request: 1
+                    for ttl, cache_vary in ((None, None), (60, ['user']), (0.5, ('GET', vary))):
+                        options = Options()
+                        self.setter(options, cache_ttl=ttl, cache_vary=cache_vary)
+                        options.cache_ttl |should| be(ttl)
+                        options.cache_vary |should| be(cache_vary)
+
+                it "works with multiple arguments":
+                    kwargs = {'cache_ttl' : 60}
+                    not_set = {'cache_vary' : fudge.Fake('cache_vary')}
+                    self.check_multiple_arguments(self.setter, kwargs=kwargs, not_set=not_set)
+
             describe "Setting menu options":
                 before_each:
                     self.setter = Options.set_menu.im_func
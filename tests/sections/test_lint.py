@@ -0,0 +1,100 @@
+# coding: spec
+
+from cwf.sections.section import Section
+from cwf.sections.values import Values
+from cwf.sections.lint import Linter
+
+from django.http import HttpResponse
+import fudge
+import time
+
+def view(request):
+    return HttpResponse("")
+
+describe "Linter":
+    before_each:
+        self.site = Section('', name='site')
+        self.request = fudge.Fake("request").has_attr(path='/', user=fudge.Fake("user"))
+
+    def linter(self, **kwargs):
+        return Linter(self.site, request=self.request, **kwargs)
+
+    def problems(self, kind):
+        return [(section, message) for k, section, message in self.linter().problems() if k == kind]
+
+    describe "Finding patterns":
+        it "finds patterns in the same order as PatternList with includes prefixed":
+            one = self.site.add('one', name='one').configure(target=view)
+            two = one.add('two', name='two').configure(target=view)
+            included = Section('', name='included')
+            three = included.add('three', name='three').configure(target=view)
+            self.site.add_child(included, include_as='inc')
+
+            self.linter().patterns |should| equal_to(
+                [ ('^one/two/$', two)
+                , ('^one/$', one)
+                , ('^inc/three/$', three)
+                ]
+            )
+
+    describe "Structural problems":
+        it "complains about duplicate names":
+            self.site.add('one', name='thing').configure(target=view)
+            two = self.site.add('two', name='thing').configure(target=view)
+            [s for s, _ in self.problems('duplicate_name')] |should| equal_to([two])
+
+        it "complains about patterns that will never be matched":
+            self.site.add('.*', name='everything').configure(target=view)
+            shadowed = self.site.add('other', name='other').configure(target=view)
+            again = self.site.add('.*', name='again').configure(target=view)
+            [s for s, _ in self.problems('shadowed_pattern')] |should| equal_to([shadowed])
+            [s for s, _ in self.problems('duplicate_pattern')] |should| equal_to([again])
+
+        it "complains about the same match being used twice in one url":
+            one = self.site.add('one', match='thing')
+            two = one.add('two', match='thing').configure(target=view)
+            [s for s, _ in self.problems('invalid_pattern')] |should| equal_to([two])
+
+        it "complains about conditionals that are always False":
+            hidden = self.site.add('hidden').configure(target=view, display=False)
+            self.problems('always_false') |should| equal_to([(hidden, "display is always False")])
+
+        it "complains about only the top most section with no views under it":
+            empty = self.site.add('empty')
+            empty.add('nothing')
+            self.site.add('full').configure(target=view)
+            [s for s, _ in self.problems('unreachable')] |should| equal_to([empty])
+
+    describe "Performance":
+        it "counts regexes and finds the deepest sections":
+            one = self.site.add('one').configure(target=view)
+            two = one.add('two').configure(target=view)
+            self.site.add('three').configure(target=view)
+
+            linter = self.linter()
+            linter.regex_count |should| be(3)
+            linter.deepest(1) |should| equal_to([(2, two)])
+
+        it "finds values that are slower than the threshold":
+            def slow(info):
+                time.sleep(0.02)
+                return ['a']
+            slow_section = self.site.add('slow').configure(values=Values(slow))
+            self.site.add('fast').configure(values=Values(['a']))
+
+            [s for _, s in self.linter(threshold=0.01).slow_values()] |should| equal_to([slow_section])
+
+        it "orders callable conditionals by how long they take and records errors":
+            def slow(request):
+                time.sleep(0.01)
+                return True
+            def broken(request):
+                raise ValueError("nope")
+
+            slow_section = self.site.add('slow').configure(active=slow)
+            broken_section = self.site.add('broken').configure(exists=broken)
+
+            linter = self.linter()
+            found = linter.slow_conditionals()
+            [(s, name) for _, s, name in found] |should| equal_to([(slow_section, 'active'), (broken_section, 'exists')])
+            [s for s, _ in linter.errors] |should| equal_to([broken_section])
@@ -2,6 +2,7 @@
 
 from cwf.sections.errors import ConfigurationError
 from cwf.sections.options import Options
+from cwf.sections.redirects import redirect_view, RedirectMap
 
 from django.http import Http404
 import fudge
@@ -147,8 +148,9 @@ describe "Options":
                 .next_call().with_args('active', self.request).returns(True)
                 )
 
-            self.request.user = self.user
-            self.fake_has_permissions.expects_call().with_args(self.user).returns(permissions)
+            resolver = fudge.Fake("resolver")
+            self.request.permissions = resolver
+            self.fake_has_permissions.expects_call().with_args(resolver).returns(permissions)
             self.options.reachable(self.request) |should| be(permissions)
 
     describe "Cloning":
@@ -173,7 +175,7 @@ describe "Options":
                 self.options.clone(all=True) |should| be(cloned)
 
         @fudge.test
-        it "passes on everything set by the setters except for alias, match, values, target, propogate_display and promote_children if all is False":
+        it "passes on everything set by the setters except for alias, match, values, target, propogate_display, promote_children and caching if all is False":
             keys = []
             for _, requirements in self.options.setters():
                 keys.extend(requirements)
@@ -183,6 +185,7 @@ describe "Options":
                 if requirement not in (
                       'alias', 'match', 'values', 'redirect'
                     , 'promote_children', 'target', 'propogate_display'
+                    , 'cache_ttl', 'cache_vary'
                     ):
                     next = fudge.Fake(requirement)
                     setattr(self.options, requirement, next)
@@ -251,6 +254,33 @@ describe "Options":
                 total_clone.display |should_not| be(display)
                 total_clone.propogate_display |should| be(False)
 
+    describe "Copying":
+        it "has the same options as clone(all=True) without calling set_everything":
+            options = Options()
+            options.set_everything(alias="Thing", match="thing", target="thing", needs_auth=["a.b"], promote_children=True)
+
+            fake_set_everything = fudge.Fake("set_everything")
+            with fudge.patched_context(Options, "set_everything", fake_set_everything):
+                copied = options.copy()
+
+            cloned = options.clone(all=True)
+            copied |should_not| be(options)
+            copied.__dict__ |should| equal_to(cloned.__dict__)
+
+        it "doesn't pass on display if propogate_display is False":
+            for display in (False, lambda r:1):
+                options = Options()
+                options.set_everything(display=display, propogate_display=False)
+                copied = options.copy()
+                copied.display |should| be(True)
+                copied.propogate_display |should| be(False)
+
+        it "original doesn't get affected if copy is modified":
+            options = Options()
+            copied = options.copy()
+            copied.alias = "Other"
+            options.alias |should| be(None)
+
     describe "Creating patterns":
         before_each:
             self.url_parts = fudge.Fake("url_parts")
@@ -296,6 +326,18 @@ describe "Options":
             for expected in ('^asdf/$', '^jlkl/$', '^qwer/$', '^ghjd/$'):
                 self.options.create_pattern(self.url_parts) |should| equal_to(expected)
 
+        @fudge.test
+        it "matches everything under the section if redirect is a RedirectMap":
+            self.options.redirect = RedirectMap()
+            (self.fake_string_from_url_parts.expects_call()
+                            .with_args(self.url_parts).returns('asdf')
+                .next_call().with_args(self.url_parts).returns('/jlkl/')
+                .next_call().with_args(self.url_parts).returns('')
+                )
+
+            for expected in ('^asdf/.*$', '^jlkl/.*$', '^.*$'):
+                self.options.create_pattern(self.url_parts) |should| equal_to(expected)
+
     describe "Getting string from url_parts":
         before_each:
             self.options = Options()
@@ -373,14 +415,20 @@ describe "Options":
             )
 
     describe "Getting redirect view":
-        it "returns a callable and self.extra_context":
+        it "returns the shared redirect view and kwargs with extra_context and the redirect":
             options = Options()
-            extra_context = fudge.Fake("extra_context")
-            options.extra_context = extra_context
+            redirect = fudge.Fake("redirect")
+            options.extra_context = {'one' : 1}
+
+            view, kwargs = options.redirect_view(redirect)
+            view |should| be(redirect_view)
+            kwargs |should| equal_to({'one' : 1, 'redirect' : redirect})
 
-            returned = options.redirect_view(fudge.Fake("redirect"))
-            callable(returned[0]) |should| be(True)
-            returned[1] |should| be(extra_context)
+            # Doesn't change extra_context
+            options.extra_context |should| equal_to({'one' : 1})
+
+        it "returns the same view for every section":
+            Options().redirect_view('/one')[0] |should| be(Options().redirect_view('two')[0])
 
         describe "returned callable":
             before_each:
@@ -392,43 +440,43 @@ describe "Options":
                 redirect.status_code |should| equal_to(301)
                 redirect.get('Location') |should| equal_to(destination)
 
+            def redirector(self, redirect):
+                view, kwargs = self.options.redirect_view(redirect)
+                return lambda request: view(request, **kwargs)
+
             @fudge.test
             it "raises 404 if redirect is None":
-                redirector, _ = self.options.redirect_view(None)
-                caller = lambda : redirector(self.request)
+                caller = lambda : self.redirector(None)(self.request)
                 Http404 |should| be_thrown_by(caller)
 
             @fudge.test
             it "raises 404 if redirect is callable and result of calling it is None":
                 self.redirect.expects_call().with_args(self.request).returns(None)
-                redirector, _ = self.options.redirect_view(self.redirect)
-                caller = lambda : redirector(self.request)
+                caller = lambda : self.redirector(self.redirect)(self.request)
                 Http404 |should| be_thrown_by(caller)
 
             @fudge.test
             it "uses self.redirect with url if it starts with /":
                 url = '/somewhere/nice'
-                result = fudge.Fake("result")
                 self.redirect.expects_call().with_args(self.request).returns(url)
 
-                redirector, _ = self.options.redirect_view(self.redirect)
-                self.assertRedirectsTo(redirector(self.request), url)
-
-                redirector2, _ = self.options.redirect_view('/stuff/asdf')
-                self.assertRedirectsTo(redirector2(self.request), '/stuff/asdf')
+                self.assertRedirectsTo(self.redirector(self.redirect)(self.request), url)
+                self.assertRedirectsTo(self.redirector('/stuff/asdf')(self.request), '/stuff/asdf')
 
             @fudge.test
             it "joins with request.path and removes multiple slashes if not starts with /":
-                result = fudge.Fake("result")
                 self.redirect.expects_call().with_args(self.request).returns('one/two')
 
-                redirector, _ = self.options.redirect_view(self.redirect)
                 self.request.path = '/asdf/hla/'
-                self.assertRedirectsTo(redirector(self.request), '/asdf/hla/one/two')
+                self.assertRedirectsTo(self.redirector(self.redirect)(self.request), '/asdf/hla/one/two')
 
-                redirector2, _ = self.options.redirect_view('stuff/asdf')
-                self.request.path = '/asdf/hla/'
-                self.assertRedirectsTo(redirector2(self.request), '/asdf/hla/stuff/asdf')
+                self.request.path = '/asdf//hla/'
+                self.assertRedirectsTo(self.redirector('stuff/asdf')(self.request), '/asdf/hla/stuff/asdf')
+
+            @fudge.test
+            it "ignores other kwargs from the url":
+                view, kwargs = self.options.redirect_view('/one')
+                self.assertRedirectsTo(view(self.request, thing=1, **kwargs), '/one')
 
         describe "Getting view kls":
             before_each:
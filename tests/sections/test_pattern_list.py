@@ -1,6 +1,7 @@
 # coding: spec
 
 from cwf.sections.pattern_list import PatternList
+from cwf.sections.section import Section
 import fudge
 import re
 
@@ -11,12 +12,15 @@ describe "PatternList":
             self.section = fudge.Fake("section")
             self.include_as = fudge.Fake("include_as")
             self.without_include = fudge.Fake("without_include")
+            self.profile = fudge.Fake("profile")
             self.section.has_children = True
 
-        it "sets section, stop_at, include_as and without_include to what's passed in":
+        it "sets section, stop_at, include_as, without_include and profile to what's passed in":
             lst = PatternList(self.section
                 , stop_at=self.stop_at, include_as=self.include_as, without_include=self.without_include
+                , profile=self.profile
                 )
+            lst.profile |should| be(self.profile)
             lst.stop_at |should| be(self.stop_at)
             lst.section |should| be(self.section)
             lst.include_as |should| be(self.include_as)
@@ -47,6 +51,7 @@ describe "PatternList":
             self.section = fudge.Fake("section")
             self.include_as = fudge.Fake("include_as")
             self.without_include = fudge.Fake("without_include")
+            self.profile = fudge.Fake("profile")
 
             self.fake_pattern_list_for = fudge.Fake("pattern_list_for")
 
@@ -55,6 +60,7 @@ describe "PatternList":
                   }
                 )(self.section
                     , stop_at=self.stop_at, include_as=self.include_as, without_include=self.without_include
+                    , profile=self.profile
                     )
 
         @fudge.patch("cwf.sections.pattern_list.PatternList")
@@ -82,9 +88,9 @@ describe "PatternList":
             list2 = fudge.Fake("list2")
             list3 = fudge.Fake("list3")
             (fakePatternList.expects_call()
-                            .with_args(section1, stop_at=self.stop_at, include_as=include_as1).returns(list1)
-                .next_call().with_args(section2, stop_at=self.stop_at, include_as=include_as2).returns(list2)
-                .next_call().with_args(section3, stop_at=self.stop_at, include_as=include_as3).returns(list3)
+                            .with_args(section1, stop_at=self.stop_at, include_as=include_as1, profile=self.profile, with_sections=False).returns(list1)
+                .next_call().with_args(section2, stop_at=self.stop_at, include_as=include_as2, profile=self.profile, with_sections=False).returns(list2)
+                .next_call().with_args(section3, stop_at=self.stop_at, include_as=include_as3, profile=self.profile, with_sections=False).returns(list3)
                 )
 
             (self.fake_pattern_list_for.expects_call()
@@ -115,7 +121,7 @@ describe "PatternList":
             path = fudge.Fake("path")
             includer = fudge.Fake("includer")
 
-            self.item.has_attr(include_as=self.include_as)
+            self.item.has_attr(include_as=self.include_as, section=self.section)
             self.pattern_list.expects("pattern_tuple_includer").returns((path, (opt1, opt2)))
             fake_django_include.expects_call().with_args(opt1, opt2).returns(includer)
 
@@ -153,6 +159,24 @@ describe "PatternList":
             self.item.has_attr(include_as=None, section=self.section)
             list(self.lst.pattern_list_for(self.item, pattern_list)) |should| equal_to([t1, t2, t3])
 
+    describe "Yielding sections with pattern tuples":
+        it "yields the section and a PatternList for includes if with_sections":
+            view = lambda request: None
+            site = Section('', name='site')
+            one = site.add('one').configure(target=view)
+            included = Section('', name='included')
+            two = included.add('two').configure(target=view)
+            site.add_child(included, include_as='inc')
+
+            found = list(PatternList(site, with_sections=True))
+            [(pattern_tuple[0], section) for pattern_tuple, section, _ in found] |should| equal_to(
+                [('^one/$', one), ('^inc/', included)]
+            )
+            found[0][2] |should| be(None)
+
+            inside = [(pattern_tuple[0], section, nested) for pattern_tuple, section, nested in found[1][2]]
+            inside |should| equal_to([('^two/$', two, None)])
+
     describe "Determining pattern tuple":
         before_each:
             self.view = fudge.Fake("view")
@@ -228,7 +252,7 @@ describe "PatternList":
             url_options = fudge.Fake("url_options")
 
             # without_include is True so that we get atleast one level of actual patterns
-            self.section.expects("patterns").with_args(without_include=True).returns(patterns)
+            self.section.expects("patterns").with_args(without_include=True, profile=None).returns(patterns)
 
             self.section.has_attr(url_options=url_options)
             url_options.has_attr(namespace=namespace, app_name=app_name)
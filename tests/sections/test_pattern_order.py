@@ -0,0 +1,61 @@
+# coding: spec
+
+from cwf.sections.pattern_order import PatternOrder, plain_url
+from cwf.sections.section import Section
+
+from django.http import HttpResponse
+
+def view(request):
+    return HttpResponse("")
+
+describe "PatternOrder":
+    def order(self, profile, *patterns):
+        tuples = [(pattern, view, {}, name) for name, pattern in patterns]
+        return [name for _, _, _, name in PatternOrder(profile).ordered(tuples)]
+
+    it "leaves patterns alone if there are no hits":
+        self.order({}, ('one', '^one/$'), ('two', '^two/$'), ('three', '^three/$')) |should| equal_to(
+            ['one', 'two', 'three']
+        )
+
+    it "puts patterns with the most hits first when they can't overlap":
+        self.order({'three' : 10, 'two' : 5}, ('one', '^one/$'), ('two', '^two/$'), ('three', '^three/$')) |should| equal_to(
+            ['three', 'two', 'one']
+        )
+
+    it "can get hits from the pattern instead of the name":
+        self.order({'^two/$' : 5}, ('one', '^one/$'), ('two', '^two/$')) |should| equal_to(['two', 'one'])
+
+    it "doesn't move a pattern in front of an earlier pattern that matches it":
+        self.order({'two' : 10}, ('one', '^.*/$'), ('two', '^two/$')) |should| equal_to(['one', 'two'])
+        self.order({'two' : 10}, ('one', '^(?P<thing>[^/]+)/$'), ('two', '^two/$')) |should| equal_to(['one', 'two'])
+
+    it "doesn't move regexes in front of regexes that start the same way":
+        self.order({'two' : 10}, ('one', '^a/(?P<b>\d+)/$'), ('two', '^a/(?P<c>\w+)/$')) |should| equal_to(['one', 'two'])
+        self.order({'two' : 10}, ('one', '^ab?/$'), ('two', '^a\d/$')) |should| equal_to(['one', 'two'])
+
+    it "moves regexes in front of regexes that start differently":
+        self.order({'two' : 10}, ('one', '^a/(?P<b>\d+)/$'), ('two', '^b/(?P<c>\w+)/$')) |should| equal_to(['two', 'one'])
+
+    it "moves hot patterns past the patterns it doesn't overlap with":
+        ordered = self.order({'hot' : 10}
+            , ('one', '^one/$'), ('any', '^h.*/$'), ('two', '^two/$'), ('hot', '^hot/$')
+            )
+        ordered |should| equal_to(['one', 'any', 'hot', 'two'])
+
+describe "Finding plain urls":
+    it "returns the url a pattern matches if it's just a string":
+        plain_url('^one/two/$') |should| equal_to('one/two/')
+        plain_url('') |should| equal_to(None)
+        plain_url('^one/') |should| equal_to(None)
+        plain_url('one/$') |should| equal_to(None)
+        plain_url('^o.e/$') |should| equal_to(None)
+
+describe "Ordering section patterns":
+    it "uses the profile to order the patterns":
+        section = Section('')
+        section.add('one', name='one').configure(target=view)
+        section.add('two', name='two').configure(target=view)
+
+        [p.name for p in section.patterns()] |should| equal_to(['one', 'two'])
+        [p.name for p in section.patterns(profile={'two' : 3})] |should| equal_to(['two', 'one'])
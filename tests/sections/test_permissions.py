@@ -0,0 +1,70 @@
+# coding: spec
+
+from cwf.sections.permissions import PermissionResolver, permissions_for
+
+import fudge
+
+describe "PermissionResolver":
+    before_each:
+        self.user = fudge.Fake("user").has_attr(is_active=True, is_superuser=False)
+        self.resolver = PermissionResolver(self.user)
+
+    it "proxies is_superuser and is_authenticated to the user":
+        authenticated = fudge.Fake("authenticated")
+        self.user.provides("is_authenticated").returns(authenticated)
+        self.resolver.is_superuser |should| be(False)
+        self.resolver.is_authenticated() |should| be(authenticated)
+
+    @fudge.test
+    it "gets all permissions from the user only once":
+        self.user.expects("get_all_permissions").times_called(1).returns(set(['app.one', 'app.two']))
+
+        self.resolver.has_perm('app.one') |should| be(True)
+        self.resolver.has_perm('app.two') |should| be(True)
+        self.resolver.has_perm('app.three') |should| be(False)
+        self.resolver.has_perm('app.one') |should| be(True)
+
+        self.resolver.checks |should| be(4)
+        self.resolver.answered |should| be(4)
+        self.resolver.backend_calls |should| be(1)
+        self.resolver.saved |should| be(3)
+        self.resolver.requested |should| equal_to(set(['app.one', 'app.two', 'app.three']))
+
+    it "says yes to everything for active super users without asking for permissions":
+        self.user.is_superuser = True
+        self.resolver.has_perm('app.one') |should| be(True)
+        self.resolver.backend_calls |should| be(0)
+
+    it "doesn't count checks that never needed the backend as saved":
+        self.user.is_superuser = True
+        self.resolver.has_perm('app.one') |should| be(True)
+        self.resolver.has_perm('app.two') |should| be(True)
+
+        self.user.is_superuser = False
+        self.user.is_active = False
+        self.resolver.has_perm('app.one') |should| be(False)
+
+        self.resolver.checks |should| be(3)
+        self.resolver.answered |should| be(0)
+        self.resolver.saved |should| be(0)
+
+    it "says no to everything for inactive users without asking for permissions":
+        self.user.is_active = False
+        self.user.is_superuser = True
+        self.resolver.has_perm('app.one') |should| be(False)
+        self.resolver.backend_calls |should| be(0)
+
+describe "Getting permissions for a request":
+    it "creates a resolver for request.user and memoizes it on the request":
+        user = fudge.Fake("user")
+        request = fudge.Fake("request").has_attr(user=user)
+
+        resolver = permissions_for(request)
+        resolver.user |should| be(user)
+        request.permissions |should| be(resolver)
+        permissions_for(request) |should| be(resolver)
+
+    it "uses request.permissions if it already exists":
+        permissions = fudge.Fake("permissions")
+        request = fudge.Fake("request").has_attr(permissions=permissions)
+        permissions_for(request) |should| be(permissions)
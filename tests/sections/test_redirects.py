@@ -0,0 +1,110 @@
+# coding: spec
+
+from cwf.sections.redirects import redirect_view, RedirectMap
+from cwf.sections.section import Section
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.urlresolvers import RegexURLResolver
+from django.test.client import RequestFactory
+from django.http import Http404
+
+from StringIO import StringIO
+import tempfile
+import os
+
+describe "Redirect view":
+    before_each:
+        self.request = RequestFactory().get('/one/two/')
+
+    it "joins relative addresses to the path without doubling slashes":
+        response = redirect_view(self.request, redirect='/three/')
+        response['Location'] |should| equal_to('/three/')
+
+        response = redirect_view(self.request, redirect='three/')
+        response['Location'] |should| equal_to('/one/two/three/')
+
+        response = redirect_view(RequestFactory().get('/one//two/'), redirect='three')
+        response['Location'] |should| equal_to('/one/two/three')
+
+    it "doesn't join addresses with a scheme to the path":
+        response = redirect_view(self.request, redirect='http://somewhere.com/else')
+        response['Location'] |should| equal_to('http://somewhere.com/else')
+
+describe "RedirectMap":
+    before_each:
+        self.factory = RequestFactory()
+        self.redirects = RedirectMap({'/old/one' : '/new/one', 'old/two/' : 'http://other.com/two'})
+
+    it "finds redirects for exact paths ignoring trailing slashes":
+        self.redirects(self.factory.get('/old/one')) |should| equal_to('/new/one')
+        self.redirects(self.factory.get('/old/one/')) |should| equal_to('/new/one')
+        self.redirects(self.factory.get('/old/two')) |should| equal_to('http://other.com/two')
+        self.redirects(self.factory.get('/old/one/more')) |should| be(None)
+        self.redirects.count |should| equal_to(2)
+
+    it "ignores the prefix the site is deployed under":
+        request = self.factory.get('/old/one', SCRIPT_NAME='/prefix')
+        request.path = '/prefix/old/one'
+        self.redirects(request) |should| equal_to('/new/one')
+
+    it "only carries GET params if it's told to":
+        request = self.factory.get('/old/one', {'a' : 1, 'b' : 2})
+        self.redirects(request) |should| equal_to('/new/one')
+
+        self.redirects.carry_get = True
+        self.redirects(request) |should| equal_to('/new/one?a=1&b=2')
+
+        self.redirects.ignore_get = ['b']
+        self.redirects(request) |should| equal_to('/new/one?a=1')
+
+        self.redirects.ignore_get = ['a', 'b']
+        self.redirects(request) |should| equal_to('/new/one')
+
+    it "can be loaded from a csv":
+        redirects = RedirectMap.from_csv(StringIO("/old/one,/new/one\n\n/old/two,/new/two\nincomplete\n"), carry_get=True)
+        redirects.redirects |should| equal_to({'/old/one' : '/new/one', '/old/two' : '/new/two'})
+        redirects.carry_get |should| be(True)
+
+    it "can be loaded from a csv filename":
+        fle, location = tempfile.mkstemp(suffix=".csv")
+        try:
+            os.write(fle, "/old/one,/new/one\n")
+            os.close(fle)
+            RedirectMap.from_csv(location).redirects |should| equal_to({'/old/one' : '/new/one'})
+        finally:
+            os.remove(location)
+
+    describe "as a section":
+        before_each:
+            self.section = Section('')
+            self.section.add('thing').configure(target=lambda request: None)
+            self.section.add('legacy').configure(redirect=RedirectMap({'/legacy/old/page.html' : '/new/page/'}))
+            self.resolver = RegexURLResolver(r'^/', self.section.patterns())
+
+        def request_for(self, path):
+            request = self.factory.get(path)
+            request.user = AnonymousUser()
+            return request
+
+        it "makes one pattern for every redirect":
+            [p.regex.pattern for p in self.section.patterns()] |should| equal_to(['^thing/$', '^legacy/.*$'])
+
+        it "still makes a pattern for a map that is empty until later":
+            redirects = RedirectMap()
+            section = Section('')
+            section.add('later').configure(redirect=redirects)
+            [p.regex.pattern for p in section.patterns()] |should| equal_to(['^later/.*$'])
+
+            redirects.update({'/later/page' : '/new/page/'})
+            view, args, kwargs = RegexURLResolver(r'^/', section.patterns()).resolve('/later/page')
+            view(self.request_for('/later/page'), *args, **kwargs)['Location'] |should| equal_to('/new/page/')
+
+        it "redirects paths in the map and gives 404 for the rest":
+            view, args, kwargs = self.resolver.resolve('/legacy/old/page.html')
+            response = view(self.request_for('/legacy/old/page.html'), *args, **kwargs)
+            response.status_code |should| equal_to(301)
+            response['Location'] |should| equal_to('/new/page/')
+
+            view, args, kwargs = self.resolver.resolve('/legacy/unknown')
+            with self.assertRaises(Http404):
+                view(self.request_for('/legacy/unknown'), *args, **kwargs)
@@ -2,6 +2,7 @@
 
 from cwf.sections.errors import ConfigurationError
 from cwf.sections.section import Section, Item
+from cwf.sections.pattern_list import PatternList
 
 from contextlib import contextmanager
 from django.http import Http404
@@ -668,12 +669,34 @@ describe "Section":
             tuples = (tuple1, tuple2, tuple3)
 
             (fakePatternList.expects_call()
-                .with_args(self.section, without_include=self.without_include).returns(tuples)
+                .with_args(self.section, without_include=self.without_include, profile=None).returns(tuples)
                 )
 
-            result = fudge.Fake("result")
+            result = [fudge.Fake("pattern")]
             fake_django_patterns.expects_call().with_args('', tuple1, tuple2, tuple3).returns(result)
-            self.section.patterns(without_include=self.without_include) |should| be(result)
+            self.section.patterns(without_include=self.without_include) |should| equal_to(result)
+
+        it "only makes the patterns again when something changes":
+            target = lambda request: None
+            self.section.add("one").configure(target=target)
+
+            made = []
+            def counted(*args, **kwargs):
+                made.append(True)
+                return PatternList(*args, **kwargs)
+
+            with fudge.patched_context("cwf.sections.section", "PatternList", counted):
+                first = self.section.patterns()
+                self.section.patterns() |should| equal_to(first)
+                len(made) |should| be(1)
+
+                # Changing the patterns we got back doesn't change the next ones
+                first.pop()
+                len(self.section.patterns()) |should| be(1)
+
+                self.section.add("two").configure(target=target)
+                [pattern.regex.pattern for pattern in self.section.patterns()] |should| equal_to(['^one/$', '^two/$'])
+                len(made) |should| be(2)
 
     describe "Cloning":
         @fudge.test
@@ -689,7 +712,7 @@ describe "Section":
                 .with_args(url=url, name=name, parent=parent).returns(new)
                 )
 
-            fake_options = fudge.Fake("options").expects("clone")
+            fake_options = fudge.Fake("options").expects("copy")
             section.options = fake_options
 
             with fudge.patched_context("cwf.sections.section", "Section", fakeSection):
@@ -711,7 +734,7 @@ describe "Section":
                 .with_args(url=new_url, name=new_name, parent=new_parent).returns(new)
                 )
 
-            fake_options = fudge.Fake("options").expects("clone")
+            fake_options = fudge.Fake("options").expects("copy")
             section.options = fake_options
 
             with fudge.patched_context("cwf.sections.section", "Section", fakeSection):
@@ -721,7 +744,7 @@ describe "Section":
         it "creates a clone of options for the new section":
             section = Section()
             new_options = fudge.Fake("new_options")
-            fake_options = fudge.Fake("options").expects("clone").with_args(all=True).returns(new_options)
+            fake_options = fudge.Fake("options").expects("copy").returns(new_options)
             section.options = fake_options
             section.clone().options |should| be(new_options)
 
@@ -739,7 +762,7 @@ describe "Section":
                 .with_args(url=new_url, name=name, parent=parent, a=a, b=b).returns(new)
                 )
 
-            fake_options = fudge.Fake("options").expects("clone")
+            fake_options = fudge.Fake("options").expects("copy")
             section.options = fake_options
 
             with fudge.patched_context("cwf.sections.section", "Section", fakeSection):
@@ -816,61 +839,131 @@ describe "Section":
 
         @fudge.test
         it "it can display if has permissions and options says can display":
-            user = fudge.Fake("user")
+            permissions = fudge.Fake("permissions")
             propogate_display = fudge.Fake("propogate_display")
 
-            self.request.user = user
+            self.request.permissions = permissions
             self.section.options = self.options.has_attr(propogate_display=propogate_display)
 
             (self.options
                 .expects("conditional").with_args("display", self.request).returns(True)
-                .expects("has_permissions").with_args(user).returns(True)
+                .expects("has_permissions").with_args(permissions).returns(True)
                 )
 
             self.section.can_display(self.request) |should| equal_to((True, propogate_display))
 
         @fudge.test
         it "it can't display if no permissions":
-            user = fudge.Fake("user")
+            permissions = fudge.Fake("permissions")
             propogate_display = fudge.Fake("propogate_display")
 
-            self.request.user = user
+            self.request.permissions = permissions
             self.section.options = self.options.has_attr(propogate_display=propogate_display)
 
             (self.options
                 .expects("conditional").with_args("display", self.request).returns(False)
-                .expects("has_permissions").with_args(user).returns(True)
+                .expects("has_permissions").with_args(permissions).returns(True)
                 )
 
             self.section.can_display(self.request) |should| equal_to((False, propogate_display))
 
         @fudge.test
         it "it can't display if not options.can_display":
-            user = fudge.Fake("user")
+            permissions = fudge.Fake("permissions")
             propogate_display = fudge.Fake("propogate_display")
 
-            self.request.user = user
+            self.request.permissions = permissions
             self.section.options = self.options.has_attr(propogate_display=propogate_display)
 
             (self.options
                 .expects("conditional").with_args("display", self.request).returns(True)
-                .expects("has_permissions").with_args(user).returns(False)
+                .expects("has_permissions").with_args(permissions).returns(False)
                 )
 
             self.section.can_display(self.request) |should| equal_to((False, propogate_display))
 
         @fudge.test
         it "it can't display if neither permissions nor options.can_display":
-            user = fudge.Fake("user")
+            permissions = fudge.Fake("permissions")
             has_permissions = fudge.Fake("has_permissions")
             propogate_display = fudge.Fake("propogate_display")
 
-            self.request.user = user
+            self.request.permissions = permissions
             self.section.options = self.options.has_attr(propogate_display=propogate_display)
 
             (self.options
                 .expects("conditional").with_args("display", self.request).returns(False)
-                .expects("has_permissions").with_args(user).returns(False)
+                .expects("has_permissions").with_args(permissions).returns(False)
                 )
 
             self.section.can_display(self.request) |should| equal_to((False, propogate_display))
+
+    describe "Tracking changes":
+        before_each:
+            self.root = Section(name="root")
+            self.one = self.root.add("one")
+            self.two = self.root.add("two")
+            self.three = self.one.add("three")
+
+        it "increments version of section and it's ancestors but not siblings":
+            versions = lambda : [s.version for s in (self.root, self.one, self.two, self.three)]
+            before = versions()
+            self.three.configure(alias="Three")
+            [a - b for a, b in zip(versions(), before)] |should| equal_to([1, 1, 0, 1])
+
+            before = versions()
+            self.two.add("four")
+            [a - b for a, b in zip(versions(), before)] |should| equal_to([1, 0, 1, 0])
+
+        it "tells listeners on the section and it's ancestors what changed":
+            called = []
+            self.root.listen(lambda section: called.append(("root", section)))
+            self.one.listen(lambda section: called.append(("one", section)))
+            self.two.listen(lambda section: called.append(("two", section)))
+
+            self.three.configure(alias="Three")
+            called |should| equal_to([("one", self.three), ("root", self.three)])
+
+        it "remakes cached values when the section or anything under it changes":
+            made = []
+            maker = lambda : made.append(1) or len(made)
+
+            self.one.cached("thing", maker) |should| be(1)
+            self.one.cached("thing", maker) |should| be(1)
+
+            self.three.configure(alias="Three")
+            self.one.cached("thing", maker) |should| be(2)
+
+            self.two.configure(alias="Two")
+            self.one.cached("thing", maker) |should| be(2)
+
+        it "remakes cached values when an ancestor itself changes but not when siblings are added":
+            made = []
+            maker = lambda : made.append(1) or len(made)
+
+            self.three.cached("thing", maker) |should| be(1)
+            self.root.add("five")
+            self.three.cached("thing", maker) |should| be(1)
+
+            self.root.configure(module="somewhere")
+            self.three.cached("thing", maker) |should| be(2)
+
+        it "can remove children":
+            self.root.remove(self.one) |should| be(self.one)
+            [item.section for item in self.root.children] |should| equal_to([self.two])
+
+            with self.assertRaisesRegexp(ConfigurationError, "is not a child of"):
+                self.root.remove(self.one)
+
+        it "stops passing on changes from removed children":
+            self.root.remove(self.one)
+            self.one.parent |should| be(None)
+
+            stamp = self.root.stamp
+            called = []
+            self.root.listen(called.append)
+
+            self.three.configure(alias="Three")
+            self.one.add("four")
+            self.root.stamp |should| equal_to(stamp)
+            called |should| equal_to([])
@@ -0,0 +1,3 @@
+from cwf.sections.section import Section
+
+section = Section('events').configure(target=lambda request: None)
@@ -0,0 +1 @@
+registered = True
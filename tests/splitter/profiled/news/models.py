@@ -0,0 +1,4 @@
+__all__ = ['Story']
+
+class Story(object):
+    pass
@@ -0,0 +1,4 @@
+from cwf.sections.section import Section
+
+section = Section('news').configure(target=lambda request: None)
+section.add('archive').configure(target=lambda request: None)
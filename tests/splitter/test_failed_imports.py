@@ -0,0 +1,90 @@
+# coding: spec
+
+from cwf.splitter.imports import FailedImports, FailedImport
+
+from django.core.signals import got_request_exception
+
+import tempfile
+import shutil
+import fudge
+import sys
+import os
+
+describe "FailedImports":
+    before_each:
+        self.failed = FailedImports()
+
+        # Make a package of modules that fail to import
+        self.folder = tempfile.mkdtemp()
+        self.package = "failing_%s" % os.path.basename(self.folder)
+        package_folder = os.path.join(self.folder, self.package)
+        os.mkdir(package_folder)
+        for name, source in (
+              ('__init__', '')
+            , ('imports_broken', 'import %s.broken\n' % self.package)
+            , ('broken', 'value = 1\nraise ValueError("broken")\n')
+            , ('bad_syntax', 'def nope(:\n')
+            ):
+            with open(os.path.join(package_folder, "%s.py" % name), 'w') as fle:
+                fle.write(source)
+        sys.path.insert(0, self.folder)
+
+    after_each:
+        sys.path.remove(self.folder)
+        shutil.rmtree(self.folder)
+        for key in sys.modules.keys():
+            if key.startswith(FailedImports.prefix) or key.startswith(self.package):
+                del sys.modules[key]
+
+    def import_failure(self, name):
+        try:
+            __import__("%s.%s" % (self.package, name))
+            assert False, "Expected an error"
+        except Exception:
+            return sys.exc_info()
+
+    def location(self, name):
+        return os.path.join(self.folder, self.package, "%s.py" % name)
+
+    it "records every module that failed because of the error":
+        self.failed.record(*self.import_failure("imports_broken"))
+
+        expected = set([self.location("imports_broken"), self.location("broken")])
+        self.failed.files |should| equal_to(expected)
+        for filename in self.failed.files:
+            failed = sys.modules["%s%s" % (FailedImports.prefix, filename)]
+            failed |should| be_instance_of(FailedImport)
+            failed.__file__ |should| equal_to(filename)
+
+        ("%s.broken" % self.package in sys.modules) |should| be(False)
+
+    it "records files with syntax errors":
+        self.failed.record(*self.import_failure("bad_syntax"))
+        self.failed.files |should| equal_to(set([self.location("bad_syntax")]))
+
+    it "doesn't record modules that imported fine":
+        try:
+            raise ValueError("not an import")
+        except ValueError:
+            self.failed.record(*sys.exc_info())
+        self.failed.files |should| equal_to(set())
+
+    it "records failures from requests and uncaught exceptions once installed":
+        excepthook = fudge.Fake("excepthook").expects_call()
+        with fudge.patched_context(sys, "excepthook", excepthook):
+            self.failed.install()
+            self.failed.install()
+            try:
+                exc_info = self.import_failure("bad_syntax")
+                sys.excepthook(*exc_info)
+                self.failed.files |should| equal_to(set([self.location("bad_syntax")]))
+
+                try:
+                    raise exc_info[0], exc_info[1], exc_info[2]
+                except SyntaxError:
+                    self.failed.files = set()
+                    got_request_exception.send(sender=None, request=None)
+                self.failed.files |should| equal_to(set([self.location("bad_syntax")]))
+            finally:
+                got_request_exception.disconnect(dispatch_uid="cwf.failed_imports")
+        fudge.verify()
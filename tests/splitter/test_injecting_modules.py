@@ -1,6 +1,6 @@
 # coding: spec
 
-from cwf.splitter.imports import FileFaker, steal, inject
+from cwf.splitter.imports import FileFaker, InjectedModules, ModuleProxy, injected, steal, inject
 import stolen_vars
 
 import fudge
@@ -87,6 +87,94 @@ describe "Injecting modules":
             mod.__name__ |should| equal_to("cwf.hurmph")
             mod.value |should| be(val)
 
+    it "only ever puts one finder on the meta path":
+        inject({'blah':'things'}, 'wolverine')
+        inject({'blah':'stuff'}, 'cyclops', 'storm')
+
+        [finder for finder in sys.meta_path if isinstance(finder, InjectedModules)] |should| equal_to([injected])
+        [finder for finder in sys.meta_path if isinstance(finder, FileFaker)] |should| equal_to([])
+        __import__('storm').blah |should| equal_to('stuff')
+
+describe "InjectedModules":
+    before_each:
+        self.finder = InjectedModules()
+
+    it "finds the faker registered for a name":
+        faker1 = FileFaker(['a', 'b.c'], 1)
+        faker2 = FileFaker(['d.e.f'], 2)
+        self.finder.add(faker1)
+        self.finder.add(faker2)
+
+        self.finder.find_module('a') |should| be(faker1)
+        self.finder.find_module('b.c', ['/somewhere']) |should| be(faker1)
+        self.finder.find_module('d.e.f') |should| be(faker2)
+
+        for fullname in ['t', 'b', 'd.e']:
+            self.finder.find_module(fullname) |should| be(None)
+
+    it "replaces fakers for names that are injected again":
+        faker1 = FileFaker(['a', 'b'], 1)
+        faker2 = FileFaker(['b'], 2)
+        self.finder.add(faker1)
+        self.finder.add(faker2)
+
+        self.finder.find_module('a') |should| be(faker1)
+        self.finder.find_module('b') |should| be(faker2)
+
+    it "can invalidate injected names":
+        called = []
+        def value():
+            called.append(True)
+            return {'count' : len(called)}
+
+        inject(value, 'gambit')
+        __import__('gambit').count |should| equal_to(1)
+        __import__('gambit').count |should| equal_to(1)
+
+        injected.invalidate('gambit', 'not_injected')
+        __import__('gambit').count |should| equal_to(2)
+
+    it "only installs itself once":
+        meta_path = []
+        with fudge.patched_context("sys", "meta_path", meta_path):
+            self.finder.install()
+            self.finder.install()
+        meta_path |should| equal_to([self.finder])
+
+describe "ModuleProxy":
+    it "gets everything in __all__ if the module has __all__":
+        source = imp.new_module('source')
+        source.__dict__.update(dict(a=1, b=2, c=3, d=4, __all__=['a', 'b', 'c']))
+        proxy = ModuleProxy('proxy', source)
+
+        (proxy.a, proxy.b, proxy.c) |should| equal_to((1, 2, 3))
+        hasattr(proxy, 'd') |should| be(False)
+        proxy.__all__ |should| equal_to(['a', 'b', 'c'])
+
+    it "gets everything not starting with two underscores if no __all__":
+        source = imp.new_module('source')
+        source.__dict__.update(dict(a=1, _a=2, __ignored=3))
+        proxy = ModuleProxy('proxy', source)
+
+        (proxy.a, proxy._a) |should| equal_to((1, 2))
+        hasattr(proxy, '__ignored') |should| be(False)
+        hasattr(proxy, 'missing') |should| be(False)
+        sorted(proxy.__all__) |should| equal_to(['_a', 'a'])
+
+    it "sees changes to the source module":
+        source = imp.new_module('source')
+        proxy = ModuleProxy('proxy', source)
+        hasattr(proxy, 'later') |should| be(False)
+
+        source.later = 1
+        proxy.later |should| equal_to(1)
+
+    it "works with from import star":
+        inject(stolen_vars, 'spiderman')
+        namespace = {}
+        exec "from spiderman import *" in namespace
+        (namespace['a'], namespace['one']) |should| equal_to(('a', 1))
+
 describe "FileFaker":
     before_each:
         self.names = fudge.Fake("names")
@@ -99,32 +187,30 @@ describe "FileFaker":
         file_faker._value |should| be(self.value)
 
     describe "Getting value":
-        before_each:
-            self.fake_normalize_value = fudge.Fake("normalize_value")
-            self.file_faker = type("Faker", (FileFaker, )
-                , { 'normalize_value' : self.fake_normalize_value
-                  }
-                )(self.names, self.value)
-
         @fudge.test
-        it "passes result of calling value into normalize_value if callable":
+        it "calls value and remembers the result if callable":
             result = fudge.Fake("result")
-            normalized = fudge.Fake("normalized")
+            self.value.expects_call().times_called(1).returns(result)
 
-            self.value.expects_call().returns(result)
-            self.fake_normalize_value.expects_call().with_args(result).returns(normalized)
+            self.file_faker.value |should| be(result)
+            self.file_faker.value |should| be(result)
 
-            self.file_faker.value |should| be(normalized)
-
-        @fudge.test
-        it "just passes straight into normalize_value if not callable":
+        it "just returns value if not callable":
             value = type("value", (object, ), {})()
-            normalized = fudge.Fake("normalized")
-
             self.file_faker._value = value
-            self.fake_normalize_value.expects_call().with_args(value).returns(normalized)
+            self.file_faker.value |should| be(value)
 
-            self.file_faker.value |should| be(normalized)
+        @fudge.test
+        it "calls value again after being invalidated":
+            result1 = fudge.Fake("result1")
+            result2 = fudge.Fake("result2")
+            self.value.expects_call().returns(result1).next_call().returns(result2)
+
+            self.file_faker.value |should| be(result1)
+            self.file_faker.invalidate()
+            self.file_faker.invalidate()
+            self.file_faker.value |should| be(result2)
+            self.file_faker.value |should| be(result2)
 
     describe "find_module":
         it "returns self if requested fullname is in self.names":
@@ -148,33 +234,6 @@ describe "FileFaker":
             with fudge.patched_context("sys", "modules", modules):
                 self.file_faker.path_from_fullname("path.to.things.stuff") |should| equal_to((path, 'stuff'))
 
-    describe "Normalizing the value":
-        it "returns value as is if not a module":
-            for val in (
-                  0, 1, True, False, [], [1], {}, {1:2}
-                , fudge.Fake("val"), type("object", (object, ), {}), type("object", (object, ), {})()
-                , lambda : 2
-                ):
-                self.file_faker.normalize_value(val) |should| be(val)
-
-        it "creates a dictionary of everything in __all__ if it's a module with __all__":
-            args = dict(a=1, b=2, c=3, d=4, e=5, __all__=['a', 'b', 'c'])
-            module = imp.new_module('name')
-            module.__dict__.update(args)
-            self.file_faker.normalize_value(module) |should| equal_to({'a':1, 'b':2, 'c':3})
-
-        it "creates a dictionary from all attributes not starting with two underscores if no __all__":
-            args = dict(a=1, b=2, c=3, d=4, e=5, _a=6, __ignored=7)
-            module = imp.new_module('name')
-            module.__dict__.update(args)
-            self.file_faker.normalize_value(module) |should| equal_to({'a':1, 'b':2, 'c':3, 'd':4, 'e':5, '_a':6})
-
-        it "works with an actual module rather than one I made on the fly for tests":
-            this_dir = os.path.dirname(__file__)
-            self.file_faker.normalize_value(stolen_vars) |should| equal_to(
-                dict(a='a', b='b', c='c', one=1, two=2, three=3, _hidden='_hidden', this_dir=this_dir, os=os, steal=steal)
-                )
-
     describe "Loading the module":
         before_each:
             self.fullname = "name.to.module"
@@ -210,6 +269,27 @@ describe "FileFaker":
             module.__dict__['b'] |should| equal_to('b')
             module.__dict__['c'] |should| equal_to('c')
 
+        @fudge.test
+        it "proxies modules rather than copying them":
+            self.file_faker.value = stolen_vars
+            self.fake_path_from_fullname.expects_call().returns(('', 'blah'))
+            with fudge.patched_context("sys", "modules", {}):
+                module = self.file_faker.load_module(self.fullname)
+                sys.modules[self.fullname] |should| be(module)
+
+            module |should| be_instance_of(ModuleProxy)
+            ('a' in module.__dict__) |should| be(False)
+            module.a |should| equal_to('a')
+
+        @fudge.test
+        it "reuses the module already in sys.modules":
+            existing = imp.new_module(self.fullname)
+            self.file_faker.value = {'a':'a'}
+            self.fake_path_from_fullname.expects_call().returns(('', 'blah'))
+            with fudge.patched_context("sys", "modules", {self.fullname : existing}):
+                self.file_faker.load_module(self.fullname) |should| be(existing)
+            existing.a |should| equal_to('a')
+
         @fudge.test
         it "populates the module {value:value} if self.values is not a dictionary":
             self.fake_path_from_fullname.expects_call().returns(('', 'blah'))
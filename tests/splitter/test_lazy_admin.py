@@ -0,0 +1,91 @@
+# coding: spec
+
+from cwf.splitter.lazy_admin import LazyAdmin
+
+from django.conf.urls import patterns, include, url
+from django.core.urlresolvers import RegexURLResolver
+
+class Site(object):
+    """Stand in for an AdminSite"""
+    name = "admin"
+    app_name = "admin"
+
+    def __init__(self):
+        self.registry = []
+
+    def get_urls(self):
+        return patterns('', *[url(r'^%s/$' % name, lambda request: None, name=name) for name in self.registry])
+
+describe "LazyAdmin":
+    before_each:
+        self.site = Site()
+        self.lazy_admin = LazyAdmin(self.site)
+
+    def register(self, name):
+        return lambda : self.site.registry.append(name)
+
+    it "doesn't call loaders until the admin site's urls are asked for":
+        self.lazy_admin.add(self.register('one'))
+        self.lazy_admin.add(self.register('two'))
+        self.site.registry |should| equal_to([])
+
+        [pattern.name for pattern in self.site.get_urls()] |should| equal_to(['one', 'two'])
+        self.site.get_urls()
+        self.site.registry |should| equal_to(['one', 'two'])
+
+    it "only hooks into the site once":
+        self.lazy_admin.add(self.register('one'))
+        get_urls = self.site.get_urls
+        self.lazy_admin.add(self.register('two'))
+        self.site.get_urls |should| be(get_urls)
+
+    it "calls loaders straight away once it has loaded":
+        self.lazy_admin.load()
+        self.lazy_admin.add(self.register('one'))
+        self.site.registry |should| equal_to(['one'])
+
+    it "keeps loaders that fail so they are tried again":
+        failures = []
+        def fails():
+            if not failures:
+                failures.append(True)
+                raise ValueError("nope")
+            self.site.registry.append('fails')
+
+        self.lazy_admin.add(fails)
+        self.lazy_admin.add(self.register('two'))
+        with self.assertRaises(ValueError):
+            self.lazy_admin.load()
+        self.lazy_admin.loaded |should| be(False)
+
+        self.lazy_admin.load()
+        self.site.registry |should| equal_to(['fails', 'two'])
+
+    it "waits till the urls are resolved when included":
+        self.lazy_admin.add(self.register('one'))
+        urlpatterns = patterns('', url(r'^admin/', include(self.lazy_admin.urls)))
+        self.site.registry |should| equal_to([])
+
+        resolver = RegexURLResolver(r'^/', urlpatterns)
+        match = resolver.resolve('/admin/one/')
+        (match.url_name, match.namespace) |should| equal_to(('one', 'admin'))
+        self.site.registry |should| equal_to(['one'])
+
+    it "only gets the urls from the site once until another loader is added":
+        self.lazy_admin.add(self.register('one'))
+        calls = []
+        get_urls = self.site.get_urls
+        def counted():
+            calls.append(True)
+            return get_urls()
+        self.site.get_urls = counted
+
+        urlpatterns = patterns('', url(r'^admin/', include(self.lazy_admin.urls)))
+        resolver = RegexURLResolver(r'^/', urlpatterns)
+        for _ in range(3):
+            resolver.resolve('/admin/one/').url_name |should| equal_to('one')
+        len(calls) |should| be(1)
+
+        self.lazy_admin.add(self.register('two'))
+        [pattern.name for pattern in self.lazy_admin] |should| equal_to(['one', 'two'])
+        len(calls) |should| be(2)
@@ -1,9 +1,13 @@
 # coding: spec
 
-from cwf.splitter.parts import Part
+from cwf.splitter.parts import Part, PartManifest, manifest_for, manifests
 
+import tempfile
+import imp
+import shutil
 import fudge
 import types
+import os
 
 describe "Part":
     it "gets name, active and kwargs":
@@ -16,6 +20,18 @@ describe "Part":
         part.active |should| be(active)
         part.kwargs |should| equal_to(dict(one=1, two=2))
 
+    it "takes labels of parts to come after out of kwargs":
+        Part("one").after |should| equal_to(())
+        Part("one", after="two").after |should| equal_to(("two", ))
+
+        part = Part("one", after=["two", "three"], four=4)
+        part.after |should| equal_to(["two", "three"])
+        part.kwargs |should| equal_to(dict(four=4, include_as="one"))
+
+    it "has a label from it's name":
+        Part("one").label |should| equal_to("one")
+        Part(imp.new_module('package.two')).label |should| equal_to("two")
+
     it "adds include_as to kwargs if name is a string and kwargs doesn't have include_as":
         name = "to include as"
         part = Part(name)
@@ -114,3 +130,85 @@ describe "Part":
             correct = part2.load("correct")
             from tests.splitter.website.part2 import correct as real_correct
             correct |should| be(real_correct)
+
+        it "doesn't ask the filesystem about each module once it has a manifest":
+            part2 = Part("part2", True)
+            part2.do_import("tests.splitter.website")
+            manifest_for(part2.pkg)
+
+            with fudge.patched_context("imp", "find_module", fudge.Fake("find_module")):
+                part2.load("not_there") |should| be(None)
+                part2.load("correct").__name__ |should| equal_to("tests.splitter.website.part2.correct")
+
+        it "only looks inside folders in the manifest the first time it loads them":
+            part2 = Part("part2", True)
+            part2.do_import("tests.splitter.website")
+            manifest = manifest_for(part2.pkg)
+            try:
+                manifest.candidates['not_a_package'] = manifest.paths[0]
+                part2.load("not_a_package") |should| be(None)
+                ('not_a_package' in manifest.candidates) |should| be(False)
+            finally:
+                manifests.clear()
+
+        it "uses find_module if the manifest isn't complete":
+            part2 = Part("part2", True)
+            part2.do_import("tests.splitter.website")
+            manifest_for(part2.pkg).complete = False
+            try:
+                fake_find_module = fudge.Fake("find_module").expects_call().raises(ImportError)
+                with fudge.patched_context("imp", "find_module", fake_find_module):
+                    part2.load("not_there") |should| be(None)
+                fudge.verify()
+            finally:
+                manifests.clear()
+
+describe "PartManifest":
+    before_each:
+        self.folder = tempfile.mkdtemp()
+        for filename in ('admin.py', 'models.pyc', 'README', 'notes.txt'):
+            open(os.path.join(self.folder, filename), 'w').close()
+
+        for folder, init in (('urls', '__init__.py'), ('empty', None), ('static', 'style.css')):
+            os.mkdir(os.path.join(self.folder, folder))
+            if init:
+                open(os.path.join(self.folder, folder, init), 'w').close()
+
+    after_each:
+        shutil.rmtree(self.folder)
+
+    it "knows which modules and packages are in the folders":
+        manifest = PartManifest([self.folder])
+        manifest.complete |should| be(True)
+        for name in ('admin', 'models', 'urls'):
+            (name in manifest) |should| be(True)
+
+        for name in ('README', 'notes', 'empty', 'static', 'views'):
+            (name in manifest) |should| be(False)
+
+    it "doesn't change what it knows when asked about a name":
+        manifest = PartManifest([self.folder])
+        candidates = dict(manifest.candidates)
+        modules = set(manifest.modules)
+        for name in ('urls', 'empty', 'views'):
+            (name in manifest) |should| equal_to(name == 'urls')
+        manifest.candidates |should| equal_to(candidates)
+        manifest.modules |should| equal_to(modules)
+
+    it "only lists folders when it is made":
+        manifest = PartManifest([self.folder])
+        open(os.path.join(self.folder, 'views.py'), 'w').close()
+        ('views' in manifest) |should| be(False)
+
+    it "isn't complete if a path can't be listed":
+        manifest = PartManifest([os.path.join(self.folder, 'missing'), self.folder])
+        manifest.complete |should| be(False)
+        ('admin' in manifest) |should| be(True)
+
+    it "is memoized for each package":
+        package = type("package", (object, ), {'__path__' : [self.folder]})
+        try:
+            manifest_for(package) |should| be(manifest_for(package))
+            manifest_for(object()) |should| be(None)
+        finally:
+            manifests.pop((self.folder, ), None)
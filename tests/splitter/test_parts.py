@@ -1,8 +1,12 @@
 # coding: spec
 
-from cwf.splitter.parts import Parts
+from cwf.splitter.parts import Parts, Part, manifests
+from cwf.sections.errors import ConfigurationError
+from cwf.sections.section import Section
 
+import weakref
 import fudge
+import gc
 
 describe "Parts Collection":
     before_each:
@@ -16,6 +20,11 @@ describe "Parts Collection":
         parts = Parts(self.package, self.p1, self.p2, self.p3)
         parts.package |should| be(self.package)
         parts.parts |should| equal_to((self.p1, self.p2, self.p3))
+        parts.workers |should| be(None)
+        parts.timings |should| equal_to({})
+
+    it "takes workers from kwargs":
+        Parts(self.package, workers=4).workers |should| equal_to(4)
 
     describe "Getting things":
         before_each:
@@ -33,7 +42,7 @@ describe "Parts Collection":
             it "loads admin for each part":
                 self.p1.expects("load").with_args("admin")
                 self.p2.expects("load").with_args("admin")
-                self.fake_each_part.expects_call().with_args(self.active_only).returns((self.p1, self.p2))
+                self.fake_each_part.expects_call().with_args(self.active_only, ordered=True).returns((self.p1, self.p2))
                 self.parts.load_admin(self.active_only)
 
         describe "Getting models":
@@ -44,7 +53,7 @@ describe "Parts Collection":
                 models.one = 1
                 models.two = 2
                 models.three = 3
-                self.fake_each_part.expects_call().with_args(self.active_only).returns((self.p1, ))
+                self.fake_each_part.expects_call().with_args(self.active_only, ordered=True).returns((self.p1, ))
                 self.p1.expects("load").with_args("models").returns(models)
                 self.parts.models(self.active_only) |should| equal_to(dict(one=1, two=2, three=3))
 
@@ -55,7 +64,7 @@ describe "Parts Collection":
                 models.two = type("two", (object, ), {})
                 models.three = type("three", (object, ), {})
                 models.__all__ = [models.one, models.two, models.three]
-                self.fake_each_part.expects_call().with_args(self.active_only).returns((self.p1, ))
+                self.fake_each_part.expects_call().with_args(self.active_only, ordered=True).returns((self.p1, ))
                 self.p1.expects("load").with_args("models").returns(models)
                 self.parts.models(self.active_only) |should| equal_to(
                     dict(one=models.one, two=models.two, three=models.three)
@@ -75,7 +84,7 @@ describe "Parts Collection":
                 models2.four = 4
                 models2.five = 5
 
-                self.fake_each_part.expects_call().with_args(self.active_only).returns((self.p1, self.p2))
+                self.fake_each_part.expects_call().with_args(self.active_only, ordered=True).returns((self.p1, self.p2))
                 self.p1.expects("load").with_args("models").returns(models1)
                 self.p2.expects("load").with_args("models").returns(models2)
                 self.parts.models(self.active_only) |should| equal_to(dict(one=6, two=2, three=3, four=4, five=5))
@@ -93,7 +102,7 @@ describe "Parts Collection":
                 models2.four = 4
                 models2.five = 5
 
-                self.fake_each_part.expects_call().with_args(self.active_only).returns((self.p1, self.p2))
+                self.fake_each_part.expects_call().with_args(self.active_only, ordered=True).returns((self.p1, self.p2))
                 self.p1.expects("load").with_args("models").returns(models1)
                 self.p2.expects("load").with_args("models").returns(models2)
                 self.parts.models(self.active_only) |should| equal_to(dict(one=1, two=2, three=3))
@@ -110,6 +119,18 @@ describe "Parts Collection":
                 with fudge.patched_context(self.parts, 'site', fake_site):
                     self.parts.urls(self.active_only) |should| equal_to(dict(site=site, urlpatterns=patterns))
 
+            @fudge.test
+            it "passes profile into site.patterns":
+                site = fudge.Fake("site")
+                profile = fudge.Fake("profile")
+                patterns = fudge.Fake("patterns")
+
+                fake_site = fudge.Fake("site").expects_call().with_args(self.package, self.active_only).returns(site)
+                site.expects("patterns").with_args(profile=profile).returns(patterns)
+
+                with fudge.patched_context(self.parts, 'site', fake_site):
+                    self.parts.urls(self.active_only, profile=profile) |should| equal_to(dict(site=site, urlpatterns=patterns))
+
             @fudge.test
             it "adds default url objects from django if include_defaults is True":
                 site = fudge.Fake("site")
@@ -184,10 +205,52 @@ describe "Parts Collection":
         it "Imports all the parts":
             parts = [self.p1, self.p2, self.p3]
             self.parts.parts = parts
-            self.p1.expects("do_import").with_args(self.package)
-            self.p2.expects("do_import").with_args(self.package)
-            self.p3.expects("do_import").with_args(self.package)
+            for label, part in (('p1', self.p1), ('p2', self.p2), ('p3', self.p3)):
+                part.has_attr(label=label, after=())
+                part.expects("do_import").with_args(self.package)
             self.parts.import_parts()
+            sorted(self.parts.timings[self.p1].keys()) |should| equal_to(['import'])
+
+        it "imports parts after the parts they name":
+            order = []
+            def part(label, *after):
+                made = Part(label, after=after)
+                made.do_import = lambda package: order.append(label)
+                return made
+
+            self.parts.parts = (part('one', 'three'), part('two'), part('three', 'two'), part('four'))
+            self.parts.imported_parts
+            order |should| equal_to(['two', 'three', 'one', 'four'])
+            [p.label for p in self.parts.each_part(ordered=True)] |should| equal_to(order)
+            [p.label for p in self.parts.each_part()] |should| equal_to(['one', 'two', 'three', 'four'])
+
+        it "complains about parts that come after each other":
+            self.parts.parts = (Part('one', after='three'), Part('two'), Part('three', after=['two', 'one']))
+            with self.assertRaisesRegexp(ConfigurationError, "one -> three -> one"):
+                self.parts.import_order
+
+        it "complains about coming after parts that don't exist":
+            self.parts.parts = (Part('one', after='two'), )
+            with self.assertRaisesRegexp(ConfigurationError, "one comes after two"):
+                self.parts.import_order
+
+        it "scans part folders in threads if it has workers":
+            parts = Parts("tests.splitter.website", Part("part1"), Part("part2"), workers=2)
+            try:
+                parts.imported_parts
+                part1, part2 = parts.parts
+                manifests |should| contain(tuple(part1.pkg.__path__))
+                manifests |should| contain(tuple(part2.pkg.__path__))
+                sorted(parts.timings[part1].keys()) |should| equal_to(['import', 'scan'])
+            finally:
+                manifests.clear()
+
+        @fudge.patch("cwf.splitter.parts.ThreadPool")
+        it "waits for the scanning threads to finish", fakeThreadPool:
+            parts = Parts("tests.splitter.website", Part("part1"), workers=2)
+            pool = fudge.Fake("pool").expects("map").expects("close").expects("join")
+            fakeThreadPool.expects_call().with_args(2).returns(pool)
+            parts.scan_parts()
 
     describe "Getting a site object":
         before_each:
@@ -222,10 +285,40 @@ describe "Parts Collection":
                 .next_call().with_args(self.section3, five=5, six=6)
                 )
 
+            for part_section in (self.section1, self.section2, self.section3):
+                part_section.expects("listen")
+
             section = fudge.Fake("section").expects("configure").with_args(promote_children=True).returns(site)
             fakeSection.expects_call().with_args(self.name).returns(section)
             self.parts.site(self.name, self.active_only) |should| be(site)
 
+        it "tells the site when a part's section changes":
+            part_section = Section(name="part")
+            self.fake_each_part.expects_call().with_args(self.active_only).returns([self.p1])
+            self.p1.expects("load").with_args("urls").returns(self.urls1.has_attr(section=part_section))
+            self.p1.has_attr(kwargs={})
+
+            site = self.parts.site("site", self.active_only)
+            version = site.version
+            part_section.add("more")
+            site.version |should| be_greater_than(version)
+
+        it "only listens to a part's section once and doesn't keep old sites alive":
+            part_section = Section(name="part")
+            self.fake_each_part.expects_call().with_args(self.active_only).returns([self.p1])
+            self.p1.expects("load").with_args("urls").returns(self.urls1.has_attr(section=part_section))
+            self.p1.has_attr(kwargs={})
+
+            old = weakref.ref(self.parts.site("site", self.active_only))
+            site = self.parts.site("site", self.active_only)
+            gc.collect()
+            old() |should| be(None)
+            len(part_section._listeners) |should| be(1)
+
+            version = site.version
+            part_section.add("more")
+            site.version |should| be_greater_than(version)
+
         @fudge.patch("cwf.splitter.parts.Section")
         it "ignores parts that don't have urls or a section", fakeSection:
             site = fudge.Fake("site")
@@ -243,6 +336,7 @@ describe "Parts Collection":
             # Because p1 doesn't have urls
             # And p2 doesn't have urls.section
             site.expects("add_child").with_args(self.section3, five=5, six=6)
+            self.section3.expects("listen")
             section = fudge.Fake("section").expects("configure").with_args(promote_children=True).returns(site)
             fakeSection.expects_call().with_args(self.name).returns(section)
             self.parts.site(self.name, self.active_only) |should| be(site)
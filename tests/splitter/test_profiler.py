@@ -0,0 +1,122 @@
+# coding: spec
+
+from cwf.splitter.profiler import ProfileNode, BootProfile
+from cwf.splitter.website import Website
+from cwf.splitter.parts import Part
+from cwf.sections.section import Section
+from cwf.sections.options import Options
+
+import threading
+import tempfile
+import json
+import sys
+import os
+
+describe "ProfileNode":
+    it "makes each child once":
+        node = ProfileNode("root")
+        node.child("one") |should| be(node.child("one"))
+        node.children.keys() |should| equal_to(["one"])
+
+    it "knows the time spent here and not in children":
+        node = ProfileNode("root")
+        node.add(1)
+        node.add(2)
+        node.child("one").add(0.5)
+        node.child("two").add(1)
+
+        (node.total, node.calls, node.own) |should| equal_to((3, 2, 1.5))
+        [(path, n.name) for path, n in node.walk()] |should| equal_to(
+            [(("root", ), "root"), (("root", "one"), "one"), (("root", "two"), "two")]
+            )
+
+describe "BootProfile":
+    before_each:
+        self.profile = BootProfile()
+
+    it "times nested places":
+        with self.profile.timing("models", "news"):
+            with self.profile.timing("Section"):
+                pass
+            with self.profile.timing("Section"):
+                pass
+
+        models = self.profile.root.children["models"]
+        section = models.children["news"].children["Section"]
+        (models.calls, section.calls) |should| equal_to((1, 2))
+        self.profile.stack |should| equal_to([self.profile.root])
+
+    it "can show the profile as json, collapsed stacks and the slowest places":
+        self.profile.root.add(4)
+        self.profile.root.child("models").add(3)
+        self.profile.root.child("models").child("Section").add(2)
+
+        data = json.loads(self.profile.as_json())
+        (data['name'], data['total'], data['own']) |should| equal_to(("boot", 4, 1))
+        [child['name'] for child in data['children'][0]['children']] |should| equal_to(["Section"])
+
+        self.profile.collapsed().split('\n') |should| equal_to(
+            ["boot 1000000", "boot;models 1000000", "boot;models;Section 2000000"]
+            )
+        self.profile.top(2) |should| equal_to([(2, "boot;models;Section", 1), (1, "boot", 1)])
+
+    it "can dump the profile to a file":
+        self.profile.root.add(1)
+        fle, location = tempfile.mkstemp()
+        os.close(fle)
+        try:
+            self.profile.dump(location, "collapsed")
+            open(location).read() |should| equal_to("boot 1000000\n")
+
+            self.profile.dump(location)
+            json.load(open(location))['name'] |should| equal_to("boot")
+
+            with self.assertRaises(ValueError):
+                self.profile.dump(location, "svg")
+        finally:
+            os.remove(location)
+
+    it "only instruments while recording":
+        original_add = Section.__dict__['add']
+        original_clone = Options.__dict__['clone']
+
+        with self.profile.recording():
+            Section.__dict__['add'] |should_not| be(original_add)
+            with self.profile.recording():
+                Section('one').add('two').configure(alias="Two")
+            Options().clone()
+
+        Section.__dict__['add'] |should| be(original_add)
+        Options.__dict__['clone'] |should| be(original_clone)
+
+        Section('not recorded').add('nope')
+        children = self.profile.root.children
+        children['Section.add'].calls |should| equal_to(1)
+        children['Section.configure'].calls |should| equal_to(1)
+        children['Section.add'].children['Options.clone'].calls |should| equal_to(1)
+        children['Options.clone'].calls |should| equal_to(1)
+        self.profile.root.calls |should| equal_to(1)
+
+    it "doesn't time other threads":
+        with self.profile.recording():
+            thread = threading.Thread(target=lambda : Section('elsewhere').add('more'))
+            thread.start()
+            thread.join()
+        self.profile.root.children |should| equal_to({})
+
+    it "records configuring a website":
+        website = Website("tests.splitter.profiled", Part("news"), Part("events", after="news"))
+        try:
+            website.configure(profile=self.profile)
+            sys.modules["tests.splitter.profiled.urls"].urlpatterns |should_not| equal_to([])
+        finally:
+            for name in ("urls", "models"):
+                sys.modules.pop("tests.splitter.profiled.%s" % name, None)
+
+        paths = set(path for _, path, _ in self.profile.top(100))
+        for path in (
+              "boot;configure;models;news;import", "boot;configure;models;news;models"
+            , "boot;configure;admin;news;admin", "boot;urls;news;urls;Section.configure", "boot;urls;news;urls;Section.add"
+            , "boot;urls;events;urls", "boot;urls;patterns"
+            ):
+            (path in paths) |should| be(True)
@@ -1,10 +1,14 @@
 # coding: spec
 
-from cwf.splitter.imports import steal
+from cwf.splitter.imports import steal, CodeCache
 import stolen_vars
 
 import itertools
+import tempfile
+import shutil
 import fudge
+import sys
+import os
 
 describe "Stealing variables":
 
@@ -15,31 +19,32 @@ describe "Stealing variables":
             with self.assertRaises(Exception):
                 steal("a", **kwargs)
 
-    @fudge.patch("__builtin__.execfile", "os.path.join")
-    it "execfiles on combination of folder and each filename with globals and locals", fake_execfile, fake_join:
+    @fudge.patch("cwf.splitter.imports.stolen_code", "os.path.join")
+    it "execs code for combination of folder and each filename with globals and locals", fake_stolen_code, fake_join:
         fn1 = fudge.Fake("fn1")
         fn2 = fudge.Fake("fn2")
         folder = fudge.Fake("folder")
         location1 = fudge.Fake("location1")
         location2 = fudge.Fake("location2")
 
-        lcls = fudge.Fake("lcls")
-        glbls = fudge.Fake("glbls")
+        glbls = {}
+        lcls = {}
 
-        # Each location execfile'd is determined by joining folder with each filename
+        # Each location is determined by joining folder with each filename
         (fake_join.expects_call()
             .with_args(folder, "%s.py" % fn1).returns(location1)
             .next_call().with_args(folder, "%s.py" % fn2).returns(location2)
             )
 
-        # Execfile is called for each location
-        (fake_execfile.expects_call()
-            .with_args(location1, glbls, lcls)
-            .next_call().with_args(location2, glbls, lcls)
+        # Code is got for each location
+        (fake_stolen_code.expects_call()
+            .with_args(location1).returns(compile("a = 1", "one", "exec"))
+            .next_call().with_args(location2).returns(compile("b = a + 1", "two", "exec"))
             )
 
         # Call steal
         steal(fn1, fn2, folder=folder, globals=glbls, locals=lcls)
+        lcls |should| equal_to(dict(a=1, b=2))
 
     it "should be able to steal variables from other files":
         # stolen_vars uses splitter.imports.steal
@@ -55,3 +60,73 @@ describe "Stealing variables":
 
         for key, val in expected:
             getattr(stolen_vars, key) |should| equal_to(val)
+
+describe "Caching stolen code":
+    before_each:
+        self.folder = tempfile.mkdtemp()
+        self.location = os.path.join(self.folder, "settings.py")
+        self.write("one = 1\n")
+        self.cache = CodeCache()
+
+        # Make sure we write bytecode regardless of the environment
+        self.dont_write_bytecode = sys.dont_write_bytecode
+        sys.dont_write_bytecode = False
+
+    after_each:
+        sys.dont_write_bytecode = self.dont_write_bytecode
+        shutil.rmtree(self.folder)
+
+    def write(self, source, mtime=1000000):
+        with open(self.location, 'w') as fle:
+            fle.write(source)
+        os.utime(self.location, (mtime, mtime))
+
+    def execute(self, code):
+        namespace = {}
+        exec code in namespace
+        del namespace['__builtins__']
+        return namespace
+
+    it "compiles the file":
+        self.execute(self.cache(self.location)) |should| equal_to(dict(one=1))
+        self.cache(self.location).co_filename |should| equal_to(self.location)
+
+    it "keeps code in memory":
+        code = self.cache(self.location)
+        self.cache(self.location) |should| be(code)
+
+    it "keeps code on disk for other processes":
+        self.cache(self.location)
+        os.path.exists(self.cache.cache_location(self.location)) |should| be(True)
+
+        other = type("CodeCache", (CodeCache, ), {'compile' : fudge.Fake("compile")})()
+        self.execute(other(self.location)) |should| equal_to(dict(one=1))
+
+    it "compiles again if the mtime or size changes":
+        self.cache(self.location)
+
+        self.write("one = 2\n", mtime=1000001)
+        self.execute(self.cache(self.location)) |should| equal_to(dict(one=2))
+        self.execute(CodeCache()(self.location)) |should| equal_to(dict(one=2))
+
+        self.write("one = 30\n", mtime=1000001)
+        self.execute(self.cache(self.location)) |should| equal_to(dict(one=30))
+        self.execute(CodeCache()(self.location)) |should| equal_to(dict(one=30))
+
+    it "ignores a broken disk cache":
+        self.cache(self.location)
+        with open(self.cache.cache_location(self.location), 'wb') as fle:
+            fle.write("rubbish")
+        self.execute(CodeCache()(self.location)) |should| equal_to(dict(one=1))
+
+    it "doesn't write to disk if told not to write bytecode":
+        with fudge.patched_context(sys, "dont_write_bytecode", True):
+            self.cache(self.location)
+        os.path.exists(self.cache.cache_location(self.location)) |should| be(False)
+
+    it "doesn't complain if it can't write to disk":
+        os.chmod(self.folder, 0555)
+        try:
+            self.execute(self.cache(self.location)) |should| equal_to(dict(one=1))
+        finally:
+            os.chmod(self.folder, 0755)
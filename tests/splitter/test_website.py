@@ -1,8 +1,13 @@
 # coding: spec
 
 from cwf.splitter.website import Website
+from cwf.splitter.parts import Part
 
+from django.core.urlresolvers import resolve, clear_url_caches, Resolver404
+from django.test.utils import override_settings
+from django.utils.importlib import import_module
 import fudge
+import sys
 
 describe "Website":
     before_each:
@@ -22,6 +27,19 @@ describe "Website":
         website.prefix |should| be(None)
         website.include_default_urls |should| be(False)
 
+    it "takes pattern_profile from kwargs":
+        profile = fudge.Fake("profile")
+        Website(self.package).pattern_profile |should| be(None)
+        Website(self.package, pattern_profile=profile).pattern_profile |should| be(profile)
+
+    it "takes admin from kwargs":
+        Website(self.package).admin |should| be(True)
+        Website(self.package, admin="lazy").admin |should| equal_to("lazy")
+
+    it "takes workers from kwargs":
+        Website(self.package).workers |should| be(None)
+        Website(self.package, workers=4).workers |should| equal_to(4)
+
     it "takes prefix and include_default_urls from kwargs":
         website = Website(self.package, prefix=self.prefix, include_default_urls=self.include_default_urls)
         website.parts |should| equal_to(())
@@ -70,6 +88,23 @@ describe "Website":
             self.website.configure()
             called |should| equal_to([1, 2, 3])
 
+        @fudge.patch('cwf.splitter.website.inject', 'cwf.splitter.website.lazy_admin')
+        it "gives load_admin to lazy_admin if admin is lazy", fake_inject, fake_lazy_admin:
+            self.fake_names_for.expects_call()
+            fake_inject.expects_call()
+            fake_lazy_admin.expects("add").with_args(self.website.load_admin)
+
+            self.website.admin = "lazy"
+            self.website.configure()
+
+        @fudge.patch('cwf.splitter.website.inject', 'cwf.splitter.website.lazy_admin')
+        it "doesn't load admin if admin is False", fake_inject, fake_lazy_admin:
+            self.fake_names_for.expects_call()
+            fake_inject.expects_call()
+
+            self.website.admin = False
+            self.website.configure()
+
     describe "Getting Part config":
         it "returns self._partconfig[self.package]":
             config = fudge.Fake("config")
@@ -82,7 +117,7 @@ describe "Website":
             config = fudge.Fake("config")
             other_config = fudge.Fake("other_config")
 
-            fakeParts.expects_call().with_args(self.package, self.p1, self.p2).returns(config)
+            fakeParts.expects_call().with_args(self.package, self.p1, self.p2, workers=None).returns(config)
             website = Website(self.package, self.p1, self.p2)
             website._partconfig = {'otherpackage' : other_config}
             website.config |should| equal_to(config)
@@ -93,7 +128,7 @@ describe "Website":
             config = fudge.Fake("config")
             other_config = fudge.Fake("other_config")
 
-            fakeParts.expects_call().with_args(self.package, self.p1, self.p2).returns(config)
+            fakeParts.expects_call().with_args(self.package, self.p1, self.p2, workers=None).returns(config)
             website = Website(self.package, self.p1, self.p2)
             website |should_not| respond_to("_partconfig")
             website.config |should| equal_to(config)
@@ -120,11 +155,15 @@ describe "Website":
 
         describe "Getting urls":
             it "returns a function that calls config.urls with self.include_default_urls":
-                urls = fudge.Fake("urls")
-                self.config.expects("urls").with_args(active_only=True, include_defaults=self.include_default_urls).returns(urls)
+                site = fudge.Fake("site").expects("listen")
+                urls = {'site' : site}
+                self.config.expects("urls").with_args(active_only=True, include_defaults=self.include_default_urls, profile=None).returns(urls)
                 url_getter = self.website.urls
                 url_getter() |should| be(urls)
 
+                # Only listens to the site once
+                url_getter() |should| be(urls)
+
     describe "getting names used to determine where to inject thigns":
         it "has <package>.<name>":
             name = fudge.Fake("name")
@@ -137,3 +176,41 @@ describe "Website":
             names |should| equal_to(
                 ["%s.%s" % (self.package, name), "%s.%s.%s" % (self.prefix, self.package, name)]
                 )
+
+    describe "Following changes to the site":
+        before_each:
+            self.urlconf = "tests.splitter.profiled.urls"
+
+        after_each:
+            clear_url_caches()
+            for name in ("urls", "models"):
+                sys.modules.pop("tests.splitter.profiled.%s" % name, None)
+
+        it "resolves sections added to the site after the urls were imported":
+            website = Website("tests.splitter.profiled", Part("news"), Part("events"), admin=False)
+            website.configure()
+
+            with override_settings(ROOT_URLCONF=self.urlconf):
+                site = import_module(self.urlconf).site
+                path = "/%s/late/" % site.url
+                with self.assertRaises(Resolver404):
+                    resolve(path)
+
+                site.add("late").configure(target=lambda request: None)
+                resolve(path).func |should_not| be(None)
+
+    describe "Ordering patterns with a profile":
+        after_each:
+            clear_url_caches()
+            for name in ("urls", "models"):
+                sys.modules.pop("tests.splitter.profiled.%s" % name, None)
+
+        it "puts hot patterns inside parts first":
+            website = Website("tests.splitter.profiled", Part("news"), Part("events")
+                , admin=False, pattern_profile={'^news/$' : 10}
+                )
+            website.configure()
+
+            news = import_module("tests.splitter.profiled.urls").urlpatterns[0]
+            news.regex.pattern |should| equal_to('^news/')
+            [pattern.regex.pattern for pattern in news.url_patterns] |should| equal_to(['^news/$', '^news/archive/$'])
@@ -1,8 +1,17 @@
 # coding: spec
 
 from cwf.views.rendering import Renderer
-from cwf.views.base import View
+from cwf.views.base import View, State
+from cwf.views.caching import LocalCache
+from cwf.views.coroutines import gather, Provider
 
+from django.http import HttpResponse
+from django.test.client import RequestFactory
+from django.utils.http import http_date
+
+from datetime import datetime
+from calendar import timegm
+import weakref
 import fudge
 
 describe "View":
@@ -38,7 +47,7 @@ describe "View":
             result = fudge.Fake("result")
             request = fudge.Fake("request")
             rendered = fudge.Fake("rendered")
-            cleaned_kwargs = fudge.Fake("cleaned_kwargs")
+            cleaned_kwargs = dict(e=fudge.Fake("e"))
 
             self.fake_get_state.expects_call().with_args(request, target).returns(state)
             self.fake_clean_view_kwargs.expects_call().with_args(dict(c=c, d=d)).returns(cleaned_kwargs)
@@ -47,6 +56,125 @@ describe "View":
 
             self.view(request, target, a, b, c=c, d=d) |should| be(rendered)
 
+    describe "Conditional responses":
+        before_each:
+            self.last_modified = datetime(2013, 10, 26)
+            self.executed = []
+
+            def index(view, request, name):
+                self.executed.append(name)
+                return HttpResponse(name)
+
+            def index_etag(view, request, name):
+                return "%s-1" % name
+
+            def other_last_modified(view, request, name):
+                return self.last_modified
+
+            self.view = type("View", (View, )
+                , { "index" : index
+                  , "other" : index
+                  , "unconditional" : index
+                  , "index_etag" : index_etag
+                  , "other_last_modified" : other_last_modified
+                  }
+                )()
+
+            self.factory = RequestFactory()
+
+        it "returns 304 without executing the target if the etag matches":
+            response = self.view(self.factory.get('/', HTTP_IF_NONE_MATCH='"blah-1"'), "index", name="blah")
+            response.status_code |should| equal_to(304)
+            self.executed |should| equal_to([])
+
+        it "executes the target and adds an etag if the etag doesn't match":
+            response = self.view(self.factory.get('/', HTTP_IF_NONE_MATCH='"blah-0"'), "index", name="blah")
+            response.status_code |should| equal_to(200)
+            response['ETag'] |should| equal_to('"blah-1"')
+            self.executed |should| equal_to(['blah'])
+
+        it "returns 304 if not modified since the last modified":
+            request = self.factory.get('/', HTTP_IF_MODIFIED_SINCE=http_date(timegm(self.last_modified.utctimetuple())))
+            self.view(request, "other", name="blah").status_code |should| equal_to(304)
+            self.executed |should| equal_to([])
+
+            self.last_modified = datetime(2013, 10, 27)
+            response = self.view(request, "other", name="blah")
+            response.status_code |should| equal_to(200)
+            response['Last-Modified'] |should| equal_to('Sun, 27 Oct 2013 00:00:00 GMT')
+            self.executed |should| equal_to(['blah'])
+
+        it "doesn't decorate targets without an etag or last_modified":
+            self.view.conditional_for("unconditional") |should| be(None)
+            response = self.view(self.factory.get('/', HTTP_IF_NONE_MATCH='"blah-1"'), "unconditional", name="blah")
+            response.status_code |should| equal_to(200)
+            response.has_header('ETag') |should| be(False)
+
+    describe "Caching responses":
+        before_each:
+            self.executed = []
+            def index(view, request):
+                self.executed.append(request.path)
+                return HttpResponse("index %s" % len(self.executed))
+
+            self.options = fudge.Fake("options").has_attr(cache_ttl=None, cache_vary=None)
+            self.section = fudge.Fake("section").has_attr(url_options=self.options)
+
+            self.view = type("View", (View, ), {"index" : index})()
+            self.view.response_cache = LocalCache()
+
+        def request(self):
+            request = RequestFactory().get('/stuff')
+            request.section = self.section
+            return request
+
+        it "doesn't cache if the section has no cache_ttl":
+            request = self.request()
+            request.state = self.view.get_state(request, "index")
+            self.view.cache_for(request, "index") |should| be(None)
+
+            self.view(self.request(), "index")
+            self.view(self.request(), "index")
+            self.executed |should| equal_to(['/stuff', '/stuff'])
+
+        it "doesn't cache if there is no section":
+            request = RequestFactory().get('/stuff')
+            request.state = State()
+            self.view.cache_for(request, "index") |should| be(None)
+
+        it "doesn't make anything lazy on the state when finding the cache options":
+            request = self.request()
+            self.view(request, "index")
+            for name in ('menu', 'path', 'section', 'base_url'):
+                dict.keys(request.state) |should_not| contain(name)
+
+        @fudge.patch("cwf.views.base.Menu")
+        it "serves cached responses without executing the target or making a menu", fakeMenu:
+            self.options.cache_ttl = 60
+            self.view(self.request(), "index").content |should| equal_to("index 1")
+
+            request = self.request()
+            self.view(request, "index").content |should| equal_to("index 1")
+            self.executed |should| equal_to(['/stuff'])
+            dict.keys(request.state) |should_not| contain('menu')
+
+    describe "Fanning out":
+        it "merges results from providers into extra and records timings and errors on the state":
+            def fail(request):
+                raise ValueError("nope")
+
+            request = fudge.Fake("request")
+            request.state = State()
+            view = View()
+
+            extra = view.fan_out(request, dict(one=lambda r: r, two=Provider(fail, default=2)), extra=dict(zero=0))
+            extra |should| equal_to(dict(zero=0, one=request, two=2))
+            sorted(request.state.provider_timings.keys()) |should| equal_to(["one", "two"])
+            request.state.provider_errors.keys() |should| equal_to(["two"])
+
+        it "works without extra or state":
+            View().fan_out(object(), dict(one=lambda r: 1)) |should| equal_to(dict(one=1))
+
     describe "rendering a result":
         before_each:
             self.request = fudge.Fake("request")
@@ -108,6 +236,16 @@ describe "View":
             ret = self.view.execute(self.target, self.request, [a, b], dict(c=c, d=d))
             ret |should| be(result)
 
+        @fudge.test
+        it "runs coroutine targets with the pool":
+            def target(request, name):
+                one, two = yield gather(lambda : name, lambda : 2)
+                yield 'template', dict(one=one, two=two)
+
+            self.fake_get_target.expects_call().with_args(self.target).returns(target)
+            ret = self.view.execute(self.target, self.request, [], dict(name="blah"))
+            ret |should| equal_to(('template', dict(one="blah", two=2)))
+
     describe "Getting a result":
         before_each:
             self.args = fudge.Fake("args")
@@ -265,74 +403,80 @@ describe "View":
                   }
                 )()
 
-        @fudge.patch("cwf.views.base.Menu", "cwf.views.base.DictObj")
-        it "returns a dictobj with menu, path, target, section and base_url", fakeMenu, fakeDictObj:
-            path = fudge.Fake("path")
-            result = fudge.Fake("result")
+        it "returns a State with target set and nothing else worked out yet":
+            state = self.view.get_state(self.request, self.target)
+            state |should| be_instance_of(State)
+            dict.keys(state) |should| equal_to(['target'])
+            state.target |should| be(self.target)
+            sorted(state.keys()) |should| equal_to(sorted(['menu', 'path', 'target', 'section', 'base_url']))
+
+        @fudge.patch("cwf.views.base.Menu")
+        it "works out menu, path, section and base_url when they are asked for", fakeMenu:
+            path = ['', 'asdf']
             fakeMenu.expects_call().with_args(self.request, self.section).returns(self.menu)
 
             self.fake_get_section.expects_call().with_args(self.request, path).returns(self.section)
             self.fake_path_from_request.expects_call().with_args(self.request).returns(path)
             self.fake_base_url_from_request.expects_call().with_args(self.request).returns('')
 
-            (fakeDictObj.expects_call()
-                .with_args(menu=self.menu, target=self.target, section=self.section, path=path, base_url='').returns(result)
-                )
+            state = self.view.get_state(self.request, self.target)
+            state.menu |should| be(self.menu)
+            state['path'] |should| be(path)
+            state.section |should| be(self.section)
+            state.base_url |should| equal_to('')
 
-            self.view.get_state(self.request, self.target) |should| be(result)
+            # And only once
+            state.menu |should| be(self.menu)
+            state.section |should| be(self.section)
 
-        @fudge.patch("cwf.views.base.Menu", "cwf.views.base.DictObj")
-        it "doesn't make a menu if can't get a section", fakeMenu, fakeDictObj:
-            path = fudge.Fake("path")
-            result = fudge.Fake("result")
+        it "doesn't make a menu if can't get a section":
+            self.fake_get_section.expects_call().returns(None)
+            self.fake_path_from_request.expects_call().returns([''])
+            self.fake_base_url_from_request.expects_call().returns('')
 
-            self.fake_get_section.expects_call().with_args(self.request, path).returns(None)
-            self.fake_path_from_request.expects_call().with_args(self.request).returns(path)
-            self.fake_base_url_from_request.expects_call().with_args(self.request).returns('')
+            state = self.view.get_state(self.request, self.target)
+            state.menu |should| be(None)
 
-            (fakeDictObj.expects_call()
-                .with_args(menu=None, target=self.target, section=None, path=path, base_url='').returns(result)
-                )
+        it "doesn't keep the request alive":
+            request = type("request", (object, ), {})()
+            state = self.view.get_state(request, self.target)
+            ref = weakref.ref(request)
+            del request
+            ref() |should| be(None)
 
-            self.view.get_state(self.request, self.target) |should| be(result)
+    describe "State values":
+        before_each:
+            self.request = fudge.Fake("request")
+            self.view = View()
 
-        @fudge.patch("cwf.views.base.Menu", "cwf.views.base.DictObj")
-        it "pops start of path if base url isn't an empty string and path starts with ''", fakeMenu, fakeDictObj:
+        it "pops start of path if base url isn't an empty string and path starts with ''":
             path = ['', 'asdf', 'weouri']
-            result = fudge.Fake("result")
-            fakeMenu.expects_call().with_args(self.request, self.section).returns(self.menu)
-
-            self.fake_get_section.expects_call().with_args(self.request, path).returns(self.section)
-            self.fake_path_from_request.expects_call().with_args(self.request).returns(path)
-            self.fake_base_url_from_request.expects_call().with_args(self.request).returns(self.base_url)
+            state = State(base_url='/base')
+            fake_path_from_request = fudge.Fake("path_from_request").expects_call().with_args(self.request).returns(path)
+            with fudge.patched_context(self.view, 'path_from_request', fake_path_from_request):
+                self.view.state_path(self.request, state) |should| equal_to(['asdf', 'weouri'])
 
-            (fakeDictObj.expects_call()
-                .with_args(
-                      menu=self.menu, target=self.target, section=self.section
-                    , path=['asdf', 'weouri'], base_url=self.base_url
-                    ).returns(result)
-                )
-
-            self.view.get_state(self.request, self.target) |should| be(result)
-
-        @fudge.patch("cwf.views.base.Menu", "cwf.views.base.DictObj")
-        it "doesn't pop start of path if base url isn't an empty string but path doesn't start with ''", fakeMenu, fakeDictObj:
+        it "doesn't pop start of path if base url isn't an empty string but path doesn't start with ''":
             path = ['asdf', 'weouri']
-            result = fudge.Fake("result")
-            fakeMenu.expects_call().with_args(self.request, self.section).returns(self.menu)
+            state = State(base_url='/base')
+            fake_path_from_request = fudge.Fake("path_from_request").expects_call().with_args(self.request).returns(path)
+            with fudge.patched_context(self.view, 'path_from_request', fake_path_from_request):
+                self.view.state_path(self.request, state) |should| equal_to(['asdf', 'weouri'])
 
-            self.fake_get_section.expects_call().with_args(self.request, path).returns(self.section)
-            self.fake_path_from_request.expects_call().with_args(self.request).returns(path)
-            self.fake_base_url_from_request.expects_call().with_args(self.request).returns(self.base_url)
-
-            (fakeDictObj.expects_call()
-                .with_args(
-                      menu=self.menu, target=self.target, section=self.section
-                    , path=['asdf', 'weouri'], base_url=self.base_url
-                    ).returns(result)
-                )
+        it "doesn't pop start of path if base url is an empty string":
+            path = ['', 'asdf', 'weouri']
+            state = State(base_url='')
+            fake_path_from_request = fudge.Fake("path_from_request").expects_call().with_args(self.request).returns(path)
+            with fudge.patched_context(self.view, 'path_from_request', fake_path_from_request):
+                self.view.state_path(self.request, state) |should| equal_to(['', 'asdf', 'weouri'])
 
-            self.view.get_state(self.request, self.target) |should| be(result)
+        it "gets section using the path in the state":
+            path = fudge.Fake("path")
+            section = fudge.Fake("section")
+            state = State(path=path)
+            fake_get_section = fudge.Fake("get_section").expects_call().with_args(self.request, path).returns(section)
+            with fudge.patched_context(self.view, 'get_section', fake_get_section):
+                self.view.state_section(self.request, state) |should| be(section)
 
     describe "Getting the current section":
         before_each:
@@ -0,0 +1,164 @@
+# coding: spec
+
+from cwf.views.caching import LocalCache, ResponseCache
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test.client import RequestFactory
+
+import fudge
+import time
+
+describe "LocalCache":
+    before_each:
+        self.cache = LocalCache(max_entries=2)
+
+    it "remembers values":
+        self.cache.get("a") |should| be(None)
+        self.cache.get("a", 1) |should| equal_to(1)
+
+        self.cache.set("a", 2)
+        self.cache.get("a") |should| equal_to(2)
+
+        self.cache.delete("a")
+        self.cache.get("a") |should| be(None)
+
+    it "uses the default timeout if timeout is None":
+        cache = LocalCache(default_timeout=10)
+        with fudge.patched_context(time, "time", lambda : 100):
+            cache.set("a", 1)
+            cache.values["a"] |should| equal_to((110, 1))
+
+        with fudge.patched_context(time, "time", lambda : 111):
+            cache.get("a") |should| be(None)
+
+    it "forgets values after their timeout":
+        self.cache.set("a", 1, timeout=10)
+        self.cache.get("a") |should| equal_to(1)
+
+        with fudge.patched_context(time, "time", lambda : 1e12):
+            self.cache.get("a") |should| be(None)
+
+    it "forgets the least recently used value when it has too many":
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+        self.cache.values.keys() |should| equal_to(["a", "c"])
+
+    it "can forget everything":
+        self.cache.set("a", 1)
+        self.cache.clear()
+        self.cache.values.keys() |should| equal_to([])
+
+describe "ResponseCache":
+    before_each:
+        self.called = []
+        self.backend = LocalCache()
+        self.factory = RequestFactory()
+
+        def respond(request, name):
+            self.called.append(name)
+            response = HttpResponse("%s %s" % (name, len(self.called)), content_type="text/plain")
+            response['X-Thing'] = 'stuff'
+            return response
+        self.respond = respond
+
+    def request(self, path="/one", user=None, **kwargs):
+        request = self.factory.get(path, kwargs)
+        request.user = user or AnonymousUser()
+        return request
+
+    it "uses remembered responses for the same path":
+        respond = ResponseCache(self.backend, 60)(self.respond)
+        first = respond(self.request(), "blah")
+        second = respond(self.request(), "blah")
+
+        self.called |should| equal_to(["blah"])
+        second |should_not| be(first)
+        second.content |should| equal_to("blah 1")
+        second['Content-Type'] |should| equal_to("text/plain")
+        second['X-Thing'] |should| equal_to("stuff")
+
+        respond(self.request("/two"), "blah").content |should| equal_to("blah 2")
+
+    it "only caches GET and HEAD requests":
+        respond = ResponseCache(self.backend, 60)(self.respond)
+        request = self.factory.post("/one")
+        respond(request, "blah")
+        respond(request, "blah")
+        self.called |should| equal_to(["blah", "blah"])
+
+    it "doesn't remember unsuccessful, streaming or cookie setting responses":
+        responses = [HttpResponse(status=404), StreamingHttpResponse(["a"]), HttpResponse("a")]
+        responses[-1].set_cookie("a", "b")
+
+        cache = ResponseCache(self.backend, 60)
+        for response in responses:
+            cache.cacheable(self.request(), response) |should| be(False)
+        cache.cacheable(self.request(), HttpResponse("a")) |should| be(True)
+
+    it "doesn't remember private, uncacheable or varying responses":
+        cache = ResponseCache(self.backend, 60)
+        for header, value in (
+              ('Cache-Control', 'private, max-age=60'), ('Cache-Control', 'no-cache')
+            , ('Cache-Control', 'no-store'), ('Vary', 'Cookie')
+            ):
+            response = HttpResponse("a")
+            response[header] = value
+            cache.cacheable(self.request(), response) |should| be(False)
+
+        response = HttpResponse("a")
+        response['Cache-Control'] = 'max-age=60'
+        cache.cacheable(self.request(), response) |should| be(True)
+
+    it "doesn't remember responses that used the csrf token":
+        request = self.request()
+        request.META['CSRF_COOKIE_USED'] = True
+        ResponseCache(self.backend, 60).cacheable(request, HttpResponse("a")) |should| be(False)
+
+    it "doesn't share responses for logged in users unless it varies on the user":
+        user = fudge.Fake("user").has_attr(pk=1).provides("is_authenticated").returns(True)
+
+        respond = ResponseCache(self.backend, 60)(self.respond)
+        respond(self.request(user=user), "blah")
+        respond(self.request(user=user), "blah")
+        respond(self.request(), "blah")
+        respond(self.request(), "blah")
+        self.called |should| equal_to(["blah", "blah", "blah"])
+
+        respond = ResponseCache(self.backend, 60, vary=['user'], prefix="user")(self.respond)
+        respond(self.request(user=user), "user")
+        respond(self.request(user=user), "user")
+        self.called |should| equal_to(["blah", "blah", "blah", "user"])
+
+    it "always varies by host and query string":
+        cache = ResponseCache(self.backend, 60)
+        key = cache.key_for(self.request(q='a'))
+        cache.key_for(self.request(q='a')) |should| equal_to(key)
+        cache.key_for(self.request(q='b')) |should_not| equal_to(key)
+        cache.key_for(self.request("/two", q='a')) |should_not| equal_to(key)
+
+        request = self.request(q='a')
+        request.META['HTTP_HOST'] = 'other.com'
+        cache.key_for(request) |should_not| equal_to(key)
+
+    it "varies by GET params, user and callables":
+        vary = lambda request: request.META.get("HTTP_X_THING")
+        cache = ResponseCache(self.backend, 60, vary=['GET', 'user', vary])
+
+        user = fudge.Fake("user").has_attr(pk=1).provides("is_authenticated").returns(True)
+        key = cache.key_for(self.request(a=1))
+
+        cache.key_for(self.request(a=1)) |should| equal_to(key)
+        cache.key_for(self.request(a=2)) |should_not| equal_to(key)
+        cache.key_for(self.request(a=1, user=user)) |should_not| equal_to(key)
+
+        request = self.request(a=1)
+        request.META["HTTP_X_THING"] = "other"
+        cache.key_for(request) |should_not| equal_to(key)
+
+    it "doesn't share responses between prefixes":
+        ResponseCache(self.backend, 60, prefix="one")(self.respond)(self.request(), "one")
+        ResponseCache(self.backend, 60, prefix="two")(self.respond)(self.request(), "two")
+        self.called |should| equal_to(["one", "two"])
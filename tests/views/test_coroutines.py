@@ -0,0 +1,131 @@
+# coding: spec
+
+from cwf.views.coroutines import Pool, gather, drive, is_coroutine, FanOut, Provider
+
+from multiprocessing import TimeoutError
+
+import threading
+import fudge
+import time
+
+describe "Pool":
+    before_each:
+        self.pool = Pool(size=3)
+
+    it "doesn't make threads until it's used":
+        hasattr(self.pool, '_threads') |should| be(False)
+        self.pool.run([lambda : 1])
+        hasattr(self.pool, '_threads') |should| be(True)
+
+    it "runs callables at the same time and returns their results in order":
+        started = []
+        ready = threading.Event()
+        def waiter(value):
+            def wait():
+                started.append(value)
+                if len(started) == 3:
+                    ready.set()
+                ready.wait(5)
+                return value
+            return wait
+
+        self.pool.run([waiter(1), waiter(2), waiter(3)]) |should| equal_to([1, 2, 3])
+        ready.is_set() |should| be(True)
+
+    it "raises the first error after everything has finished":
+        finished = []
+        def slow():
+            time.sleep(0.05)
+            finished.append(True)
+
+        def fail():
+            raise ValueError("nope")
+
+        with self.assertRaises(ValueError):
+            self.pool.run([fail, slow])
+        finished |should| equal_to([True])
+
+describe "Driving coroutines":
+    before_each:
+        self.pool = Pool(size=2)
+
+    it "knows generators are coroutines":
+        def coroutine():
+            yield 1
+        is_coroutine(coroutine()) |should| be(True)
+        is_coroutine(('template', {})) |should| be(False)
+
+    it "sends results of gathered callables and returns the first thing that isn't a gather":
+        def target():
+            one, two = yield gather(lambda : 1, lambda : 2)
+            three, = yield gather(lambda : one + two)
+            yield 'template', dict(total=three)
+            raise Exception("Should have stopped")
+
+        drive(target(), self.pool) |should| equal_to(('template', {'total' : 3}))
+
+    it "throws errors back into the coroutine":
+        def fail():
+            raise ValueError("nope")
+
+        def target():
+            try:
+                yield gather(fail)
+            except ValueError as error:
+                yield 'error', str(error)
+
+        drive(target(), self.pool) |should| equal_to(('error', 'nope'))
+
+    it "returns None if the coroutine yields nothing else":
+        def target():
+            yield gather(lambda : 1)
+        drive(target(), self.pool) |should| be(None)
+
+describe "FanOut":
+    before_each:
+        self.pool = Pool(size=4)
+
+    it "calls providers at the same time with the same arguments":
+        ready = threading.Event()
+        started = []
+        def provider(value):
+            def provide(request):
+                started.append(value)
+                if len(started) == 2:
+                    ready.set()
+                ready.wait(5)
+                return (request, value)
+            return provide
+
+        request = fudge.Fake("request")
+        fan_out = FanOut(self.pool, dict(one=provider(1), two=Provider(provider(2))))
+        fan_out(request) |should| equal_to(dict(one=(request, 1), two=(request, 2)))
+        sorted(fan_out.timings.keys()) |should| equal_to(["one", "two"])
+        fan_out.errors |should| equal_to({})
+
+    it "uses defaults for providers that fail":
+        def fail(request):
+            raise ValueError("nope")
+
+        fan_out = FanOut(self.pool, dict(fine=lambda request: 1, failed=Provider(fail, default=[])))
+        fan_out(None) |should| equal_to(dict(fine=1, failed=[]))
+        fan_out.errors.keys() |should| equal_to(["failed"])
+        fan_out.errors["failed"] |should| be_instance_of(ValueError)
+
+    it "uses defaults for providers that take too long":
+        finish = threading.Event()
+        def slow(request):
+            finish.wait(5)
+            return "slow"
+
+        fan_out = FanOut(self.pool
+            , dict(slow=Provider(slow, default="default"), quick=Provider(lambda request: "quick", timeout=5))
+            , timeout=0.05
+            )
+        try:
+            fan_out(None) |should| equal_to(dict(slow="default", quick="quick"))
+            fan_out.errors.keys() |should| equal_to(["slow"])
+            fan_out.errors["slow"] |should| be_instance_of(TimeoutError)
+            (fan_out.timings["slow"] >= 0.05) |should| be(True)
+        finally:
+            finish.set()
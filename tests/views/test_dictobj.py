@@ -2,6 +2,8 @@
 
 from cwf.views.base import DictObj
 
+import gc
+
 describe "DictObj":
     it "starts as an empty dictionary":
         d = DictObj()
@@ -50,3 +52,26 @@ describe "DictObj":
 
         d.get('e') |should| be(None)
         d.get('f', 5) |should| equal_to(5)
+
+    it "finds keys before methods with the same name":
+        d = DictObj(items=2)
+        d.items |should| equal_to(2)
+        d.values = [1, 2]
+        d.values |should| equal_to([1, 2])
+        d.get('items') |should| equal_to(2)
+
+        del d['items']
+        d.items() |should| equal_to([('values', [1, 2])])
+
+    it "can delete attributes":
+        d = DictObj(a=1)
+        del d.a
+        d.keys() |should| equal_to([])
+
+        with self.assertRaises(AttributeError):
+            del d.a
+
+    it "doesn't reference itself":
+        d = DictObj(a=1)
+        hasattr(d, '__dict__') |should| be(False)
+        (d in gc.get_referents(d)) |should| be(False)
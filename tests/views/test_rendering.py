@@ -1,10 +1,17 @@
 # coding: spec
 
 from django.http import Http404
+from django.template import TemplateDoesNotExist
+from django.test.client import RequestFactory
 
 from cwf.views.rendering import Renderer, renderer
+from cwf.views.serializers import JSONSerializer
+
+from StringIO import StringIO
 
 import fudge
+import json
+import gzip
 
 describe "Rendering helper":
     before_each:
@@ -74,6 +81,106 @@ describe "Rendering helper":
                 , extra=self.extra, mime=self.mime, modify=modify
                 ) |should| be(result)
 
+    describe "Getting templates":
+        before_each:
+            self.name = fudge.Fake("name")
+            self.template = fudge.Fake("template")
+            self.helper = Renderer()
+
+        @fudge.patch("cwf.views.rendering.loader")
+        it "only gets a template from the loader once", fake_loader:
+            fake_loader.expects("get_template").with_args(self.name).returns(self.template).times_called(1)
+            self.helper.get_template(self.name) |should| be(self.template)
+            self.helper.get_template(self.name) |should| be(self.template)
+
+        it "only caches templates by default if not debugging":
+            for debug, template_debug, expected in ((False, False, True), (True, False, False), (False, True, False)):
+                with self.settings(DEBUG=debug, TEMPLATE_DEBUG=template_debug):
+                    self.helper.cache_templates |should| be(expected)
+
+            self.helper.cache_templates = False
+            with self.settings(DEBUG=False, TEMPLATE_DEBUG=False):
+                self.helper.cache_templates |should| be(False)
+
+        @fudge.patch("cwf.views.rendering.loader")
+        it "always uses the loader if not caching templates", fake_loader:
+            self.helper.cache_templates = False
+            fake_loader.expects("get_template").with_args(self.name).returns(self.template).times_called(2)
+            self.helper.get_template(self.name) |should| be(self.template)
+            self.helper.get_template(self.name) |should| be(self.template)
+            self.helper.templates.values |should| equal_to({})
+
+        @fudge.patch("cwf.views.rendering.loader")
+        it "forgets the least recently used template when there are too many", fake_loader:
+            self.helper.templates.max_entries = 2
+            fake_loader.expects("get_template").calls(lambda name: "compiled %s" % name)
+
+            self.helper.get_template("one")
+            self.helper.get_template("two")
+            self.helper.get_template("one")
+            self.helper.get_template("three")
+            self.helper.templates.values.items() |should| equal_to([("one", "compiled one"), ("three", "compiled three")])
+
+        it "can forget some or all templates":
+            self.helper.templates.values.update(one=1, two=2, three=3)
+            self.helper.forget_templates("one", "four")
+            sorted(self.helper.templates.values.keys()) |should| equal_to(["three", "two"])
+
+            self.helper.forget_templates()
+            self.helper.templates.values |should| equal_to({})
+
+        it "can preload templates":
+            loaded = self.helper.preload("rendering/complex.html")
+            loaded.keys() |should| equal_to(["rendering/complex.html"])
+            self.helper.templates.values |should| equal_to(loaded)
+
+        it "preloads known templates that exist if no names are given":
+            self.helper.known_templates = ("menu/base.html", "not/a/template.html")
+            self.helper.preload().keys() |should| equal_to(["menu/base.html"])
+
+        it "complains about named templates that don't exist":
+            with self.assertRaises(TemplateDoesNotExist):
+                self.helper.preload("not/a/template.html")
+
+    describe "Streaming":
+        before_each:
+            self.helper = Renderer()
+            self.request = RequestFactory().get('/')
+
+        it "streams templates with request context":
+            response = self.helper.stream(self.request, "rendering/complex.html", {'blah':'things'}, mime="text/plain")
+            response.streaming |should| be(True)
+            response['Content-Type'] |should| equal_to("text/plain")
+            ''.join(response.streaming_content) |should| equal_to("<p><a>things</a></p>")
+
+        it "streams extended templates":
+            response = self.helper.stream(self.request, "rendering/streamed_child.html", {'blah':'things'})
+            ''.join(response.streaming_content) |should| equal_to("<html><head></head><body>things</body></html>")
+
+        it "renders one top level node at a time":
+            ctxt = self.helper.request_context(self.request, {'blah':'things'})
+            template = self.helper.get_template("rendering/streamed_child.html")
+            list(self.helper.rendered_nodes(template, ctxt)) |should| equal_to(
+                ["<html>", "<head></head>", "<body>things</body>", "</html>"]
+                )
+
+        it "joins bits into chunks of at least stream_chunk_size":
+            self.helper.stream_chunk_size = 3
+            list(self.helper.chunked(["a", "bc", "d", "ef", "ghij", "k"])) |should| equal_to(["abc", "def", "ghij", "k"])
+
+        it "streams json arrays":
+            items = (dict(number=i) for i in range(3))
+            response = self.helper.stream_json(items)
+            response['Content-Type'] |should| equal_to("application/json")
+            json.loads(''.join(response.streaming_content)) |should| equal_to([{'number':0}, {'number':1}, {'number':2}])
+
+        it "dumps strings in json arrays":
+            content = ''.join(self.helper.stream_json(['a', 'b', {'x' : 'y'}]).streaming_content)
+            json.loads(content) |should| equal_to(['a', 'b', {'x' : 'y'}])
+
+        it "streams empty json arrays":
+            ''.join(self.helper.stream_json([]).streaming_content) |should| equal_to("[]")
+
     describe "Getting request context":
         before_each:
             self.extra = fudge.Fake("extra")
@@ -125,22 +232,50 @@ describe "Rendering helper":
             self.helper.xml(data) |should| be(result)
 
     describe "shortcut to render json":
-        @fudge.patch("cwf.views.rendering.HttpResponse", "json.dumps")
-        it "returns HttpResponse with application/javascript mimetype after converting data to json string", fakeHttpResponse, fake_dumps:
+        before_each:
+            self.serializer = fudge.Fake("serializer")
+            self.helper = Renderer(json_serializer=self.serializer)
+
+        @fudge.patch("cwf.views.rendering.HttpResponse")
+        it "returns HttpResponse with application/json mimetype after converting data to json string", fakeHttpResponse:
             data = fudge.Fake("data")
-            json = fudge.Fake("json")
-            fake_dumps.expects_call().with_args(data).returns(json)
+            self.serializer.expects_call().with_args(data).returns('{"a":"b"}')
 
             result = fudge.Fake("result")
-            fakeHttpResponse.expects_call().with_args(json, mimetype="application/javascript").returns(result)
+            fakeHttpResponse.expects_call().with_args('{"a":"b"}', mimetype="application/json").returns(result)
             self.helper.json(data) |should| be(result)
 
-        @fudge.patch("cwf.views.rendering.HttpResponse", "json.dumps")
-        it "assumes data is already json if passed in as a string", fakeHttpResponse, fake_dumps:
-            json = '{"a":"b"}'
-            result = fudge.Fake("result")
-            fakeHttpResponse.expects_call().with_args(json, mimetype="application/javascript").returns(result)
-            self.helper.json(json) |should| be(result)
+        it "uses a JSONSerializer by default":
+            Renderer().json_serializer |should| be_instance_of(JSONSerializer)
+            Renderer().json({'a':['b']}).content |should| equal_to('{"a":["b"]}')
+
+        describe "gzip":
+            before_each:
+                self.data = '{"a":"%s"}' % ('b' * 100)
+                self.serializer.expects_call().returns(self.data)
+                self.helper.gzip_min_size = 100
+                self.request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+            it "gzips big json if the request accepts it":
+                response = self.helper.json({}, request=self.request)
+                response['Content-Encoding'] |should| equal_to('gzip')
+                response['Vary'] |should| equal_to('Accept-Encoding')
+                gzip.GzipFile(fileobj=StringIO(response.content)).read() |should| equal_to(self.data)
+
+            it "doesn't gzip small json":
+                self.helper.gzip_min_size = 1000
+                response = self.helper.json({}, request=self.request)
+                response.has_header('Content-Encoding') |should| be(False)
+                response.content |should| equal_to(self.data)
+
+            it "doesn't gzip if the request doesn't accept it":
+                response = self.helper.json({}, request=RequestFactory().get('/'))
+                response.has_header('Content-Encoding') |should| be(False)
+                response.content |should| equal_to(self.data)
+
+            it "doesn't gzip without a request":
+                response = self.helper.json({})
+                response.has_header('Content-Encoding') |should| be(False)
 
     describe "Getting a redirect":
         before_each:
@@ -0,0 +1,31 @@
+# coding: spec
+
+from cwf.views.serializers import JSONSerializer
+
+import fudge
+import json
+
+describe "JSONSerializer":
+    it "dumps data without unnecessary whitespace":
+        data = {'a' : [1, 2, {'b' : None}]}
+        serialized = JSONSerializer()(data)
+        serialized |should| equal_to('{"a":[1,2,{"b":null}]}')
+        json.loads(serialized) |should| equal_to(data)
+
+    it "assumes strings are already json":
+        JSONSerializer().serialize('{"a" : "b"}') |should| equal_to('{"a" : "b"}')
+        JSONSerializer().serialize(u'[1]') |should| equal_to(u'[1]')
+
+    it "memoizes dumps":
+        serializer = JSONSerializer()
+        dumps = fudge.Fake("dumps")
+        serializer.find_dumps = fudge.Fake("find_dumps").expects_call().returns(dumps).times_called(1)
+        serializer.dumps |should| be(dumps)
+        serializer.dumps |should| be(dumps)
+
+    it "uses dumps from the library if it can be imported":
+        JSONSerializer(library='json').dumps |should| be(json.dumps)
+
+    it "uses the standard library if the library can't be imported":
+        serializer = JSONSerializer(library='cwf_not_a_json_library')
+        serializer({'a' : 1}) |should| equal_to('{"a":1}')
@@ -0,0 +1,79 @@
+# coding: spec
+
+from cwf.views.base import State
+
+import fudge
+
+describe "State":
+    it "behaves like a dictionary and an object":
+        state = State(a=1)
+        state.b = 2
+        state['c'] = 3
+
+        state['b'] |should| equal_to(2)
+        state.c |should| equal_to(3)
+        sorted(state.items()) |should| equal_to([('a', 1), ('b', 2), ('c', 3)])
+
+        with self.assertRaises(KeyError):
+            state['d']
+
+        with self.assertRaises(AttributeError):
+            state.d
+
+        state.get('d') |should| be(None)
+        state.get('d', 5) |should| equal_to(5)
+
+    it "has no __dict__":
+        hasattr(State(), '__dict__') |should| be(False)
+
+    it "finds keys before methods with the same name":
+        state = State(lazy={'keys' : lambda s: ['made']}, items=2)
+        state.items |should| equal_to(2)
+        state.keys |should| equal_to(['made'])
+        sorted(state) |should| equal_to(['items', 'keys'])
+        sorted(dict.items(state.copy())) |should| equal_to([('items', 2), ('keys', ['made'])])
+
+    describe "lazy values":
+        before_each:
+            self.value = fudge.Fake("value")
+            self.maker = fudge.Fake("maker")
+            self.state = State(a=1, lazy={'thing' : self.maker})
+
+        it "knows about lazy keys without making them":
+            ('thing' in self.state) |should| be(True)
+            self.state.has_key('thing') |should| be(True)
+            len(self.state) |should| equal_to(2)
+            sorted(self.state.keys()) |should| equal_to(['a', 'thing'])
+            dict.keys(self.state) |should| equal_to(['a'])
+
+        @fudge.test
+        it "makes the value with the state once when it's first asked for":
+            self.maker.expects_call().with_args(self.state).returns(self.value).times_called(1)
+            self.state.thing |should| be(self.value)
+            self.state['thing'] |should| be(self.value)
+            self.state.get('thing') |should| be(self.value)
+
+        @fudge.test
+        it "lets lazy values use other lazy values":
+            state = State(lazy={'one' : lambda s: 1, 'two' : lambda s: s.one + 1})
+            state.two |should| equal_to(2)
+            sorted(dict.keys(state)) |should| equal_to(['one', 'two'])
+
+        @fudge.test
+        it "never makes values that are set before they're asked for":
+            self.state.thing = 2
+            self.state.update(other=3)
+            self.state.thing |should| equal_to(2)
+            self.state['other'] |should| equal_to(3)
+
+        @fudge.test
+        it "forgets lazy values that are deleted":
+            del self.state['thing']
+            ('thing' in self.state) |should| be(False)
+            with self.assertRaises(AttributeError):
+                self.state.thing
+
+        @fudge.test
+        it "makes everything when values or items are asked for":
+            self.maker.expects_call().with_args(self.state).returns(self.value)
+            sorted(self.state.items()) |should| equal_to(sorted([('a', 1), ('thing', self.value)]))